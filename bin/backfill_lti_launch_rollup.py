@@ -0,0 +1,29 @@
+"""
+Rebuild the lti_launch_rollup table from all of the launches in lti_launches.
+
+Launches can't be recorded while this runs.
+
+Usage:
+
+    tox -qe dev --run-command 'python bin/backfill_lti_launch_rollup.py conf/development.ini'
+"""
+import sys
+
+from pyramid.paster import bootstrap
+from zope.sqlalchemy import mark_changed
+
+from lms.models import LtiLaunchRollup
+
+
+def backfill():
+    with bootstrap(sys.argv[1]) as env:
+        request = env["request"]
+
+        with request.tm:
+            LtiLaunchRollup.backfill(request.db)
+            # Otherwise the transaction is rolled back as if nothing changed.
+            mark_changed(request.db)
+
+
+if __name__ == "__main__":
+    backfill()
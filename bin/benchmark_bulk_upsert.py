@@ -0,0 +1,83 @@
+"""
+Benchmark bulk upserting files with and without COPY.
+
+Upserts batches of new files and then the same files again (so they're all
+updated) with `db.bulk.upsert()`'s chunked INSERT statements and with its
+COPY mode. Everything happens in a transaction that's rolled back at the end.
+
+Usage:
+
+    tox -qe dev --run-command 'python bin/benchmark_bulk_upsert.py'
+"""
+import os
+import time
+
+import sqlalchemy
+
+from lms.db import SESSION
+from lms.models import ApplicationInstance, File
+
+SIZES = [10_000, 100_000]
+
+
+def files(application_instance, size, name):
+    # A generator, so that the upsert has to stream it.
+    for i in range(size):
+        yield {
+            "application_instance_id": application_instance.id,
+            "type": "canvas_file",
+            "lms_id": f"{size}_{i}",
+            "course_id": "course_id",
+            "name": f"{name} {i}.pdf",
+            "size": 123456 + i,
+        }
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    engine = sqlalchemy.create_engine(os.environ["DATABASE_URL"])
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = SESSION(bind=connection)
+
+    try:
+        application_instance = ApplicationInstance(
+            consumer_key="benchmark_bulk_upsert",
+            shared_secret="shared_secret",
+            lms_url="https://lms.example.com",
+            requesters_email="benchmark@example.com",
+        )
+        db.add(application_instance)
+        db.flush()
+
+        print("Seconds to upsert N files (insert / update):\n")
+
+        for size in SIZES:
+            for copy in (False, True):
+                savepoint = connection.begin_nested()
+
+                def upsert(name, copy=copy, size=size):
+                    return db.bulk.upsert(
+                        File, files(application_instance, size, name), copy=copy
+                    )
+
+                insert_time = timed(lambda: upsert("new"))
+                update_time = timed(lambda: upsert("updated"))
+                savepoint.rollback()
+
+                print(
+                    f"{size:>7} files  {'COPY' if copy else 'INSERT':<6}  "
+                    f"{insert_time:.2f} / {update_time:.2f}"
+                )
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
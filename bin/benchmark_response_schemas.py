@@ -0,0 +1,137 @@
+"""
+Benchmark parsing big API responses with and without compiled schemas.
+
+Compares marshmallow with the compiled fast path (lms.validation._compiled)
+on realistic Canvas and Blackboard pages.
+
+Usage:
+
+    tox -qe dev --run-command 'python bin/benchmark_response_schemas.py'
+"""
+import json
+import timeit
+
+from lms.services.blackboard_api._schemas import BlackboardListFilesSchema
+from lms.services.canvas_api.client import CanvasAPIClient
+
+PAGE_SIZE = 1000
+REPEAT = 5
+NUMBER = 10
+
+
+class FakeResponse:
+    """Just enough of a requests response to be parsed by a schema."""
+
+    def __init__(self, json_data):
+        self._body = json.dumps(json_data)
+
+    def json(self):
+        return json.loads(self._body)
+
+
+def canvas_files():
+    return [
+        {
+            "id": 10000 + i,
+            "uuid": f"uuid{i}",
+            "folder_id": 12,
+            "display_name": f"Lecture notes {i}.pdf",
+            "filename": f"Lecture+notes+{i}.pdf",
+            "content-type": "application/pdf",
+            "url": f"https://canvas.example.com/files/{10000 + i}/download",
+            "size": 123456 + i,
+            "created_at": "2021-09-01T12:00:00Z",
+            "updated_at": "2021-09-02T12:00:00Z",
+            "unlock_at": None,
+            "locked": False,
+            "hidden": False,
+            "lock_at": None,
+            "hidden_for_user": False,
+            "thumbnail_url": None,
+            "modified_at": "2021-09-02T12:00:00Z",
+            "mime_class": "pdf",
+            "media_entry_id": None,
+            "locked_for_user": False,
+        }
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def canvas_groups():
+    return [
+        {
+            "id": 2000 + i,
+            "name": f"Group {i}",
+            "description": None,
+            "group_category_id": 7 + i % 3,
+            "is_public": False,
+            "join_level": "invitation_only",
+            "members_count": 5,
+            "avatar_url": None,
+            "context_type": "Course",
+            "course_id": 125,
+            "role": None,
+            "users": [
+                {"id": 5 * i + j, "name": f"Student {5 * i + j}"} for j in range(5)
+            ],
+        }
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def blackboard_files():
+    return {
+        "results": [
+            {
+                "id": f"_{7000 + i}_1",
+                "name": f"Lecture notes {i}.pdf",
+                "type": "File",
+                "modified": "2021-09-02T12:00:00.000Z",
+                "mimeType": "application/pdf",
+                "size": 123456 + i,
+                "parentId": "_6000_1",
+                "downloadUrl": "https://blackboard.example.com/bbcswebdav/xid-1",
+                "created": "2021-09-01T12:00:00.000Z",
+            }
+            for i in range(PAGE_SIZE)
+        ],
+        "paging": {
+            "nextPage": "/learn/api/public/v1/courses/_1_1/resources?offset=1000"
+        },
+    }
+
+
+# pylint:disable=protected-access
+BENCHMARKS = [
+    ("Canvas list files", CanvasAPIClient._ListFilesSchema, canvas_files),
+    ("Canvas course groups", CanvasAPIClient._ListGroups, canvas_groups),
+    ("Blackboard list files", BlackboardListFilesSchema, blackboard_files),
+]
+
+
+def best_time(statement):
+    return min(timeit.repeat(statement, repeat=REPEAT, number=NUMBER)) / NUMBER
+
+
+def main():
+    print(f"Seconds to parse a page of {PAGE_SIZE} items (best of {REPEAT}):\n")
+
+    for name, schema_class, payload in BENCHMARKS:
+        response = FakeResponse(payload())
+        schema = schema_class(response)
+
+        # The results must be the same either way.
+        assert schema.parse() == schema.load(response)
+
+        marshmallow_time = best_time(lambda: schema.load(response))
+        compiled_time = best_time(schema.parse)
+
+        print(
+            f"{name:<25} marshmallow: {marshmallow_time:.4f}  "
+            f"compiled: {compiled_time:.4f}  "
+            f"({marshmallow_time / compiled_time:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
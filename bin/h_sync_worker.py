@@ -0,0 +1,67 @@
+"""
+Send the syncs to h that launches have queued in deferred mode.
+
+Runs until it's killed, sending batches of queued jobs to h and waiting for
+more when the queue is empty. Any number of workers can run at once. Only
+needed when H_SYNC_DEFERRED is set.
+
+Usage:
+
+    tox -qe dev --run-command 'python bin/h_sync_worker.py conf/development.ini'
+"""
+import argparse
+import logging
+import time
+
+import newrelic.agent
+from pyramid.paster import bootstrap
+
+LOG = logging.getLogger("h_sync_worker")
+
+parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+parser.add_argument("config_uri")
+parser.add_argument(
+    "--batch-size", type=int, default=100, help="the most jobs to send to h at once"
+)
+parser.add_argument(
+    "--poll-interval",
+    type=float,
+    default=1,
+    help="seconds to wait when there are no jobs",
+)
+parser.add_argument(
+    "--once", action="store_true", help="exit when there are no jobs left"
+)
+
+
+def work(args):
+    with bootstrap(args.config_uri) as env:
+        request = env["request"]
+
+        while True:
+            with request.tm:
+                queue = request.find_service(name="h_sync_queue")
+                depth, oldest_age = queue.stats()
+                processed = queue.process(limit=args.batch_size)
+
+            newrelic.agent.record_custom_metric("Custom/HSyncQueue/Depth", depth)
+            newrelic.agent.record_custom_metric(
+                "Custom/HSyncQueue/OldestAge", oldest_age
+            )
+
+            if processed:
+                LOG.info(
+                    "Processed %d of %d queued jobs (oldest %.1fs)",
+                    processed,
+                    depth,
+                    oldest_age,
+                )
+            else:
+                if args.once:
+                    return
+                time.sleep(args.poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    work(parser.parse_args())
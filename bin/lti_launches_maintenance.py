@@ -0,0 +1,48 @@
+"""
+Create future lti_launches partitions and remove expired ones.
+
+Creates the monthly partitions for this month and the next three. If
+LTI_LAUNCHES_RETENTION_MONTHS is set the partitions for months before that
+are detached, exported to gzipped CSV files in LTI_LAUNCHES_ARCHIVE_DIR (if
+it's set) and dropped, and so are the launches from before then in the
+default partition. Run this regularly (for example daily).
+
+Usage:
+
+    tox -qe dev --run-command 'python bin/lti_launches_maintenance.py conf/development.ini'
+"""
+import sys
+from datetime import date
+
+from pyramid.paster import bootstrap
+
+from lms.models import LtiLaunches
+
+
+def maintain():
+    with bootstrap(sys.argv[1]) as env:
+        registry = env["registry"]
+        settings = registry.settings
+        retention_months = settings.get("lti_launches_retention_months")
+
+        with registry["sqlalchemy.engine"].begin() as connection:
+            created, removed, removed_default_rows = LtiLaunches.partitions.maintain(
+                connection,
+                date.today(),
+                retention_months=int(retention_months) if retention_months else None,
+                archive_dir=settings.get("lti_launches_archive_dir"),
+            )
+
+        for month in created:
+            print(f"Created {LtiLaunches.partitions.name(month)}")
+        for month in removed:
+            print(f"Removed {LtiLaunches.partitions.name(month)}")
+        if removed_default_rows:
+            print(
+                f"Removed {removed_default_rows} rows from "
+                f"{LtiLaunches.partitions.default}"
+            )
+
+
+if __name__ == "__main__":
+    maintain()
@@ -72,9 +72,40 @@ def configure(settings):
         "admin_auth_google_client_secret": sg.get("ADMIN_AUTH_GOOGLE_CLIENT_SECRET"),
         "blackboard_api_client_id": sg.get("BLACKBOARD_API_CLIENT_ID"),
         "blackboard_api_client_secret": sg.get("BLACKBOARD_API_CLIENT_SECRET"),
+        # Outbound HTTP connection pooling, see lms.services.http.HTTPTransport.
+        # The maximum number of connections to keep open to each host.
+        "http_pool_maxsize": sg.get("HTTP_POOL_MAXSIZE"),
+        # Whether to wait for a free connection (rather than opening an extra
+        # one) when all the connections to a host are in use.
+        "http_pool_block": sg.get("HTTP_POOL_BLOCK"),
+        # Whether to keep connections open between requests.
+        "http_keep_alive": sg.get("HTTP_KEEP_ALIVE"),
+        # How long (in seconds) to re-use connections for. 0 means forever.
+        "http_connection_max_age": sg.get("HTTP_CONNECTION_MAX_AGE"),
+        # How long (in seconds) to cache temporary public file URLs from LMS
+        # APIs for, when the URLs don't say when they expire.
+        "public_url_cache_ttl": sg.get("PUBLIC_URL_CACHE_TTL"),
+        # How long (in seconds) to skip syncing the same user and course data
+        # to h again after a launch has synced it.
+        "h_sync_fingerprint_ttl": sg.get("H_SYNC_FINGERPRINT_TTL"),
+        # How long (in seconds) to wait for concurrent syncs to h to send in
+        # the same bulk API call. Unset to send each sync straight away.
+        # Only syncs in the same process are combined, so only set this with
+        # threaded workers: with gunicorn's default (sync) workers it just
+        # delays every sync.
+        "h_bulk_coalesce_window": sg.get("H_BULK_COALESCE_WINDOW"),
+        # Whether launches queue their syncs to h for bin/h_sync_worker.py to
+        # send (where they can) instead of waiting for h.
+        "h_sync_deferred": sg.get("H_SYNC_DEFERRED", default=False),
+        # How many months of LTI launches to keep (before this month) when
+        # bin/lti_launches_maintenance.py runs. Unset to keep them forever.
+        "lti_launches_retention_months": sg.get("LTI_LAUNCHES_RETENTION_MONTHS"),
+        # A directory to export removed months of LTI launches to.
+        "lti_launches_archive_dir": sg.get("LTI_LAUNCHES_ARCHIVE_DIR"),
     }
 
     env_settings["dev"] = asbool(env_settings["dev"])
+    env_settings["h_sync_deferred"] = asbool(env_settings["h_sync_deferred"])
 
     database_url = sg.get("DATABASE_URL")
     if database_url:
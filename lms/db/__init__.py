@@ -11,8 +11,18 @@ from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.orm.properties import ColumnProperty
 
 from lms.db._bulk_action import BulkAction
-
-__all__ = ("BASE", "init", "BulkAction")
+from lms.db._partitions import MonthlyPartitions
+from lms.db._query_stats import QueryStats, collect_query_stats, instrument
+
+__all__ = (
+    "BASE",
+    "init",
+    "BulkAction",
+    "MonthlyPartitions",
+    "QueryStats",
+    "collect_query_stats",
+    "instrument",
+)
 
 
 LOG = logging.getLogger(__name__)
@@ -167,6 +177,8 @@ def includeme(config):
     # Create the SQLAlchemy engine and save a reference in the app registry.
     engine = make_engine(config.registry.settings)
     config.registry["sqlalchemy.engine"] = engine
+    # Count each request's statements (see lms.tweens.query_stats_tween_factory).
+    instrument(engine)
 
     if config.registry.settings["dev"]:  # pragma: nocover
         init(engine)
@@ -11,12 +11,15 @@ Why is this here, rather than services?
 For more see: https://stackoverflow.com/c/hypothesis/questions/477
 """
 
-from copy import deepcopy
+import json
 from dataclasses import dataclass
+from io import StringIO
+from itertools import chain, islice
 from typing import List
 
-from sqlalchemy import inspect
+from sqlalchemy import Column, MetaData, Table, inspect, or_, select
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Select
 from zope.sqlalchemy import mark_changed
 
 
@@ -55,6 +58,15 @@ class BulkAction:
         upsert_use_onupdate: bool = True
         """Column to update with the current datetime"""
 
+        upsert_only_changed: bool = False
+        """
+        Only update matching rows if an update element has changed.
+
+        Unchanged rows aren't written at all (so their onupdate columns
+        aren't updated either), aren't counted in upsert()'s return value and
+        aren't returned by `returning=True`.
+        """
+
         def __set_name__(self, owner, name):
             if name != "BULK_CONFIG":
                 raise ValueError(
@@ -62,14 +74,58 @@ class BulkAction:
                     "the name 'BULK_CONFIG'"
                 )
 
-    def upsert(self, model_class, values):
+    DEFAULT_CHUNK_SIZE = 1000
+    """The default maximum number of rows to upsert per INSERT statement."""
+
+    MAX_PARAMETERS = 65535
+    """PostgreSQL's limit on the number of bind parameters in one statement."""
+
+    COPY_CHUNK_SIZE = 10000
+    """The number of rows to send to the DB per COPY when `copy=True`."""
+
+    # pylint:disable=too-many-arguments
+    def upsert(
+        self,
+        model_class,
+        values,
+        returning=False,
+        update_elements=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        copy=False,
+    ):
         """
         Create or update the specified values in the table.
 
+        `values` is read lazily and upserted in chunks of `chunk_size` rows,
+        one INSERT ... ON CONFLICT statement per chunk, so that big batches
+        don't have to be held in memory as a single statement or exceed
+        PostgreSQL's bind parameter limit. The dicts in `values` aren't
+        modified or copied.
+
+        With `copy=True` the rows are instead streamed into a temporary
+        staging table with COPY and merged into the model's table with a
+        single INSERT ... SELECT ... ON CONFLICT statement. This is much faster
+        for very large batches.
+
         :param model_class: The model type to upsert
-        :param values: Dicts of values to upsert
+        :param values: Dicts of values to upsert. This can be any iterable
+            (including a generator) and every dict must have the same keys
+        :param returning: Return the inserted and updated rows as
+            `model_class` objects (in no particular order) instead of the
+            number of rows
+        :param update_elements: Columns to update when a match is found
+            (defaults to the model's `upsert_update_elements`)
+        :param chunk_size: The maximum number of rows per INSERT statement.
+            This is lowered if needed to keep within the bind parameter limit
+        :param copy: Upsert the rows via a staging table and COPY
+        :return: The number of rows inserted or updated, or a list of the
+            model objects if `returning` is true (see also
+            `Config.upsert_only_changed`)
         """
-        if not values:
+        rows = iter(values)
+        first_row = next(rows, None)
+
+        if first_row is None:
             # Don't attempt to upsert an empty list of values into the DB.
             #
             # This would be worse than pointless: it would actually crash in
@@ -85,51 +141,143 @@ class BulkAction:
             # default values for all of the columns. If my_table has a column
             # with a NOT NULLABLE constraint and no default value this will
             # cause a "null value violates not-null constraint" crash.
-            return []
+            return [] if returning else 0
 
+        rows = chain([first_row], rows)
+        on_conflict = self._on_conflict(model_class, update_elements)
+
+        if copy:
+            results = [
+                self._execute(
+                    model_class,
+                    self._copy_to_staging_table(model_class, list(first_row), rows),
+                    on_conflict,
+                    returning,
+                )
+            ]
+        else:
+            chunk_size = min(chunk_size, self.MAX_PARAMETERS // len(first_row))
+            results = [
+                self._execute(
+                    model_class,
+                    insert(model_class).values(chunk),
+                    on_conflict,
+                    returning,
+                )
+                for chunk in _chunks(rows, chunk_size)
+            ]
+
+        # Let SQLAlchemy know that something has changed, otherwise it will
+        # never commit the transaction we are working on and it will get rolled
+        # back
+        mark_changed(self._session)
+
+        if returning:
+            return [obj for result in results for obj in result]
+
+        return sum(results)
+
+    def _on_conflict(self, model_class, update_elements):
+        """Return the ON CONFLICT DO UPDATE arguments for rows that already exist."""
         config = model_class.BULK_CONFIG
+        excluded = insert(model_class).excluded
 
-        upsert_update_elements = list(config.upsert_update_elements)
+        if update_elements is None:
+            update_elements = config.upsert_update_elements
 
-        if config.upsert_use_onupdate:
-            onupdate_columns = self._get_columns_onupdate(model_class)
+        set_ = {element: getattr(excluded, element) for element in update_elements}
 
-            for column_name, onupdate_value in onupdate_columns:
-                upsert_update_elements.append(column_name)
+        where = None
+        if config.upsert_only_changed:
+            table = inspect(model_class).local_table
+            where = or_(
+                *[
+                    table.c[element].is_distinct_from(getattr(excluded, element))
+                    for element in update_elements
+                ]
+            )
 
+        if config.upsert_use_onupdate:
+            for column_name, onupdate_value in self._get_columns_onupdate(model_class):
                 # SQL alchemy wraps functions passed to onupdate or default and
                 # could potentially take a "context" argument getting a
                 # suitable context at this point of the execution it's not
                 # possible so we don't support it so we just pass None
                 # https://docs.sqlalchemy.org/en/14/core/defaults.html#context-sensitive-default-functions
-                default_value = (
-                    onupdate_value(None) if callable(onupdate_value) else onupdate_value
-                )
+                if callable(onupdate_value):
+                    onupdate_value = onupdate_value(None)
+                elif isinstance(onupdate_value, Select):
+                    onupdate_value = onupdate_value.scalar_subquery()
 
-                # Copy the values, we don't want to mess with the caller's data
-                values = deepcopy(values)
-                for row in values:
-                    row[column_name] = default_value
+                set_[column_name] = onupdate_value
 
-        stmt = insert(model_class).values(values)
-        stmt = stmt.on_conflict_do_update(
+        return {
             # The columns to use to find matching rows.
-            index_elements=config.upsert_index_elements,
+            "index_elements": config.upsert_index_elements,
             # The columns to update.
-            set_={
-                element: getattr(stmt.excluded, element)
-                for element in upsert_update_elements
-            },
+            "set_": set_,
+            # Which of the matching rows to update.
+            "where": where,
+        }
+
+    def _execute(self, model_class, stmt, on_conflict, returning):
+        stmt = stmt.on_conflict_do_update(**on_conflict)
+
+        if returning:
+            # Read the rows back from the upsert itself rather than with
+            # another query. populate_existing refreshes any of the objects
+            # that are already in the session.
+            return (
+                self._session.execute(
+                    select(model_class)
+                    .from_statement(stmt.returning(*inspect(model_class).local_table.c))
+                    .execution_options(populate_existing=True)
+                )
+                .scalars()
+                .all()
+            )
+
+        return self._session.execute(stmt).rowcount
+
+    def _copy_to_staging_table(self, model_class, columns, rows):
+        """
+        COPY `rows` into a new temporary table.
+
+        Return an INSERT statement that inserts the rows from the temporary
+        table into `model_class`'s table.
+        """
+        table = inspect(model_class).local_table
+        connection = self._session.connection()
+        quote = connection.dialect.identifier_preparer.quote
+
+        staging_table = Table(
+            f"bulk_upsert_{table.name}",
+            MetaData(),
+            *[Column(column, table.c[column].type) for column in columns],
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
         )
+        staging_table.drop(connection, checkfirst=True)
+        staging_table.create(connection)
 
-        result = self._session.execute(stmt)
+        copy_sql = (
+            f"COPY {quote(staging_table.name)} "
+            f"({', '.join(quote(column) for column in columns)}) FROM STDIN"
+        )
+        cursor = connection.connection.cursor()
 
-        # Let SQLAlchemy know that something has changed, otherwise it will
-        # never commit the transaction we are working on and it will get rolled
-        # back
-        mark_changed(self._session)
+        for chunk in _chunks(rows, self.COPY_CHUNK_SIZE):
+            cursor.copy_expert(
+                copy_sql,
+                StringIO(
+                    "".join(
+                        "\t".join(_copy_text(row[column]) for column in columns) + "\n"
+                        for row in chunk
+                    )
+                ),
+            )
 
-        return result
+        return insert(model_class).from_select(columns, select(staging_table))
 
     @staticmethod
     def _get_columns_onupdate(model_class):
@@ -137,3 +285,27 @@ class BulkAction:
         model_details = inspect(model_class)
 
         return [(c.name, c.onupdate.arg) for c in model_details.c if c.onupdate]
+
+
+def _chunks(iterable, size):
+    """Yield lists of up to `size` consecutive items from `iterable`."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(value):
+    """Return `value` formatted as a field of COPY's text format."""
+    if value is None:
+        return "\\N"
+
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+
+    return str(value).translate(_COPY_ESCAPES)
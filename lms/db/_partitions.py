@@ -0,0 +1,231 @@
+"""
+Maintenance of tables that are range partitioned by month.
+
+A partitioned table has one partition per calendar month (named
+<table>_yYYYYmMM) and a default partition (<table>_default) for rows that
+don't belong in any of the monthly ones. Partitions have to be created before
+the rows for their months arrive and old months can be detached, exported and
+dropped instead of being DELETEd. Only the few rows in the default partition
+are ever DELETEd.
+"""
+import gzip
+import re
+from datetime import date
+from pathlib import Path
+
+import sqlalchemy as sa
+
+
+class MonthlyPartitions:
+    """The monthly partitions of a partitioned table."""
+
+    def __init__(self, table):
+        """
+        Initialize object.
+
+        :param table: The partitioned sqlalchemy Table. It must be declared
+            with `postgresql_partition_by="RANGE (<column>)"`
+        """
+        self.table = table
+        self.default = f"{table.name}_default"
+
+    def create_default_ddl(self):
+        """Return the DDL that creates the default partition."""
+        return sa.DDL(
+            f"CREATE TABLE {self.default} PARTITION OF {self.table.name} DEFAULT"
+        )
+
+    def name(self, month):
+        """Return the name of the partition for `month`."""
+        return f"{self.table.name}_y{month.year:04}m{month.month:02}"
+
+    def months(self, connection):
+        """Return the months that currently have partitions, in order."""
+        names = connection.execute(
+            sa.text(
+                """
+                SELECT child.relname FROM pg_inherits
+                JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+                JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+                WHERE parent.relname = :table
+                """
+            ),
+            {"table": self.table.name},
+        ).scalars()
+
+        pattern = re.compile(rf"{re.escape(self.table.name)}_y(\d{{4}})m(\d{{2}})")
+        months = []
+        for name in names:
+            match = pattern.fullmatch(name)
+            if match:
+                months.append(date(int(match[1]), int(match[2]), 1))
+
+        return sorted(months)
+
+    def create(self, connection, month):
+        """
+        Create the partition for `month` if it doesn't exist.
+
+        Any rows for `month` in the default partition are moved into it.
+        """
+        if month in self.months(connection):
+            return
+
+        name = self.name(month)
+        start, end = month, add_months(month, 1)
+        bounds = {"start": start, "end": end}
+
+        connection.execute(
+            sa.text(
+                f"CREATE TABLE {name} "
+                f"(LIKE {self.table.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        connection.execute(
+            sa.text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {self.default}
+                    WHERE {self._column} >= :start AND {self._column} < :end
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ),
+            bounds,
+        )
+        connection.execute(
+            sa.text(
+                f"ALTER TABLE {self.table.name} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+
+    # pylint:disable=too-many-arguments
+    def maintain(
+        self, connection, today, months_ahead=3, retention_months=None, archive_dir=None
+    ):
+        """
+        Create future partitions and remove expired ones.
+
+        :param connection: The DB connection to run the DDL on
+        :param today: The current date
+        :param months_ahead: How many months after this one to create
+            partitions for
+        :param retention_months: Keep the partitions for this month and this
+            many months before it and remove older ones, and the rows from
+            before then in the default partition (None to keep them all)
+        :param archive_dir: Export removed partitions and rows to gzipped CSV
+            files in this directory before removing them (None to just remove
+            them)
+        :return: The months that were created, the ones that were removed and
+            the number of rows removed from the default partition
+        """
+        this_month = today.replace(day=1)
+        existing = self.months(connection)
+
+        created = [
+            month
+            for month in (add_months(this_month, i) for i in range(months_ahead + 1))
+            if month not in existing
+        ]
+        for month in created:
+            self.create(connection, month)
+
+        removed = []
+        removed_default_rows = 0
+        if retention_months is not None:
+            oldest = add_months(this_month, -int(retention_months))
+            removed = [month for month in existing if month < oldest]
+            removed_default_rows = self.expire_default(
+                connection,
+                oldest,
+                path=_archive_path(
+                    archive_dir, f"{self.default}_before_{oldest:y%Ym%m}"
+                ),
+            )
+
+        for month in removed:
+            self.detach(connection, month)
+            path = _archive_path(archive_dir, self.name(month))
+            if path is not None:
+                self.export(connection, month, path)
+            self.drop(connection, month)
+
+        return created, removed, removed_default_rows
+
+    def expire_default(self, connection, before, path=None):
+        """
+        Remove the rows from before the month `before` from the default partition.
+
+        Rows that are older than all of the monthly partitions (for example
+        launches that were copied over without a created time) are in the
+        default partition, and don't go when monthly partitions are removed.
+
+        :param connection: The DB connection to delete the rows with
+        :param before: The first month to keep the rows of
+        :param path: Export the rows to this gzipped CSV file before deleting
+            them (None to just delete them)
+        :return: The number of rows that were removed
+        """
+        where = f"{self._column} < '{before.isoformat()}'"
+
+        if not connection.execute(
+            sa.text(f"SELECT count(*) FROM {self.default} WHERE {where}")
+        ).scalar():
+            return 0
+
+        if path is not None:
+            self._copy_to_csv(
+                connection,
+                f"(SELECT * FROM {self.default} WHERE {where} ORDER BY {self._column})",
+                path,
+            )
+
+        return connection.execute(
+            sa.text(f"DELETE FROM {self.default} WHERE {where}")
+        ).rowcount
+
+    def detach(self, connection, month):
+        """Detach the partition for `month` (so that it's a table on its own)."""
+        connection.execute(
+            sa.text(
+                f"ALTER TABLE {self.table.name} DETACH PARTITION {self.name(month)}"
+            )
+        )
+
+    def export(self, connection, month, path):
+        """Write the rows of the (detached) partition for `month` to a gzipped CSV file."""
+        self._copy_to_csv(connection, self.name(month), path)
+
+    def drop(self, connection, month):
+        """Drop the (detached) partition for `month`."""
+        connection.execute(sa.text(f"DROP TABLE {self.name(month)}"))
+
+    @staticmethod
+    def _copy_to_csv(connection, source, path):
+        # `source` is a table name or a parenthesized SELECT.
+        cursor = connection.connection.cursor()
+
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            cursor.copy_expert(
+                f"COPY {source} TO STDOUT WITH (FORMAT csv, HEADER)", file
+            )
+
+    @property
+    def _column(self):
+        # The column in "RANGE (<column>)".
+        return re.fullmatch(
+            r"RANGE \((\w+)\)", self.table.dialect_options["postgresql"]["partition_by"]
+        )[1]
+
+
+def add_months(month, months):
+    """Return the first day of the month `months` after `month`."""
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _archive_path(archive_dir, name):
+    """Return the path to export `name` to in `archive_dir` (or None)."""
+    return None if archive_dir is None else Path(archive_dir) / f"{name}.csv.gz"
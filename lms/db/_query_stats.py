@@ -0,0 +1,93 @@
+"""
+Counting the SQL statements that a piece of code (for example a request) runs.
+
+    with collect_query_stats() as stats:
+        ...
+
+    stats.statements  # The number of statements that were executed
+    stats.duration  # How long they took in total (in seconds)
+    stats.repeated()  # Statements that were executed more than once
+
+Statements are counted for all the engines that have been instrumented with
+`instrument()`. Statements are compared by their SQL (with placeholders for
+the parameters) so running the same query for lots of different rows (an
+"N+1" query) shows up as one repeated statement.
+
+Blocks can be nested: statements executed in an inner block are counted by
+the blocks around it too.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import sqlalchemy as sa
+
+# The stats of all the collect_query_stats() blocks that are currently active.
+_CURRENT = ContextVar("query_stats", default=())
+
+
+class QueryStats:
+    """The statements executed while collecting stats."""
+
+    def __init__(self):
+        self.statements = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def add(self, statement, duration):
+        """Count one execution of `statement` that took `duration` seconds."""
+        self.statements += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def repeated(self, min_count=2):
+        """Return the statements executed at least `min_count` times and their counts."""
+        return {
+            statement: count
+            for statement, count in self.shapes.most_common()
+            if count >= min_count
+        }
+
+    def __str__(self):
+        repeats = max(self.shapes.values(), default=0)
+        return (
+            f"statements={self.statements}; "
+            f"time_ms={self.duration * 1000:.1f}; "
+            f"max_repeats={repeats}"
+        )
+
+
+@contextmanager
+def collect_query_stats():
+    """Collect stats for the statements executed in the `with` block."""
+    stats = QueryStats()
+    token = _CURRENT.set(_CURRENT.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _CURRENT.reset(token)
+
+
+def instrument(engine):
+    """Count the statements executed by `engine` in `collect_query_stats()`."""
+    if sa.event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    sa.event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    sa.event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _many):
+    if _CURRENT.get():
+        conn.info["query_stats.start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _many):
+    start = conn.info.pop("query_stats.start", None)
+
+    if start is not None:
+        duration = time.perf_counter() - start
+
+        for stats in _CURRENT.get():
+            stats.add(statement, duration)
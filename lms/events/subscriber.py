@@ -1,3 +1,4 @@
+import logging
 from dataclasses import dataclass
 from typing import List
 
@@ -6,6 +7,8 @@ from pyramid.request import Request
 
 from lms.models.file import File
 
+LOG = logging.getLogger(__name__)
+
 
 @dataclass
 class FilesDiscoveredEvent:
@@ -24,4 +27,6 @@ def files_discovered(event):
     for value in event.values:
         value["application_instance_id"] = application_instance.id
 
-    event.request.db.bulk.upsert(File, values=event.values)
+    count = event.request.db.bulk.upsert(File, values=event.values)
+
+    LOG.debug("%d of %d discovered files were new or changed", count, len(event.values))
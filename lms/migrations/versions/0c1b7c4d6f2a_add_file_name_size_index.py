@@ -0,0 +1,25 @@
+"""
+Add an index for finding files by course, name and size.
+
+Revision ID: 0c1b7c4d6f2a
+Revises: d9c9e65c463e
+Create Date: 2021-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0c1b7c4d6f2a"
+down_revision = "d9c9e65c463e"
+
+
+def upgrade():
+    op.create_index(
+        "ix__file_application_instance_id_course_id_name_size",
+        "file",
+        ["application_instance_id", "course_id", "name", "size"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix__file_application_instance_id_course_id_name_size", "file")
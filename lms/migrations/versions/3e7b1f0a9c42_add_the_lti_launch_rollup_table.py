@@ -0,0 +1,36 @@
+"""
+Add the lti_launch_rollup table.
+
+Run bin/backfill_lti_launch_rollup.py after this to count the existing
+launches.
+
+Revision ID: 3e7b1f0a9c42
+Revises: 9a4f8e2c7d15
+Create Date: 2021-10-20 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3e7b1f0a9c42"
+down_revision = "9a4f8e2c7d15"
+
+
+def upgrade():
+    op.create_table(
+        "lti_launch_rollup",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("lti_key", sa.Unicode(), nullable=False),
+        sa.Column("context_id", sa.Unicode(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("launches", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__lti_launch_rollup")),
+        sa.UniqueConstraint(
+            "lti_key", "context_id", "day", name=op.f("uq__lti_launch_rollup__lti_key")
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("lti_launch_rollup")
@@ -0,0 +1,25 @@
+"""
+Add a version column to application_instances.
+
+Revision ID: 5b9d8a0c2e31
+Revises: 0c1b7c4d6f2a
+Create Date: 2021-10-18 15:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b9d8a0c2e31"
+down_revision = "0c1b7c4d6f2a"
+
+
+def upgrade():
+    op.add_column(
+        "application_instances",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("application_instances", "version")
@@ -0,0 +1,139 @@
+"""
+Partition lti_launches by month.
+
+Replaces lti_launches with a copy that's range partitioned on created, with
+one partition per month (lti_launches_yYYYYmMM) from the month of the oldest
+launch to three months from now and a default partition.
+
+The new table is committed before the old launches are copied over, so new
+launches are recorded while the copy runs. The old launches are copied in
+batches of BATCH_SIZE, each committed on its own, so neither table is locked
+for long. Reports won't include the launches that haven't been copied yet.
+If the copy is interrupted the old table (lti_launches_unpartitioned) is
+left behind and the copy has to be finished by hand. Downgrading copies the
+launches back the same way, and loses any launches recorded while it runs.
+
+bin/lti_launches_maintenance.py creates the partitions for later months.
+
+Revision ID: 7c2d5e8f1a64
+Revises: 3e7b1f0a9c42
+Create Date: 2021-10-21 10:00:00.000000
+
+"""
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c2d5e8f1a64"
+down_revision = "3e7b1f0a9c42"
+
+
+MONTHS_AHEAD = 3
+BATCH_SIZE = 10000
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    op.execute("ALTER TABLE lti_launches RENAME TO lti_launches_unpartitioned")
+    op.execute(
+        "ALTER TABLE lti_launches_unpartitioned "
+        "RENAME CONSTRAINT pk__lti_launches TO pk__lti_launches_unpartitioned"
+    )
+    op.execute(
+        """
+        CREATE TABLE lti_launches (
+            id INTEGER NOT NULL DEFAULT nextval('lti_launches_id_seq'),
+            created TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            context_id VARCHAR,
+            lti_key VARCHAR,
+            CONSTRAINT pk__lti_launches PRIMARY KEY (id, created)
+        ) PARTITION BY RANGE (created)
+        """
+    )
+    op.execute("ALTER SEQUENCE lti_launches_id_seq OWNED BY lti_launches.id")
+    op.execute("CREATE TABLE lti_launches_default PARTITION OF lti_launches DEFAULT")
+
+    this_month = date.today().replace(day=1)
+    first_month = conn.execute(
+        sa.text("SELECT min(created)::date FROM lti_launches_unpartitioned")
+    ).scalar()
+    month = (first_month or this_month).replace(day=1)
+
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE lti_launches_y{month.year:04}m{month.month:02} "
+            "PARTITION OF lti_launches "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    with op.get_context().autocommit_block():
+        _copy_in_batches(
+            conn,
+            source="lti_launches_unpartitioned",
+            target="lti_launches",
+            # Launches without a created time (there shouldn't be any) go into
+            # the default partition.
+            created="COALESCE(created, 'epoch')",
+        )
+
+    op.drop_table("lti_launches_unpartitioned")
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    op.execute(
+        """
+        CREATE TABLE lti_launches_unpartitioned (
+            id INTEGER NOT NULL DEFAULT nextval('lti_launches_id_seq'),
+            created TIMESTAMP WITHOUT TIME ZONE,
+            context_id VARCHAR,
+            lti_key VARCHAR,
+            CONSTRAINT pk__lti_launches_unpartitioned PRIMARY KEY (id)
+        )
+        """
+    )
+    with op.get_context().autocommit_block():
+        _copy_in_batches(
+            conn, source="lti_launches", target="lti_launches_unpartitioned"
+        )
+    op.execute(
+        "ALTER SEQUENCE lti_launches_id_seq OWNED BY lti_launches_unpartitioned.id"
+    )
+    # This drops all of the partitions too.
+    op.drop_table("lti_launches")
+    op.execute("ALTER TABLE lti_launches_unpartitioned RENAME TO lti_launches")
+    op.execute(
+        "ALTER TABLE lti_launches "
+        "RENAME CONSTRAINT pk__lti_launches_unpartitioned TO pk__lti_launches"
+    )
+
+
+def _copy_in_batches(conn, source, target, created="created"):
+    # Rows are copied in ranges of ids, and each INSERT is committed on its
+    # own (this runs in an autocommit block).
+    max_id = conn.execute(sa.text(f"SELECT max(id) FROM {source}")).scalar()
+    start = conn.execute(sa.text(f"SELECT min(id) FROM {source}")).scalar()
+
+    while start is not None and start <= max_id:
+        conn.execute(
+            sa.text(
+                f"""
+                INSERT INTO {target} (id, created, context_id, lti_key)
+                SELECT id, {created}, context_id, lti_key FROM {source}
+                WHERE id >= :start AND id < :end
+                """
+            ),
+            {"start": start, "end": start + BATCH_SIZE},
+        )
+        start += BATCH_SIZE
+
+
+def _add_months(month, months):
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
@@ -0,0 +1,90 @@
+"""
+Move group_info.info["instructors"] into a group_info_instructor table.
+
+Revision ID: 9a4f8e2c7d15
+Revises: 5b9d8a0c2e31
+Create Date: 2021-10-19 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9a4f8e2c7d15"
+down_revision = "5b9d8a0c2e31"
+
+
+def upgrade():
+    op.create_table(
+        "group_info_instructor",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("group_info_id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.UnicodeText(), nullable=False),
+        sa.Column("email", sa.UnicodeText(), nullable=True),
+        sa.Column("display_name", sa.UnicodeText(), nullable=True),
+        sa.Column("provider", sa.UnicodeText(), nullable=True),
+        sa.Column("provider_unique_id", sa.UnicodeText(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["group_info_id"],
+            ["group_info.id"],
+            name=op.f("fk__group_info_instructor__group_info_id__group_info"),
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__group_info_instructor")),
+        sa.UniqueConstraint(
+            "group_info_id",
+            "username",
+            name=op.f("uq__group_info_instructor__group_info_id"),
+        ),
+    )
+
+    op.execute(
+        """
+        INSERT INTO group_info_instructor (
+            group_info_id, username, email, display_name, provider, provider_unique_id
+        )
+        SELECT DISTINCT ON (group_info.id, instructor->>'username')
+            group_info.id,
+            instructor->>'username',
+            instructor->>'email',
+            instructor->>'display_name',
+            instructor->>'provider',
+            instructor->>'provider_unique_id'
+        FROM group_info,
+            jsonb_array_elements(group_info.info->'instructors') AS instructor
+        WHERE jsonb_typeof(group_info.info->'instructors') = 'array'
+          AND instructor->>'username' IS NOT NULL
+        ORDER BY group_info.id, instructor->>'username'
+        """
+    )
+    op.execute(
+        "UPDATE group_info SET info = info - 'instructors' WHERE info ? 'instructors'"
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        UPDATE group_info SET info = COALESCE(info, '{}'::jsonb) || jsonb_build_object(
+            'instructors',
+            COALESCE(
+                (
+                    SELECT jsonb_agg(
+                        jsonb_build_object(
+                            'username', username,
+                            'email', email,
+                            'display_name', display_name,
+                            'provider', provider,
+                            'provider_unique_id', provider_unique_id
+                        )
+                        ORDER BY id
+                    )
+                    FROM group_info_instructor
+                    WHERE group_info_instructor.group_info_id = group_info.id
+                ),
+                '[]'::jsonb
+            )
+        )
+        """
+    )
+    op.drop_table("group_info_instructor")
@@ -0,0 +1,50 @@
+"""
+Add the h_sync_job and h_synced_membership tables.
+
+Revision ID: b4e1d7a2c930
+Revises: 7c2d5e8f1a64
+Create Date: 2021-10-22 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = "b4e1d7a2c930"
+down_revision = "7c2d5e8f1a64"
+
+
+def upgrade():
+    op.create_table(
+        "h_sync_job",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column(
+            "created", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "run_after", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.UnicodeText(), nullable=True),
+        sa.Column("user", JSONB(), nullable=False),
+        sa.Column("groups", JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__h_sync_job")),
+    )
+    op.create_index(
+        op.f("ix__h_sync_job_run_after"), "h_sync_job", ["run_after"], unique=False
+    )
+    op.create_table(
+        "h_synced_membership",
+        sa.Column("username", sa.UnicodeText(), nullable=False),
+        sa.Column("authority_provided_id", sa.UnicodeText(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "username", "authority_provided_id", name=op.f("pk__h_synced_membership")
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("h_synced_membership")
+    op.drop_index(op.f("ix__h_sync_job_run_after"), table_name="h_sync_job")
+    op.drop_table("h_sync_job")
@@ -0,0 +1,28 @@
+"""
+Add an index on lis_result_sourcedid.h_username.
+
+Revision ID: e5a3c8f0b217
+Revises: b4e1d7a2c930
+Create Date: 2021-10-25 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a3c8f0b217"
+down_revision = "b4e1d7a2c930"
+
+
+def upgrade():
+    op.create_index(
+        op.f("ix__lis_result_sourcedid_h_username"),
+        "lis_result_sourcedid",
+        ["h_username"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix__lis_result_sourcedid_h_username"), table_name="lis_result_sourcedid"
+    )
@@ -6,10 +6,11 @@ from lms.models.course import LegacyCourse
 from lms.models.course_groups_exported_from_h import CourseGroupsExportedFromH
 from lms.models.file import File
 from lms.models.grading_info import GradingInfo
-from lms.models.group_info import GroupInfo
+from lms.models.group_info import GroupInfo, GroupInfoInstructor
 from lms.models.grouping import CanvasGroup, CanvasSection, Course, Grouping
+from lms.models.h_sync import HSyncedMembership, HSyncJob
 from lms.models.h_user import HUser
-from lms.models.lti_launches import LtiLaunches
+from lms.models.lti_launches import LtiLaunches, LtiLaunchRollup
 from lms.models.lti_user import LTIUser, display_name
 from lms.models.oauth2_token import OAuth2Token
 
@@ -71,6 +71,13 @@ class ApplicationInstance(BASE):
     #: See https://canvas.instructure.com/doc/api/file.tools_variable_substitutions.html
     custom_canvas_api_domain = sa.Column(sa.UnicodeText, nullable=True)
 
+    #: Incremented by every UPDATE of the row. Updates made to a stale copy of
+    #: an application instance (for example one from a cache) fail with
+    #: StaleDataError rather than overwriting newer changes.
+    version = sa.Column(sa.Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
     #: A list of all the OAuth2Tokens for this application instance
     #: (each token belongs to a different user of this application
     #: instance's LMS).
@@ -10,6 +10,15 @@ class File(CreatedUpdatedMixin, BASE):
     __tablename__ = "file"
     __table_args__ = (
         sa.UniqueConstraint("application_instance_id", "lms_id", "type", "course_id"),
+        # For finding copies of files in other courses (e.g. after a course
+        # copy) by their name and size.
+        sa.Index(
+            "ix__file_application_instance_id_course_id_name_size",
+            "application_instance_id",
+            "course_id",
+            "name",
+            "size",
+        ),
     )
 
     # Enable bulk actions
@@ -21,6 +30,9 @@ class File(CreatedUpdatedMixin, BASE):
             "course_id",
         ],
         upsert_update_elements=["name", "size"],
+        # Files are re-discovered every time a course's files are listed, and
+        # mostly they haven't changed.
+        upsert_only_changed=True,
     )
 
     id = sa.Column(sa.Integer(), autoincrement=True, primary_key=True)
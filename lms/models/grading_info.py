@@ -53,5 +53,6 @@ class GradingInfo(CreatedUpdatedMixin, BASE):
     resource_link_id = sa.Column(sa.UnicodeText(), nullable=False)
     # The "family" of LMS tool, e.g. "BlackboardLearn" or "canvas"
     tool_consumer_info_product_family_code = sa.Column(sa.UnicodeText(), nullable=True)
-    h_username = sa.Column(sa.UnicodeText(), nullable=False)
+    # Indexed for looking up display names by username.
+    h_username = sa.Column(sa.UnicodeText(), nullable=False, index=True)
     h_display_name = sa.Column(sa.UnicodeText(), nullable=False)
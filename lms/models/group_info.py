@@ -2,9 +2,9 @@ import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict
 
-from lms.db import BASE
+from lms.db import BASE, BulkAction
 
-__all__ = ["GroupInfo"]
+__all__ = ["GroupInfo", "GroupInfoInstructor"]
 
 
 class GroupInfo(BASE):
@@ -19,6 +19,12 @@ class GroupInfo(BASE):
 
     __tablename__ = "group_info"
 
+    # Enable bulk actions
+    BULK_CONFIG = BulkAction.Config(
+        upsert_index_elements=["authority_provided_id"],
+        upsert_update_elements=["consumer_key", "info"],
+    )
+
     id = sa.Column(sa.Integer(), autoincrement=True, primary_key=True)
 
     #: The authority_provided_id of the group in h.
@@ -84,6 +90,14 @@ class GroupInfo(BASE):
     #: A dict of info about this group.
     _info = sa.Column("info", MutableDict.as_mutable(JSONB))
 
+    #: The instructors who have launched this group.
+    instructors = sa.orm.relationship(
+        "GroupInfoInstructor",
+        order_by="GroupInfoInstructor.id",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
     @property
     def _safe_info(self):
         if self._info is None:
@@ -92,48 +106,51 @@ class GroupInfo(BASE):
         return self._info
 
     @property
-    def instructors(self):
-        """
-        Return the list of instructors associated with this course.
+    def type(self):
+        return self._safe_info.get("type", None)
 
-        Warning: if you mutate this list your changes **will not be saved**.
-        For example this change won't be saved to the DB:
+    @type.setter
+    def type(self, new_type):
+        self._safe_info["type"] = new_type
 
-            group_info.instructors.append(new_instructor)
 
-        Instead you should always assign to instructors rather than mutating it
-        in place:
+class GroupInfoInstructor(BASE):
+    """An instructor who has launched an LMS group (for metrics purposes)."""
 
-            group_info.instructors = new_list_of_instructors
+    __tablename__ = "group_info_instructor"
+    __table_args__ = (sa.UniqueConstraint("group_info_id", "username"),)
 
-        """
-        return self._safe_info.get("instructors", [])
+    # Enable bulk actions
+    BULK_CONFIG = BulkAction.Config(
+        upsert_index_elements=["group_info_id", "username"],
+        upsert_update_elements=[
+            "email",
+            "display_name",
+            "provider",
+            "provider_unique_id",
+        ],
+        upsert_only_changed=True,
+    )
 
-    @instructors.setter
-    def instructors(self, new_instructors):
-        self._safe_info["instructors"] = new_instructors
+    id = sa.Column(sa.Integer(), autoincrement=True, primary_key=True)
 
-    @property
-    def type(self):
-        return self._safe_info.get("type", None)
+    group_info_id = sa.Column(
+        sa.Integer(),
+        sa.ForeignKey("group_info.id", ondelete="cascade"),
+        nullable=False,
+    )
 
-    @type.setter
-    def type(self, new_type):
-        self._safe_info["type"] = new_type
+    #: The instructor's h username (see models.HUser).
+    username = sa.Column(sa.UnicodeText(), nullable=False)
 
-    def upsert_instructor(self, new_instructor):
-        updated_instructors = []
-        found = False
+    #: The instructor's email address from their last launch of the group.
+    email = sa.Column(sa.UnicodeText())
 
-        for existing_instructor in self.instructors:
-            if existing_instructor["username"] == new_instructor["username"]:
-                updated_instructors.append(new_instructor)
-                found = True
-            else:
-                updated_instructors.append(existing_instructor)
+    #: The instructor's h display name from their last launch of the group.
+    display_name = sa.Column(sa.UnicodeText())
 
-        if not found:
-            updated_instructors.append(new_instructor)
+    #: The instructor's h identity provider (see models.HUser).
+    provider = sa.Column(sa.UnicodeText())
 
-        if updated_instructors != self.instructors:
-            self.instructors = updated_instructors
+    #: The instructor's h identity provider unique ID (see models.HUser).
+    provider_unique_id = sa.Column(sa.UnicodeText())
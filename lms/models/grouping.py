@@ -2,7 +2,7 @@ import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict
 
-from lms.db import BASE
+from lms.db import BASE, BulkAction
 from lms.models import CreatedUpdatedMixin
 from lms.models.application_settings import ApplicationSettings
 
@@ -17,6 +17,12 @@ class Grouping(CreatedUpdatedMixin, BASE):
         sa.UniqueConstraint("lms_id", "application_instance_id", "parent_id", "type"),
     )
 
+    # Enable bulk actions
+    BULK_CONFIG = BulkAction.Config(
+        upsert_index_elements=["application_instance_id", "authority_provided_id"],
+        upsert_update_elements=["lms_name", "extra"],
+    )
+
     id = sa.Column(sa.Integer(), autoincrement=True, primary_key=True)
 
     application_instance_id = sa.Column(
@@ -0,0 +1,79 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, insert
+
+from lms.db import BASE
+
+
+class HSyncJob(BASE):
+    """
+    A pending sync of an LTI user and their groups to h.
+
+    Jobs are added by launches (see `lms.services.HSyncQueue`) and are
+    deleted once a worker has sent them to h.
+    """
+
+    __tablename__ = "h_sync_job"
+
+    id = sa.Column(sa.Integer, autoincrement=True, primary_key=True)
+    created = sa.Column(sa.DateTime(), server_default=sa.func.now(), nullable=False)
+
+    run_after = sa.Column(
+        sa.DateTime(), server_default=sa.func.now(), nullable=False, index=True
+    )
+    """When to (next) try the job. Pushed back each time it fails."""
+
+    attempts = sa.Column(sa.Integer, server_default="0", nullable=False)
+    """How many times sending the job to h has failed."""
+
+    last_error = sa.Column(sa.UnicodeText)
+
+    user = sa.Column(JSONB, nullable=False)
+    """The h user upsert attributes."""
+
+    groups = sa.Column(JSONB, nullable=False)
+    """The h group upsert attributes of each of the user's groups."""
+
+
+class HSyncedMembership(BASE):
+    """
+    An h user known to exist in h as a member of an h group.
+
+    Recorded when a launch syncs its user and groups to h. Later launches by
+    the same user in the same group can sync in the background because the
+    user, the group and the membership already exist.
+    """
+
+    __tablename__ = "h_synced_membership"
+
+    username = sa.Column(sa.UnicodeText, primary_key=True)
+    authority_provided_id = sa.Column(sa.UnicodeText, primary_key=True)
+
+    @classmethod
+    def record(cls, db, username, authority_provided_ids):
+        """Record that `username` is a member of each of the groups."""
+        if not authority_provided_ids:
+            return
+
+        db.execute(
+            insert(cls)
+            .values(
+                [
+                    {"username": username, "authority_provided_id": group_id}
+                    for group_id in authority_provided_ids
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+
+    @classmethod
+    def all_exist(cls, db, username, authority_provided_ids):
+        """Return True if `username` is recorded as a member of all the groups."""
+        authority_provided_ids = set(authority_provided_ids)
+
+        count = db.scalar(
+            sa.select(sa.func.count()).where(
+                cls.username == username,
+                cls.authority_provided_id.in_(authority_provided_ids),
+            )
+        )
+        return count == len(authority_provided_ids)
@@ -1,21 +1,136 @@
+from collections import Counter
 from datetime import datetime
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
 
-from lms.db import BASE
+from lms.db import BASE, MonthlyPartitions
 
 
 class LtiLaunches(BASE):
     """Track each LTI launch."""
 
     __tablename__ = "lti_launches"
+    # Partitioned by month (see `partitions` below) so that old launches can
+    # be removed without DELETEing them and the indexes don't grow forever.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created)"}
 
     id = sa.Column(sa.Integer, autoincrement=True, primary_key=True)
-    created = sa.Column(sa.TIMESTAMP, default=datetime.utcnow)
+    # Partitioned tables' primary keys must include the partition key.
+    created = sa.Column(sa.TIMESTAMP, default=datetime.utcnow, primary_key=True)
     context_id = sa.Column(sa.Unicode)
     lti_key = sa.Column(sa.Unicode)
 
     @classmethod
     def add(cls, db, context_id, oauth_consumer_key):
-        """Add a record of an LTI launch to the database."""
-        db.add(LtiLaunches(context_id=context_id, lti_key=oauth_consumer_key))
+        """
+        Add a record of an LTI launch to the database.
+
+        If `db` has an `LTILaunchRecorder` (as requests' DB sessions do) the
+        launch is buffered and written in bulk with other launches once `db`
+        commits. Otherwise it's added to `db`.
+        """
+        recorder = db.info.get("lti_launches.recorder")
+
+        if recorder is None:
+            launch = {
+                "created": datetime.utcnow(),
+                "context_id": context_id,
+                "lti_key": oauth_consumer_key,
+            }
+            db.add(LtiLaunches(**launch))
+            LtiLaunchRollup.increment(db, [launch])
+        else:
+            recorder.record(db, context_id, oauth_consumer_key)
+
+
+LtiLaunches.partitions = MonthlyPartitions(LtiLaunches.__table__)
+sa.event.listen(
+    LtiLaunches.__table__, "after_create", LtiLaunches.partitions.create_default_ddl()
+)
+
+
+class LtiLaunchRollup(BASE):
+    """
+    The number of LTI launches per consumer key, context and day.
+
+    This is kept up to date as launches are recorded (see `increment()`) so
+    that reports don't have to count every row in `lti_launches`.
+    """
+
+    MISSING = ""
+    """What launches without a consumer key or context ID are counted under."""
+
+    __tablename__ = "lti_launch_rollup"
+    __table_args__ = (sa.UniqueConstraint("lti_key", "context_id", "day"),)
+
+    id = sa.Column(sa.Integer, autoincrement=True, primary_key=True)
+    lti_key = sa.Column(sa.Unicode, nullable=False)
+    context_id = sa.Column(sa.Unicode, nullable=False)
+    day = sa.Column(sa.Date, nullable=False)
+    launches = sa.Column(sa.Integer, nullable=False)
+
+    @classmethod
+    def increment(cls, db, launches):
+        """
+        Add `launches` to the counts.
+
+        This must be done in the same transaction as the launches are
+        inserted into `lti_launches`.
+
+        :param db: The DB session or connection to update the counts with
+        :param launches: Dicts of `LtiLaunches` columns (including `created`)
+        """
+        counts = Counter(
+            (
+                launch["lti_key"] or cls.MISSING,
+                launch["context_id"] or cls.MISSING,
+                launch["created"].date(),
+            )
+            for launch in launches
+        )
+
+        if not counts:
+            return
+
+        stmt = insert(cls).values(
+            [
+                {
+                    "lti_key": lti_key,
+                    "context_id": context_id,
+                    "day": day,
+                    "launches": count,
+                }
+                for (lti_key, context_id, day), count in counts.items()
+            ]
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["lti_key", "context_id", "day"],
+                set_={"launches": cls.launches + stmt.excluded.launches},
+            )
+        )
+
+    @classmethod
+    def backfill(cls, db):
+        """
+        Rebuild all of the counts from the launches in `lti_launches`.
+
+        Launches can't be recorded until `db`'s transaction ends.
+        """
+        # Stop launches being recorded (and counted) while we count them.
+        db.execute(sa.text("LOCK TABLE lti_launches IN SHARE MODE"))
+        db.execute(sa.delete(cls))
+
+        day = sa.cast(LtiLaunches.created, sa.Date)
+        lti_key = sa.func.coalesce(LtiLaunches.lti_key, cls.MISSING)
+        context_id = sa.func.coalesce(LtiLaunches.context_id, cls.MISSING)
+
+        db.execute(
+            insert(cls).from_select(
+                ["lti_key", "context_id", "day", "launches"],
+                sa.select(lti_key, context_id, day, sa.func.count()).group_by(
+                    lti_key, context_id, day
+                ),
+            )
+        )
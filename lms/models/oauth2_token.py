@@ -69,3 +69,16 @@ class OAuth2Token(BASE):
         server_default=sa.func.now(),
         nullable=False,
     )
+
+    @property
+    def expires_at(self):
+        """
+        Return the time when `access_token` expires.
+
+        Returns None if the authorization server didn't tell us (no
+        `expires_in`).
+        """
+        if self.expires_in is None:
+            return None
+
+        return self.received_at + datetime.timedelta(seconds=self.expires_in)
@@ -1,8 +1,7 @@
-import functools
-
 from lms.models import GroupInfo, HUser
 from lms.resources._js_config.file_picker_config import FilePickerConfig
 from lms.services import HAPIError
+from lms.services.cache import memoize
 from lms.validation.authentication import BearerTokenSchema
 from lms.views.helpers import via_url
 
@@ -256,11 +255,10 @@ class JSConfig:
         self._hypothesis_client["focus"] = {"user": {"username": focused_user}}
 
         # Unfortunately we need to pass the user's current display name to the
-        # Hypothesis client, and we need to make a request to the h API to
-        # retrieve that display name.
+        # Hypothesis client, which may mean a request to the h API.
         try:
             display_name = (
-                self._request.find_service(name="h_api")
+                self._request.find_service(name="h_user")
                 .get_user(focused_user)
                 .display_name
             )
@@ -312,7 +310,7 @@ class JSConfig:
         return BearerTokenSchema(self._request).authorization_param(self._lti_user)
 
     @property
-    @functools.lru_cache()
+    @memoize
     def _config(self):
         """
         Return the current configuration dict.
@@ -332,7 +330,7 @@ class JSConfig:
         # earlier in the request processing pipeline and could change the error
         # response.
         #
-        # We cache this property (@functools.lru_cache()) so that it's
+        # We cache this property (@memoize) so that it's
         # mutable. You can do self._config["foo"] = "bar" and the mutation will
         # be preserved.
 
@@ -390,7 +388,7 @@ class JSConfig:
             }
 
     @property
-    @functools.lru_cache()
+    @memoize
     def _hypothesis_client(self):
         """
         Return the config object for the Hypothesis client.
@@ -406,7 +404,7 @@ class JSConfig:
         # earlier in the request processing pipeline and could change the error
         # response.
         #
-        # We cache this property (@functools.lru_cache()) so that it's
+        # We cache this property (@memoize) so that it's
         # mutable. You can do self._hypothesis_client["foo"] = "bar" and the
         # mutation will be preserved.
 
@@ -1,9 +1,9 @@
 """Traversal resources for LTI launch views."""
-import functools
 
 from lms.models._hashed_id import hashed_id
 from lms.resources._js_config import JSConfig
 from lms.services import ConsumerKeyError
+from lms.services.cache import memoize
 
 
 class LTILaunchResource:
@@ -26,8 +26,14 @@ class LTILaunchResource:
             name="application_instance"
         )
 
+    @memoize
     def get_or_create_course(self):
-        """Get the course this LTI launch based on the request's params."""
+        """
+        Get the course this LTI launch based on the request's params.
+
+        The course is only looked up once per request: later calls return the
+        same objects.
+        """
         course_service = self._request.find_service(name="course")
         params = self._request.parsed_params
 
@@ -93,7 +99,7 @@ class LTILaunchResource:
         return False
 
     @property
-    @functools.lru_cache()
+    @memoize
     def js_config(self):
         return JSConfig(self, self._request)
 
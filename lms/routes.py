@@ -79,6 +79,7 @@ def includeme(config):
     config.add_route("lti_api.submissions.record", "/api/lti/submissions")
     config.add_route("lti_api.result.read", "/api/lti/result", request_method="GET")
     config.add_route("lti_api.result.record", "/api/lti/result", request_method="POST")
+    config.add_route("lti_api.results.read", "/api/lti/results", request_method="POST")
 
     config.add_route("vitalsource_api.books.info", "/api/vitalsource/books/{book_id}")
     config.add_route(
@@ -161,22 +161,29 @@ def _get_lti_user(request):
     Return a models.LTIUser for the authenticated LTI user.
 
     Get the authenticated user from the validated LTI launch params or, failing
-    that, from one of our LTI bearer tokens (also validated).
+    that, from one of our LTI bearer tokens (also validated), or from an OAuth
+    2 state param.
+
+    Only the kinds of credentials that are actually present in the request
+    are validated.
 
     If the request doesn't contain either valid LTI launch params or a valid
     bearer token then return ``None``.
 
     :rtype: models.LTIUser
     """
-    bearer_token_schema = BearerTokenSchema(request)
-
-    schemas = [
-        LaunchParamsAuthSchema(request).lti_user,
-        partial(bearer_token_schema.lti_user, location="headers"),
-        partial(bearer_token_schema.lti_user, location="querystring"),
-        partial(bearer_token_schema.lti_user, location="form"),
-        OAuthCallbackSchema(request).lti_user,
-    ]
+    schemas = []
+
+    if "oauth_signature" in request.POST:
+        schemas.append(LaunchParamsAuthSchema(request).lti_user)
+
+    for location, authorization in _authorization_params(request):
+        schemas.append(
+            partial(BearerTokenSchema.cached_lti_user, request, location, authorization)
+        )
+
+    if "state" in request.params:
+        schemas.append(OAuthCallbackSchema(request).lti_user)
 
     for schema in schemas:
         try:
@@ -187,6 +194,21 @@ def _get_lti_user(request):
     return None
 
 
+def _authorization_params(request):
+    """Return the (location, value) of each bearer token param in `request`."""
+    params = [
+        ("headers", request.headers.get("Authorization")),
+        ("querystring", request.GET.get("authorization")),
+        ("form", request.POST.get("authorization")),
+    ]
+
+    return [
+        (location, value)
+        for location, value in params
+        if value and value.startswith("Bearer ")
+    ]
+
+
 def includeme(config):
     config.set_security_policy(SecurityPolicy(config.registry.settings["lms_secret"]))
     config.add_request_method(_get_lti_user, name="lti_user", property=True, reify=True)
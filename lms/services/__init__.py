@@ -16,9 +16,24 @@ from lms.services.exceptions import (
     ProxyAPIError,
     ServiceError,
 )
+from lms.services.http import HTTPTransport
 
 
 def includeme(config):
+    # A single pool of HTTP connections shared by every request that this
+    # process handles.
+    config.registry["http.transport"] = HTTPTransport.from_settings(
+        config.registry.settings
+    )
+    config.include("lms.services.application_instance")
+    config.include("lms.services.blackboard_api")
+    config.include("lms.services.canvas_api")
+    config.include("lms.services.h_api")
+    config.include("lms.services.h_user")
+    config.include("lms.services.lti_h")
+    config.include("lms.services.lti_launch_recorder")
+    config.include("lms.services.lti_outcomes")
+
     config.register_service_factory("lms.services.http.factory", name="http")
     config.register_service_factory(
         "lms.services.oauth_http.factory", name="oauth_http"
@@ -46,6 +61,10 @@ def includeme(config):
         "lms.services.group_info.GroupInfoService", name="group_info"
     )
     config.register_service_factory("lms.services.lti_h.LTIHService", name="lti_h")
+    config.register_service_factory(
+        "lms.services.h_sync_queue.factory", name="h_sync_queue"
+    )
+    config.register_service_factory("lms.services.h_user.factory", name="h_user")
     config.register_service_factory("lms.services.oauth1.OAuth1Service", name="oauth1")
     config.register_service_factory(
         "lms.services.course.course_service_factory", name="course"
@@ -1,15 +1,135 @@
-from functools import lru_cache
+import copy
+
+import sqlalchemy as sa
+from pyramid.events import NewRequest
 
 from lms.models import ApplicationInstance
 from lms.services import ConsumerKeyError
+from lms.services.cache import TTLCache, memoize
+
+
+class ApplicationInstanceCache:
+    """
+    Application instances shared by all the requests that a process handles.
+
+    A snapshot of each application instance's columns (including its shared
+    secret and settings) is cached by consumer key and merged into each
+    request's DB session without querying the DB again.
+
+    Snapshots are evicted when the process changes an application instance
+    (for example in the admin pages) and expire after `ttl` seconds to pick
+    up changes made by other processes. Code that changes an application
+    instance should get a fresh copy from the DB first (see
+    ApplicationInstanceService.get_for_update()). ApplicationInstance's
+    version column makes updates to a stale copy fail rather than lose
+    newer changes.
+    """
+
+    DEFAULT_TTL = 60
+
+    def __init__(self, ttl=DEFAULT_TTL, maxsize=1024):
+        self._snapshots = TTLCache(ttl, maxsize=maxsize)
+        # Keyed by the encrypted secret so that they never need evicting.
+        self._developer_secrets = TTLCache(ttl, maxsize=maxsize)
+
+    def get(self, db, consumer_key):
+        """
+        Return the ApplicationInstance with `consumer_key` or None.
+
+        :param db: The DB session to return the ApplicationInstance in
+        :param consumer_key: The consumer key of the ApplicationInstance
+        """
+        changed = self.watch(db)
+
+        snapshot = self._snapshots.get(consumer_key)
+
+        if snapshot is None:
+            application_instance = ApplicationInstance.get_by_consumer_key(
+                db, consumer_key
+            )
+
+            # Don't cache changes that haven't been committed yet.
+            if application_instance is not None and consumer_key not in changed:
+                self._snapshots.set(consumer_key, _snapshot(application_instance))
+
+            return application_instance
+
+        existing = db.identity_map.get(
+            sa.orm.util.identity_key(ApplicationInstance, snapshot["id"])
+        )
+        if existing is not None:
+            return existing
+
+        application_instance = ApplicationInstance(**copy.deepcopy(snapshot))
+        sa.orm.make_transient_to_detached(application_instance)
+        return db.merge(application_instance, load=False)
+
+    def decrypted_developer_secret(self, application_instance, aes_secret):
+        """Return `application_instance`'s decrypted developer secret."""
+        return self._developer_secrets.get_or_set(
+            (
+                application_instance.developer_secret,
+                application_instance.aes_cipher_iv,
+                aes_secret,
+            ),
+            lambda: application_instance.decrypted_developer_secret(aes_secret),
+        )
+
+    def evict(self, consumer_key):
+        """Remove the cached snapshot of the ApplicationInstance with `consumer_key`."""
+        self._snapshots.delete(consumer_key)
+
+    def watch(self, db):
+        """
+        Evict the application instances that `db` changes.
+
+        Sessions must be watched before they change any application instances
+        or those changes may be cached before they're committed.
+
+        Return the consumer keys of the application instances that `db` has
+        changed in its current transaction.
+        """
+        if "application_instance_cache.changed" in db.info:
+            return db.info["application_instance_cache.changed"]
+
+        changed = db.info["application_instance_cache.changed"] = set()
+
+        def after_flush(session, _flush_context):
+            for obj in list(session.dirty) + list(session.deleted):
+                if isinstance(obj, ApplicationInstance):
+                    changed.add(obj.consumer_key)
+                    self.evict(obj.consumer_key)
+
+        def after_commit(_session):
+            # Evict them again in case another request re-cached the old
+            # versions before these changes were committed.
+            for consumer_key in changed:
+                self.evict(consumer_key)
+            changed.clear()
+
+        sa.event.listen(db, "after_flush", after_flush)
+        sa.event.listen(db, "after_commit", after_commit)
+        sa.event.listen(db, "after_rollback", lambda _session: changed.clear())
+
+        return changed
+
+
+def _snapshot(application_instance):
+    snapshot = {
+        column: getattr(application_instance, column)
+        for column in ApplicationInstance.columns()
+    }
+    snapshot["settings"] = copy.deepcopy(dict(snapshot["settings"]))
+    return snapshot
 
 
 class ApplicationInstanceService:
-    def __init__(self, db, default_consumer_key):
+    def __init__(self, db, default_consumer_key, cache):
         self._db = db
         self._default_consumer_key = default_consumer_key
+        self._cache = cache
 
-    @lru_cache
+    @memoize
     def get(self, consumer_key=None) -> ApplicationInstance:
         """
         Return the ApplicationInstance with the given consumer_key.
@@ -22,16 +142,59 @@ class ApplicationInstanceService:
         """
         consumer_key = consumer_key or self._default_consumer_key
 
-        application_instance = ApplicationInstance.get_by_consumer_key(
-            self._db, consumer_key
-        )
+        application_instance = self._cache.get(self._db, consumer_key)
 
         if application_instance is None:
             raise ConsumerKeyError()
 
         return application_instance
 
+    def get_for_update(self, consumer_key=None) -> ApplicationInstance:
+        """
+        Return the ApplicationInstance with the given consumer_key, fresh from the DB.
+
+        get() may return a cached copy that's out of date, which can't be
+        updated. Use this instead before changing an ApplicationInstance.
+
+        :raise ConsumerKeyError: if the consumer_key isn't in the database
+        """
+        application_instance = self.get(consumer_key)
+        self._db.refresh(application_instance)
+        return application_instance
+
+    def update_lms_data(self, params):
+        """
+        Update the current ApplicationInstance's LMS data from launch `params`.
+
+        See ApplicationInstance.update_lms_data().
+
+        :raise ConsumerKeyError: if request.lti_user.oauth_consumer_key isn't in the DB
+        """
+        application_instance = self.get()
+        application_instance.update_lms_data(params)
+
+        # Most launches don't change anything, so only reload the application
+        # instance from the DB when they do.
+        if self._db.is_modified(application_instance):
+            self.get_for_update().update_lms_data(params)
+
+    def decrypted_developer_secret(self, application_instance, aes_secret):
+        """Return `application_instance`'s decrypted developer secret."""
+        return self._cache.decrypted_developer_secret(application_instance, aes_secret)
+
 
 def factory(_context, request):
     consumer_key = request.lti_user.oauth_consumer_key if request.lti_user else None
-    return ApplicationInstanceService(request.db, consumer_key)
+    return ApplicationInstanceService(
+        request.db, consumer_key, cache=request.registry["application_instance.cache"]
+    )
+
+
+def includeme(config):
+    cache = config.registry["application_instance.cache"] = ApplicationInstanceCache()
+
+    # Evict the application instances that each request changes.
+    def watch_db_session(event):
+        cache.watch(event.request.db)
+
+    config.add_subscriber(watch_db_session, NewRequest)
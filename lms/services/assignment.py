@@ -1,6 +1,5 @@
-from functools import lru_cache
-
 from lms.models import Assignment
+from lms.services.cache import invalidate, memoize
 
 
 class AssignmentService:
@@ -9,7 +8,7 @@ class AssignmentService:
     def __init__(self, db):
         self._db = db
 
-    @lru_cache(maxsize=128)
+    @memoize
     def get(self, tool_consumer_instance_guid, resource_link_id):
         return (
             self._db.query(Assignment)
@@ -54,10 +53,9 @@ class AssignmentService:
                 )
             )
 
-        # Clear the cache (@lru_cache) on self.get because we've changed the
-        # contents of the DB. (Python's @lru_cache doesn't have a way to remove
-        # just one key from the cache, you have to clear the entire cache.)
-        self.get.cache_clear()
+        # Remove the cached result of self.get() for this assignment because
+        # we've changed the contents of the DB.
+        invalidate(self.get, tool_consumer_instance_guid, resource_link_id)
 
 
 def factory(_context, request):
@@ -1 +1,8 @@
 from lms.services.blackboard_api.factory import blackboard_api_client_factory
+from lms.services.cache import PublicURLCache
+
+
+def includeme(config):
+    config.registry["blackboard_api.public_url_cache"] = PublicURLCache.from_settings(
+        config.registry.settings
+    )
@@ -73,6 +73,12 @@ class BasicClient:
     def request(self, method, path):
         url = self._api_url(path)
 
+        self._oauth_http_service.refresh_access_token_if_expiring(
+            self.token_url,
+            self.redirect_uri,
+            auth=(self.client_id, self.client_secret),
+        )
+
         try:
             return self._send(method, url)
         except (OAuth2TokenError, HTTPError):
@@ -18,9 +18,19 @@ PAGINATION_LIMIT = 200
 class BlackboardAPIClient:
     """A high-level Blackboard API client."""
 
-    def __init__(self, basic_client, request):
+    def __init__(self, basic_client, request, public_url_cache, cache_scope):
+        """
+        Create a new BlackboardAPIClient.
+
+        :param basic_client: An instance of BasicClient
+        :param request: For reporting events
+        :param public_url_cache: The process wide PublicURLCache for Blackboard
+        :param cache_scope: Identifies the current user in `public_url_cache`
+        """
         self._api = basic_client
         self._request = request
+        self._public_url_cache = public_url_cache
+        self._cache_scope = cache_scope
 
     def get_token(self, authorization_code):
         """
@@ -84,8 +94,17 @@ class BlackboardAPIClient:
         return results
 
     def public_url(self, course_id, file_id):
-        """Return a public URL for the given file."""
+        """
+        Return a public URL for the given file.
+
+        URLs are cached until shortly before they expire.
+        """
+        return self._public_url_cache.get_or_set(
+            (*self._cache_scope, course_id, file_id),
+            lambda: self._get_public_url(course_id, file_id),
+        )
 
+    def _get_public_url(self, course_id, file_id):
         try:
             response = self._api.request(
                 "GET",
@@ -16,4 +16,10 @@ def blackboard_api_client_factory(_context, request):
             oauth_http_service=request.find_service(name="oauth_http"),
         ),
         request=request,
+        public_url_cache=request.registry["blackboard_api.public_url_cache"],
+        cache_scope=(
+            application_instance.lms_host(),
+            request.lti_user.oauth_consumer_key,
+            request.lti_user.user_id,
+        ),
     )
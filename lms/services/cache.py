@@ -0,0 +1,265 @@
+"""In-memory caches with expiring entries, and per-instance memoization."""
+
+import functools
+import inspect
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from urllib.parse import parse_qsl, urlparse
+
+
+class TTLCache:
+    """
+    A thread safe, size limited, in-memory cache whose entries expire.
+
+    A single TTLCache is intended to be shared between all the requests that a
+    process handles so values in it must be treated as read-only.
+    """
+
+    def __init__(self, ttl, maxsize=1024, timer=time.monotonic):
+        """
+        Create a new TTLCache.
+
+        :param ttl: The default number of seconds that entries live for
+        :param maxsize: The maximum number of entries to hold. When the cache
+            is full the oldest entries are discarded to make room.
+        :param timer: Function returning the current time in seconds
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+
+        self._timer = timer
+        self._lock = Lock()
+        # Maps keys to (value, expiry time) in the order they were set.
+        self._entries = {}
+
+    def get(self, key, default=None):
+        """Return the unexpired value for `key`, or `default` if there isn't one."""
+        with self._lock:
+            try:
+                value, expires_at = self._entries[key]
+            except KeyError:
+                return default
+
+            if expires_at <= self._timer():
+                del self._entries[key]
+                return default
+
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store `value` under `key`.
+
+        :param key: The (hashable) key to store the value under
+        :param value: The value to store
+        :param ttl: Seconds until the value expires (defaults to `self.ttl`)
+        """
+        if ttl is None:
+            ttl = self.ttl
+
+        with self._lock:
+            # Remove any existing entry so the new one is the newest.
+            self._entries.pop(key, None)
+
+            if len(self._entries) >= self.maxsize:
+                self._make_room()
+
+            self._entries[key] = (value, self._timer() + ttl)
+
+    def get_or_set(self, key, create, ttl=None):
+        """
+        Return the value for `key`, calling `create()` to make it if needed.
+
+        `create()` is called without holding any locks, so concurrent misses
+        for the same key may both call it.
+        """
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            value = create()
+            self.set(key, value, ttl)
+
+        return value
+
+    def delete(self, key):
+        """Remove `key` from the cache, if it's present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Remove every entry whose (tuple) key starts with `prefix`."""
+        prefix = tuple(prefix)
+
+        with self._lock:
+            for key in list(self._entries):
+                if key[: len(prefix)] == prefix:
+                    del self._entries[key]
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _make_room(self):
+        now = self._timer()
+
+        for key, (_value, expires_at) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[key]
+
+        while len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+
+
+class PublicURLCache(TTLCache):
+    """
+    A cache of temporary public file URLs from an LMS's API.
+
+    Each URL is cached until shortly before it expires. If the URL has a
+    signed expiry time in it (as S3 and CloudFront URLs do) that is used,
+    otherwise it's cached for the default TTL.
+    """
+
+    DEFAULT_TTL = 300
+    """Seconds to cache URLs without a signed expiry time for by default."""
+
+    SAFETY_MARGIN = 60
+    """Seconds before a URL's expiry time to stop serving it from the cache.
+
+    This gives the user time to open the URL (via Via) before it expires."""
+
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL,
+        maxsize=1024,
+        timer=time.monotonic,
+        clock=time.time,
+    ):
+        """
+        Create a new PublicURLCache.
+
+        :param ttl: Seconds to cache URLs without a signed expiry time for
+        :param maxsize: The maximum number of URLs to hold
+        :param timer: Function returning the current time in seconds
+        :param clock: Function returning the current UNIX time (as signed
+            expiry times are absolute)
+        """
+        super().__init__(ttl, maxsize=maxsize, timer=timer)
+        self._clock = clock
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """Return a PublicURLCache configured from the app's settings."""
+        ttl = settings.get("public_url_cache_ttl")
+
+        return cls(ttl=cls.DEFAULT_TTL if ttl is None else int(ttl), **kwargs)
+
+    def set(self, key, value, ttl=None):
+        """
+        Store the URL `value` under `key` until shortly before it expires.
+
+        URLs which expire too soon to be worth caching aren't stored.
+
+        :param key: The (hashable) key to store the URL under
+        :param value: The URL to store
+        :param ttl: Seconds until the value expires (defaults to the lifetime
+            of the URL)
+        """
+        if ttl is None:
+            ttl = self._url_ttl(value)
+
+        if ttl > 0:
+            super().set(key, value, ttl)
+
+    def _url_ttl(self, url):
+        expires_at = self._signed_expiry(url)
+
+        if expires_at is None:
+            return self.ttl
+
+        return expires_at - self._clock() - self.SAFETY_MARGIN
+
+    @staticmethod
+    def _signed_expiry(url):
+        """Return the UNIX time that a signed URL expires at, if it has one."""
+        query = dict(parse_qsl(urlparse(url).query))
+
+        try:
+            if "X-Amz-Expires" in query:
+                # An AWS signature version 4 URL.
+                signed_at = datetime.strptime(query["X-Amz-Date"], "%Y%m%dT%H%M%SZ")
+                return signed_at.replace(tzinfo=timezone.utc).timestamp() + int(
+                    query["X-Amz-Expires"]
+                )
+
+            if "Expires" in query:
+                # An AWS signature version 2 or CloudFront URL.
+                return int(query["Expires"])
+
+        except (KeyError, ValueError):
+            pass
+
+        return None
+
+
+_MISSING = object()
+
+
+def memoize(method):
+    """
+    Cache a method's return values on the instance that it's called on.
+
+    Unlike `functools.lru_cache`, whose cache is global and holds on to `self`
+    (and everything `self` refers to) after it's no longer used, the values
+    are stored on the instance and are garbage collected along with it. For
+    objects that live for a single request (services, resources) this makes
+    the cache request-scoped.
+
+    The arguments must be hashable. Calls that bind the same values to the
+    method's parameters share a cache entry however the arguments are passed.
+    Can be used beneath `@property`.
+
+    See `invalidate()` for removing cached values.
+    """
+    signature = inspect.signature(method)
+    attr = f"_memoized_{method.__name__}"
+
+    def key(self, args, kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.values())[1:]
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.__dict__.setdefault(attr, {})
+        cache_key = key(self, args, kwargs)
+
+        try:
+            return cache[cache_key]
+        except KeyError:
+            value = cache[cache_key] = method(self, *args, **kwargs)
+            return value
+
+    wrapper.memoized = (attr, key)
+    return wrapper
+
+
+def invalidate(method, *args, **kwargs):
+    """
+    Remove the cached value of a call to a `@memoize`'d method.
+
+        invalidate(self.get, "foo", bar="gar")
+
+    :param method: The memoized method, bound to the instance
+    :param args: The positional arguments of the call
+    :param kwargs: The keyword arguments of the call
+    """
+    attr, key = method.memoized
+    instance = method.__self__
+
+    instance.__dict__.get(attr, {}).pop(key(instance, args, kwargs), None)
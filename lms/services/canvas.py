@@ -1,4 +1,8 @@
-from lms.services.exceptions import CanvasAPIPermissionError, CanvasFileNotFoundInCourse
+from lms.services.exceptions import (
+    CanvasAPIError,
+    CanvasAPIPermissionError,
+    CanvasFileNotFoundInCourse,
+)
 
 
 class CanvasService:
@@ -73,7 +77,8 @@ class CanvasFileFinder:
 
     def assert_file_in_course(self, course_id, file_id):
         """Raise if the current user can't see file_id in course_id."""
-        for file in self._api.list_files(course_id):
+        # Stop requesting pages of files from Canvas as soon as we find it.
+        for file in self._api.iter_files(course_id):
             # The Canvas API returns file IDs as ints but the file_id param
             # that this method receives (from our proxy API) is a string.
             # Convert ints to strings so that we can compare them.
@@ -90,14 +95,33 @@ class CanvasFileFinder:
         that matches one of the files in file_id's (same filename and size) and
         return the matching file's ID.
 
+        Copies of files that we've already seen in course_id are found in the
+        DB. They may have been seen by a different user, so a copy is only
+        returned if the current user can get a public URL for it. Only if
+        none of them can be used do we fall back to listing the course's files
+        from the Canvas API.
+
         Return None if no matching file is found.
         """
-        for file_id in file_ids:
-            file = self._file_service.get(file_id, type_="canvas_file")
-
-            if not file:
-                continue
-
+        files = [
+            file
+            for file in (
+                self._file_service.get(file_id, type_="canvas_file")
+                for file_id in file_ids
+            )
+            if file
+        ]
+
+        copies = (
+            copy
+            for file in files
+            for copy in self._file_service.find_copies_in_course(file, course_id)
+        )
+        for copy in copies:
+            if self._can_see(copy.lms_id):
+                return copy.lms_id
+
+        for file in files:
             for file_dict in self._api.list_files(course_id):
                 if (
                     file_dict["display_name"] == file.name
@@ -108,6 +132,17 @@ class CanvasFileFinder:
 
         return None
 
+    def _can_see(self, file_id):
+        """Return True if the current user can get a public URL for file_id."""
+        try:
+            # This also caches the URL for when the caller asks for it.
+            self._api.public_url(file_id)
+        except CanvasAPIError:
+            # For example the copy has been deleted, or is unpublished.
+            return False
+
+        return True
+
 
 def factory(_context, request):
     return CanvasService(
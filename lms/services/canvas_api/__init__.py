@@ -1,2 +1,11 @@
+from lms.services.cache import PublicURLCache
+from lms.services.canvas_api._cache import CanvasAPICache
 from lms.services.canvas_api.client import CanvasAPIClient
 from lms.services.canvas_api.factory import canvas_api_client_factory
+
+
+def includeme(config):
+    # Entries are scoped to a Canvas user so one cache can serve every user.
+    config.registry["canvas_api.cache"] = CanvasAPICache(
+        public_url_cache=PublicURLCache.from_settings(config.registry.settings)
+    )
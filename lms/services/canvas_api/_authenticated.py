@@ -39,6 +39,9 @@ class AuthenticatedClient:
         """
         Send a Canvas API request, and retry it if there are OAuth problems.
 
+        The user's access token is refreshed before sending the request if
+        it's about to expire.
+
         :param method: HTTP method to use (e.g. "POST")
         :param path: The path in the API to make a request to
         :param schema: Schema to apply to the return values
@@ -49,7 +52,7 @@ class AuthenticatedClient:
         """
         call_args = (method, path, schema, params)
 
-        oauth2_token = self._oauth2_token_service.get()
+        oauth2_token = self._oauth2_token_service.get_fresh(self.get_refreshed_token)
         access_token = oauth2_token.access_token
         refresh_token = oauth2_token.refresh_token
 
@@ -62,13 +65,66 @@ class AuthenticatedClient:
             if not refresh_token:
                 raise
 
-        new_access_token = self.get_refreshed_token(refresh_token)
+        new_access_token = self._oauth2_token_service.refresh(
+            self.get_refreshed_token, access_token
+        )
 
         return self._client.send(
             *call_args,
             headers={"Authorization": f"Bearer {new_access_token}"},
         )
 
+    def iter_items(self, method, path, schema, params=None):
+        """
+        Yield the items from a paginated Canvas API response one at a time.
+
+        Takes the same arguments as `send()`. Pages are only requested as the
+        items in them are needed.
+        """
+        for page in self.iter_pages(method, path, schema, params):
+            yield from page
+
+    def iter_pages(self, method, path, schema, params=None):
+        """
+        Yield each page of a Canvas API response, retrying if there are OAuth problems.
+
+        Takes the same arguments as `send()`. Only the request for the first
+        page is retried: once that succeeds the rest of the pages are
+        requested with the same (working) access token.
+        """
+        call_args = (method, path, schema, params)
+
+        oauth2_token = self._oauth2_token_service.get_fresh(self.get_refreshed_token)
+        access_token = oauth2_token.access_token
+        refresh_token = oauth2_token.refresh_token
+
+        pages = self._client.iter_pages(
+            *call_args,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+        try:
+            first_page = next(pages, None)
+        except OAuth2TokenError:
+            if not refresh_token:
+                raise
+
+            new_access_token = self._oauth2_token_service.refresh(
+                self.get_refreshed_token, access_token
+            )
+
+            pages = self._client.iter_pages(
+                *call_args,
+                headers={"Authorization": f"Bearer {new_access_token}"},
+            )
+            first_page = next(pages, None)
+
+        if first_page is None:
+            return
+
+        yield first_page
+        yield from pages
+
     def get_token(self, authorization_code):
         """
         Get an access token for the current LTI user.
@@ -1,7 +1,9 @@
 """Low level access to the Canvas API."""
 
-from copy import deepcopy
-from urllib.parse import urlencode
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from urllib.parse import parse_qsl, urlencode, urlparse
 
 import requests
 from requests import RequestException, Session
@@ -16,7 +18,7 @@ class BasicClient:
 
     Also supports:
 
-     * Pagination
+     * Pagination (including iterating over pages as they arrive)
      * Apply schema to responses
     """
 
@@ -29,12 +31,15 @@ class BasicClient:
     PAGINATION_MAXIMUM_REQUESTS = 25
     """The maximum number of calls to make before giving up."""
 
+    PAGINATION_MAXIMUM_CONCURRENCY = 5
+    """The maximum number of pages to request from Canvas at the same time."""
+
     def __init__(self, canvas_host, session=None):
         """
         Create a new BasicClient for making calls to the Canvas API.
 
         :param canvas_host: Hostname of the Canvas instance
-        :param session: The requests Session to use
+        :param session: The requests Session (or HTTPTransport) to use
         :type session: requests.Session
         """
 
@@ -62,6 +67,55 @@ class BasicClient:
         :param headers: Headers to include
         :param url_stub: Path prefix
         :return: The result of applying the schema to the response
+        :raise CanvasAPIError: For any validation or request errors
+        """
+        pages = self.iter_pages(method, path, schema, params, headers, url_stub)
+
+        if schema.many:
+            return list(chain.from_iterable(pages))
+
+        # Responses for single values only ever have one page (iter_pages()
+        # raises if Canvas tries to paginate them).
+        (result,) = pages
+        return result
+
+    def iter_items(
+        # pylint: disable=too-many-arguments
+        self,
+        method,
+        path,
+        schema,
+        params=None,
+        headers=None,
+        url_stub="/api/v1",
+    ):
+        """
+        Yield the items from a paginated Canvas API response one at a time.
+
+        Pages are only requested as they are needed so callers which stop
+        iterating early don't fetch (or hold on to) the rest of the pages.
+
+        Takes the same arguments as `send()` but `schema` must be a `many`
+        schema.
+        """
+        for page in self.iter_pages(method, path, schema, params, headers, url_stub):
+            yield from page
+
+    def iter_pages(
+        # pylint: disable=too-many-arguments
+        self,
+        method,
+        path,
+        schema,
+        params=None,
+        headers=None,
+        url_stub="/api/v1",
+    ):
+        """
+        Yield the result of applying `schema` to each page of the response.
+
+        Takes the same arguments as `send()`.
+
         :raise CanvasAPIError: For any validation or request errors
         """
         # Always request the maximum items per page for requests which return
@@ -76,47 +130,144 @@ class BasicClient:
             method, self._get_url(path, params, url_stub), headers=headers
         ).prepare()
 
-        return self._send_prepared(request, schema)
+        return self._iter_pages(request, schema)
 
     def _get_url(self, path, params, url_stub):
         return f"https://{self._canvas_host}{url_stub}/{path}" + (
             "?" + urlencode(params) if params else ""
         )
 
-    def _send_prepared(self, request, schema, request_depth=1):
+    def _iter_pages(self, request, schema):
+        response, page = self._send_page(request, schema)
+        yield page
+
+        # Handle pagination links. See:
+        # https://canvas.instructure.com/doc/api/file.pagination.html
+        next_url = response.links.get("next")
+        if not next_url:
+            return
+
+        # We can only append results if the response is expecting multiple
+        # items from the Canvas API
+        if not schema.many:
+            CanvasAPIError.raise_from(
+                TypeError(
+                    "Canvas returned paginated results but we expected a single value"
+                )
+            )
+
+        page_urls = self._numbered_page_urls(response.links)
+
+        if page_urls:
+            # We know the URLs of all of the remaining pages up front so we
+            # can request several of them at once, rather than one after the
+            # other.
+            yield from self._iter_numbered_pages(request, schema, page_urls)
+            return
+
+        # Canvas only tells us the URL of the next page (for example it uses
+        # opaque "bookmark" page values) so we have to follow the links one at
+        # a time.
+        request_depth = 1
+        while next_url and request_depth < self.PAGINATION_MAXIMUM_REQUESTS:
+            response, page = self._send_page(
+                self._copy_request(request, next_url["url"]), schema
+            )
+            yield page
+            next_url = response.links.get("next")
+            request_depth += 1
+
+    def _iter_numbered_pages(self, request, schema, page_urls):
+        """
+        Yield the pages at `page_urls` in order, requesting some concurrently.
+
+        At most PAGINATION_MAXIMUM_CONCURRENCY requests are in flight at once
+        and new requests are only started as pages are consumed, so if the
+        caller stops early we only wait for the requests already in flight.
+        """
+        concurrency = min(len(page_urls), self.PAGINATION_MAXIMUM_CONCURRENCY)
+        page_urls = iter(page_urls)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+            def submit(url):
+                return executor.submit(
+                    self._send_page, self._copy_request(request, url), schema
+                )
+
+            in_flight = deque(submit(url) for url in islice(page_urls, concurrency))
+
+            while in_flight:
+                _response, page = in_flight.popleft().result()
+
+                next_page_url = next(page_urls, None)
+                if next_page_url:
+                    in_flight.append(submit(next_page_url))
+
+                yield page
+
+    def _send_page(self, request, schema):
         try:
             response = self._session.send(request, timeout=9)
             response.raise_for_status()
         except RequestException as err:
             CanvasAPIError.raise_from(err)
 
-        result = None
+        page = None
         try:
-            result = schema(response).parse()
+            page = schema(response).parse()
         except ValidationError as err:
             CanvasAPIError.raise_from(err)
 
-        # Handle pagination links. See:
-        # https://canvas.instructure.com/doc/api/file.pagination.html
-        next_url = response.links.get("next")
-        if next_url:
-            # We can only append results if the response is expecting multiple
-            # items from the Canvas API
-            if not schema.many:
-                CanvasAPIError.raise_from(
-                    TypeError(
-                        "Canvas returned paginated results but we expected a single value"
-                    )
-                )
+        return response, page
 
-            # Don't make requests forever
-            if request_depth < self.PAGINATION_MAXIMUM_REQUESTS:
-                new_request = deepcopy(request)
-                new_request.url = next_url["url"]
-                result.extend(
-                    self._send_prepared(
-                        new_request, schema, request_depth=request_depth + 1
-                    )
-                )
+    def _numbered_page_urls(self, links):
+        """
+        Return the URLs of all the remaining pages, if Canvas uses page numbers.
 
-        return result
+        If the "next" and "last" links have numeric `page` query params then
+        return the URLs for every page from "next" to "last" (but no more pages
+        than PAGINATION_MAXIMUM_REQUESTS allows in total).
+
+        Return None otherwise.
+        """
+        if "last" not in links:
+            return None
+
+        next_url = links["next"]["url"]
+        next_page = dict(parse_qsl(urlparse(next_url).query)).get("page", "")
+        last_page = dict(parse_qsl(urlparse(links["last"]["url"]).query)).get(
+            "page", ""
+        )
+
+        if not (next_page.isdigit() and last_page.isdigit()):
+            return None
+
+        next_page, last_page = int(next_page), int(last_page)
+
+        # The first page (the one with these links) counts as one request.
+        last_page = min(last_page, next_page + self.PAGINATION_MAXIMUM_REQUESTS - 2)
+
+        return [
+            self._with_page(next_url, page) for page in range(next_page, last_page + 1)
+        ]
+
+    @staticmethod
+    def _with_page(url, page):
+        """Return `url` with its `page` query param set to `page`."""
+        parsed_url = urlparse(url)
+
+        query = [
+            (key, str(page) if key == "page" else value)
+            for key, value in parse_qsl(parsed_url.query, keep_blank_values=True)
+        ]
+
+        return parsed_url._replace(query=urlencode(query)).geturl()
+
+    @staticmethod
+    def _copy_request(request, url):
+        # PreparedRequest.copy() only copies what differs between pages (the
+        # headers dict) and shares everything else, unlike deepcopy().
+        new_request = request.copy()
+        new_request.url = url
+        return new_request
@@ -0,0 +1,113 @@
+"""A cache of Canvas API responses shared between requests."""
+
+import newrelic.agent
+
+from lms.services.cache import PublicURLCache, TTLCache
+
+
+class CanvasAPICache:
+    """
+    Canvas API responses shared between all the requests a process handles.
+
+    What the Canvas API returns depends on what the user whose access token
+    made the call is allowed to see, so every entry is scoped to a Canvas
+    instance and a user. One user never gets another user's cached responses.
+
+    The hits and misses of each endpoint are recorded as New Relic custom
+    metrics (Custom/CanvasAPICache/<endpoint>/Hit and .../Miss).
+    """
+
+    TTLS = {
+        "authenticated_users_sections": 300,
+        "course_sections": 300,
+        "course_group_categories": 300,
+        "group_category_groups": 120,
+        # Long enough for an instructor to click through the students in
+        # SpeedGrader without fetching the course's groups again.
+        "course_group_memberships": 600,
+        # Instructors expect to see files soon after uploading them.
+        "list_files": 60,
+    }
+    """The number of seconds to cache the responses of each endpoint for.
+
+    Temporary public file URLs (the "public_url" endpoint) are cached until
+    shortly before they expire instead (see PublicURLCache)."""
+
+    MAXSIZES = {"course_group_memberships": 128}
+    """Limits for endpoints with entries too big to hold `maxsize` of."""
+
+    def __init__(self, maxsize=1024, public_url_cache=None):
+        """
+        Create a new CanvasAPICache.
+
+        :param maxsize: The maximum number of responses to hold per endpoint
+        :param public_url_cache: The PublicURLCache to use for the
+            "public_url" endpoint
+        """
+        self._caches = {
+            endpoint: TTLCache(
+                ttl, maxsize=min(maxsize, self.MAXSIZES.get(endpoint, maxsize))
+            )
+            for endpoint, ttl in self.TTLS.items()
+        }
+        if public_url_cache is None:
+            public_url_cache = PublicURLCache(maxsize=maxsize)
+
+        self._caches["public_url"] = public_url_cache
+
+    @staticmethod
+    def scope(canvas_host, consumer_key, user_id):
+        """Return the cache scope for a user of a Canvas instance."""
+        return (canvas_host, consumer_key, user_id)
+
+    def get(self, endpoint, scope, args):
+        """Return the cached response from `endpoint` for `args` (or None)."""
+        return self._caches[endpoint].get((*scope, *args))
+
+    def get_or_set(self, endpoint, scope, args, create):
+        """
+        Return the cached response from `endpoint` for `args`.
+
+        If there isn't one call `create()` to get it and cache the result.
+
+        :param endpoint: The name of the endpoint (one of `TTLS`)
+        :param scope: The scope returned by `scope()`
+        :param args: The arguments that identify the response (e.g. course ID)
+        :param create: Function to call the Canvas API on a cache miss
+        """
+        cache = self._caches[endpoint]
+        key = (*scope, *args)
+
+        value = cache.get(key, _MISSING)
+
+        if value is _MISSING:
+            newrelic.agent.record_custom_metric(
+                f"Custom/CanvasAPICache/{endpoint}/Miss", 1
+            )
+            value = create()
+            cache.set(key, value)
+        else:
+            newrelic.agent.record_custom_metric(
+                f"Custom/CanvasAPICache/{endpoint}/Hit", 1
+            )
+
+        return value
+
+    def invalidate(self, scope, endpoint=None, args=()):
+        """
+        Remove cached responses for a user of a Canvas instance.
+
+        :param scope: The scope returned by `scope()`
+        :param endpoint: Only remove responses from this endpoint
+        :param args: Only remove responses for these arguments (which requires
+            `endpoint`)
+        """
+        if endpoint:
+            self._caches[endpoint].delete_prefix((*scope, *args))
+            return
+
+        for cache in self._caches.values():
+            cache.delete_prefix(scope)
+
+
+_MISSING = object()
@@ -1,7 +1,7 @@
 """High level access to Canvas API methods."""
 
 import logging
-from functools import lru_cache
+from collections import defaultdict
 
 import marshmallow
 from marshmallow import EXCLUDE, Schema, fields, post_load, validate, validates_schema
@@ -39,17 +39,24 @@ class CanvasAPIClient:
         don't have a working Canvas API access token for the user
     :raise CanvasAPIServerError: if we do have an access token but the
         Canvas API request fails for any other reason
+
+    Responses from some read only endpoints are cached between requests (see
+    CanvasAPICache) so they must not be modified by callers.
     """
 
-    def __init__(self, authenticated_client, request):
+    def __init__(self, authenticated_client, request, cache, cache_scope):
         """
         Create a new CanvasAPIClient.
 
         :param authenticated_client: An instance of AuthenticatedClient
         :param request: For reporting events
+        :param cache: The process wide CanvasAPICache
+        :param cache_scope: The CanvasAPICache scope of the current user
         """
         self._client = authenticated_client
         self._request = request
+        self._cache = cache
+        self._cache_scope = cache_scope
 
     def get_token(self, authorization_code):
         """
@@ -59,7 +66,25 @@ class CanvasAPIClient:
             to exchange for an access token
         :return: An access token string
         """
-        return self._client.get_token(authorization_code)
+        token = self._client.get_token(authorization_code)
+
+        # The user may have authorized us with different permissions.
+        self._cache.invalidate(self._cache_scope)
+
+        return token
+
+    def invalidate(self, endpoint, *args):
+        """
+        Remove the current user's cached responses from `endpoint`.
+
+        For when something is known to have changed in Canvas since the
+        responses were cached.
+
+        :param endpoint: The name of the method whose responses to remove
+            (e.g. "group_category_groups")
+        :param args: Only remove the responses for these arguments
+        """
+        self._cache.invalidate(self._cache_scope, endpoint, args)
 
     # Getting authenticated users sections
     # ------------------------------------
@@ -105,13 +130,17 @@ class CanvasAPIClient:
         :rtype: list(dict)
         """
 
-        return self._ensure_sections_unique(
-            self._client.send(
-                "GET",
-                f"courses/{course_id}",
-                params={"include[]": "sections"},
-                schema=self._AuthenticatedUsersSectionsSchema,
-            )
+        return self._cached(
+            "authenticated_users_sections",
+            course_id,
+            create=lambda: self._ensure_sections_unique(
+                self._client.send(
+                    "GET",
+                    f"courses/{course_id}",
+                    params={"include[]": "sections"},
+                    schema=self._AuthenticatedUsersSectionsSchema,
+                )
+            ),
         )
 
     class _AuthenticatedUsersSectionsSchema(RequestsResponseSchema):
@@ -140,12 +169,16 @@ class CanvasAPIClient:
         # For documentation of this request see:
         # https://canvas.instructure.com/doc/api/sections.html#method.sections.index
 
-        return self._ensure_sections_unique(
-            self._client.send(
-                "GET",
-                f"courses/{course_id}/sections",
-                schema=self._CourseSectionsSchema,
-            )
+        return self._cached(
+            "course_sections",
+            course_id,
+            create=lambda: self._ensure_sections_unique(
+                self._client.iter_items(
+                    "GET",
+                    f"courses/{course_id}/sections",
+                    schema=self._CourseSectionsSchema,
+                )
+            ),
         )
 
     class _CourseSectionsSchema(RequestsResponseSchema, _SectionSchema):
@@ -208,7 +241,6 @@ class CanvasAPIClient:
                 for enrollment in data["enrollments"]
             ]
 
-    @lru_cache
     def list_files(self, course_id, sort="position"):
         """
         Return the list of files for the given `course_id`.
@@ -219,15 +251,16 @@ class CanvasAPIClient:
             https://github.com/instructure/canvas-lms/blob/d43feb92d40d2c69684c4536f74dec37992c557a/app/controllers/files_controller.rb#L305
         :rtype: list(dict)
         """
-        # For documentation of this request see:
-        # https://canvas.instructure.com/doc/api/files.html#method.files.api_index
-
-        files = self._client.send(
-            "GET",
-            f"courses/{course_id}/files",
-            params={"content_types[]": "application/pdf", "sort": sort},
-            schema=self._ListFilesSchema,
+        return self._cached(
+            "list_files",
+            course_id,
+            sort,
+            create=lambda: self._list_files(course_id, sort),
         )
+
+    def _list_files(self, course_id, sort):
+        files = list(self._iter_files(course_id, sort))
+
         # Canvas' pagination is broken as it sorts by fields that allows duplicates.
         # This can lead to objects being skipped or duplicated across pages.
         # We can't detected objects that are not returned but we can detect the duplicates,
@@ -242,24 +275,59 @@ class CanvasAPIClient:
                 "Duplicates files found in Canvas courses/{course_id}/files endpoint"
             )
 
-        # Notify that we've found some files
-        self._request.registry.notify(
-            FilesDiscoveredEvent(
-                request=self._request,
-                values=[
-                    {
-                        "type": "canvas_file",
-                        "course_id": course_id,
-                        "lms_id": file["id"],
-                        "name": file["display_name"],
-                        "size": file["size"],
-                    }
-                    for file in files
-                ],
-            )
-        )
         return sorted(files, key=lambda file_: file_["display_name"])
 
+    def iter_files(self, course_id, sort="position"):
+        """
+        Yield the files for the given `course_id` as they are received.
+
+        Unlike `list_files()` this doesn't wait for every page of files before
+        returning, so callers looking for a particular file can stop as soon as
+        they find it. The results aren't de-duplicated or sorted, unless they
+        come from a cached `list_files()` response.
+
+        :param course_id: the Canvas course_id of the course to look in
+        :param sort: field to sort by (on Canvas' API side)
+        :rtype: iterator(dict)
+        """
+        files = self._cache.get("list_files", self._cache_scope, (course_id, sort))
+        if files is not None:
+            return iter(files)
+
+        return self._iter_files(course_id, sort)
+
+    def _iter_files(self, course_id, sort):
+        # For documentation of this request see:
+        # https://canvas.instructure.com/doc/api/files.html#method.files.api_index
+
+        for page in self._client.iter_pages(
+            "GET",
+            f"courses/{course_id}/files",
+            params={"content_types[]": "application/pdf", "sort": sort},
+            schema=self._ListFilesSchema,
+        ):
+            # Notify that we've found some files. We do this a page at a time
+            # so files are recorded even if the caller doesn't read them all.
+            self._request.registry.notify(
+                FilesDiscoveredEvent(
+                    request=self._request,
+                    values=[
+                        {
+                            "type": "canvas_file",
+                            "course_id": course_id,
+                            "lms_id": file["id"],
+                            "name": file["display_name"],
+                            "size": file["size"],
+                        }
+                        # De-duplicate by ID (see list_files()) as the same
+                        # file can't be upserted twice in one statement.
+                        for file in {file_["id"]: file_ for file_ in page}.values()
+                    ],
+                )
+            )
+
+            yield from page
+
     class _ListFilesSchema(RequestsResponseSchema):
         """Schema for the list_files response."""
 
@@ -270,19 +338,24 @@ class CanvasAPIClient:
         updated_at = fields.String(required=True)
         size = fields.Integer(required=True)
 
-    @lru_cache
     def public_url(self, file_id):
         """
-        Get a new temporary public download URL for the file with the given ID.
+        Get a temporary public download URL for the file with the given ID.
+
+        URLs are cached until shortly before they expire.
 
         :param file_id: the ID of the Canvas file
         """
         # For documentation of this request see:
         # https://canvas.instructure.com/doc/api/files.html#method.files.public_url
 
-        return self._client.send(
-            "GET", f"files/{file_id}/public_url", schema=self._PublicURLSchema
-        )["public_url"]
+        return self._cached(
+            "public_url",
+            file_id,
+            create=lambda: self._client.send(
+                "GET", f"files/{file_id}/public_url", schema=self._PublicURLSchema
+            )["public_url"],
+        )
 
     class _PublicURLSchema(RequestsResponseSchema):
         """Schema for the public_url response."""
@@ -290,10 +363,14 @@ class CanvasAPIClient:
         public_url = fields.Str(required=True)
 
     def course_group_categories(self, course_id):
-        return self._client.send(
-            "GET",
-            f"courses/{course_id}/group_categories",
-            schema=self._ListGroupCategories,
+        return self._cached(
+            "course_group_categories",
+            course_id,
+            create=lambda: self._client.send(
+                "GET",
+                f"courses/{course_id}/group_categories",
+                schema=self._ListGroupCategories,
+            ),
         )
 
     class _ListGroupCategories(RequestsResponseSchema):
@@ -304,10 +381,14 @@ class CanvasAPIClient:
 
     def group_category_groups(self, group_category_id):
         """List groups that belong to the group category/group set `group_category_id`."""
-        return self._client.send(
-            "GET",
-            f"group_categories/{group_category_id}/groups",
-            schema=self._ListGroups,
+        return self._cached(
+            "group_category_groups",
+            group_category_id,
+            create=lambda: self._client.send(
+                "GET",
+                f"group_categories/{group_category_id}/groups",
+                schema=self._ListGroups,
+            ),
         )
 
     def course_groups(self, course_id, only_own_groups=True, include_users=False):
@@ -318,11 +399,14 @@ class CanvasAPIClient:
         :param only_own_groups: Only return groups the current users belongs to
         :param include_users: Optionally include all the users in each group
         """
+        return list(self._iter_course_groups(course_id, only_own_groups, include_users))
+
+    def _iter_course_groups(self, course_id, only_own_groups, include_users=False):
         params = {"only_own_groups": only_own_groups}
         if include_users:
             params["include[]"] = "users"
 
-        return self._client.send(
+        return self._client.iter_items(
             "GET",
             f"courses/{course_id}/groups",
             params=params,
@@ -336,35 +420,50 @@ class CanvasAPIClient:
         :param course_id: Course canvas ID
         :param group_category_id: Only return groups that belong to this group category
         """
-        user_groups = self.course_groups(course_id, only_own_groups=True)
+        user_groups = self._iter_course_groups(course_id, only_own_groups=True)
 
         if group_category_id:
-            user_groups = [
+            return [
                 g for g in user_groups if g["group_category_id"] == group_category_id
             ]
 
-        return user_groups
+        return list(user_groups)
 
     def user_groups(self, course_id, user_id, group_category_id=None):
         """
         Get the groups a `user_id` belongs to in an specific `course_id`.
 
         Optionally return only the groups that belong to a `group_category_id`
+
+        All the course's groups are fetched at once and indexed by user, and
+        the index is cached. So looking up student after student (as when
+        grading in SpeedGrader) doesn't fetch all the groups each time.
         """
-        canvas_groups = self.course_groups(
-            course_id, only_own_groups=False, include_users=True
+        memberships = self._cached(
+            "course_group_memberships",
+            course_id,
+            create=lambda: self._course_group_memberships(course_id),
         )
-        groups = []
-        # Look for the student we are grading in all the groups
-        for group in canvas_groups:
-            if group_category_id and group["group_category_id"] != group_category_id:
-                continue
 
+        return list(memberships.get((user_id, group_category_id or None), []))
+
+    def _course_group_memberships(self, course_id):
+        """
+        Return an index of the groups that each user in `course_id` is in.
+
+        The index maps (user_id, group_category_id) to that user's groups in
+        that group category, and (user_id, None) to all of the user's groups.
+        """
+        memberships = defaultdict(list)
+
+        for group in self._iter_course_groups(
+            course_id, only_own_groups=False, include_users=True
+        ):
             for user in group["users"]:
-                if user["id"] == user_id:
-                    groups.append(group)
+                memberships[(user["id"], group["group_category_id"])].append(group)
+                memberships[(user["id"], None)].append(group)
 
-        return groups
+        return dict(memberships)
 
     class _ListGroups(RequestsResponseSchema):
         class _Users(Schema):
@@ -386,6 +485,9 @@ class CanvasAPIClient:
         description = fields.String(load_default=None, allow_none=True)
         group_category_id = fields.Integer(required=True)
 
+    def _cached(self, endpoint, *args, create):
+        return self._cache.get_or_set(endpoint, self._cache_scope, args, create)
+
     @classmethod
     def _ensure_sections_unique(cls, sections):
         """
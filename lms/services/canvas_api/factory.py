@@ -1,5 +1,6 @@
 from lms.services.canvas_api._authenticated import AuthenticatedClient
 from lms.services.canvas_api._basic import BasicClient
+from lms.services.canvas_api._cache import CanvasAPICache
 from lms.services.canvas_api.client import CanvasAPIClient
 
 
@@ -10,13 +11,17 @@ def canvas_api_client_factory(_context, request):
     :param request: Pyramid request object
     :return: An instance of CanvasAPIClient
     """
-    application_instance = request.find_service(name="application_instance").get()
+    application_instance_service = request.find_service(name="application_instance")
+    application_instance = application_instance_service.get()
 
-    developer_secret = application_instance.decrypted_developer_secret(
-        request.registry.settings["aes_secret"]
+    developer_secret = application_instance_service.decrypted_developer_secret(
+        application_instance, request.registry.settings["aes_secret"]
     )
 
-    basic_client = BasicClient(application_instance.lms_host())
+    basic_client = BasicClient(
+        application_instance.lms_host(),
+        session=request.registry["http.transport"],
+    )
 
     authenticated_api = AuthenticatedClient(
         basic_client=basic_client,
@@ -26,4 +31,13 @@ def canvas_api_client_factory(_context, request):
         redirect_uri=request.route_url("canvas_api.oauth.callback"),
     )
 
-    return CanvasAPIClient(authenticated_api, request=request)
+    return CanvasAPIClient(
+        authenticated_api,
+        request=request,
+        cache=request.registry["canvas_api.cache"],
+        cache_scope=CanvasAPICache.scope(
+            application_instance.lms_host(),
+            request.lti_user.oauth_consumer_key,
+            request.lti_user.user_id,
+        ),
+    )
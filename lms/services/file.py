@@ -18,6 +18,30 @@ class FileService:
             .one_or_none()
         )
 
+    def find_copies_in_course(self, file_, course_id):
+        """
+        Return the files in `course_id` that look like copies of `file_`.
+
+        These are the files of the same type with the same name and size as
+        `file_` (but a different lms_id), most recently discovered first: the
+        newest copy is the most likely to still be in the course. (Files
+        aren't updated when they're seen again unchanged, so `File.updated`
+        doesn't say when a file was last seen.)
+        """
+        return (
+            self._db.query(File)
+            .filter(
+                File.application_instance == self._application_instance,
+                File.course_id == course_id,
+                File.name == file_.name,
+                File.size == file_.size,
+                File.type == file_.type,
+                File.lms_id != file_.lms_id,
+            )
+            .order_by(File.created.desc(), File.id.desc())
+            .all()
+        )
+
 
 def factory(_context, request):
     return FileService(
@@ -1,6 +1,6 @@
 """A service that upserts :class:`lms.models.GroupInfoService` records."""
 
-from lms.models import GroupInfo
+from lms.models import GroupInfo, GroupInfoInstructor
 
 __all__ = ["GroupInfoService"]
 
@@ -12,7 +12,7 @@ class GroupInfoService:
     Usage::
 
         group_info = request.find_service(name="group_info")
-        group_info.upsert(authority_provided_id, consumer_key, request.params)
+        group_info.upsert_many(h_groups, consumer_key, request.params)
     """
 
     GROUPING_TYPES = {
@@ -21,26 +21,33 @@ class GroupInfoService:
         "canvas_group": "canvas_group_group",
     }
 
+    _SKIP_COLUMNS = {"id", "authority_provided_id", "consumer_key", "_info"}
+
     def __init__(self, _context, request):
         self._db = request.db
         self._lti_user = request.lti_user
 
-    def upsert(self, h_group, consumer_key, params):
+    def upsert_many(self, h_groups, consumer_key, params):
         """
-        Upsert a row into the `group_info` DB table.
+        Upsert a row into the `group_info` DB table for each of `h_groups`.
 
-        Find the models.GroupInfo matching the given h_group or create it if
-        none exists. Then update the GroupInfo's consumer_key to the given
-        consumer_key, and update its other columns from the items in `params`.
+        All of the rows are inserted or updated in a single query. Each
+        GroupInfo's consumer_key is set to the given consumer_key, and its
+        other columns are set from the items in `params`. Columns that aren't
+        in `params` are left as they are.
 
-        params["id"], params["authority_provided_id"], and params["info"] will
-        be ignored if present--these columns can't be updated.
+        params["id"], params["authority_provided_id"], params["consumer_key"]
+        and params["info"] will be ignored if present--these columns can't be
+        updated this way.
 
         Any keys in `params` that don't correspond to a GroupInfo column name
         will be ignored.
 
-        :param h_group: the group to upsert
-        :type h_group: models.HGroup
+        If the current user is an instructor they're recorded as an instructor
+        of each group.
+
+        :param h_groups: the groups to upsert
+        :type h_groups: list of models.HGroup
 
         :param consumer_key: the GroupInfo.consumer_key value to set
 
@@ -48,27 +55,39 @@ class GroupInfoService:
         :type params: dict
 
         """
-        group_info = (
-            self._db.query(GroupInfo)
-            .filter_by(authority_provided_id=h_group.authority_provided_id)
-            .one_or_none()
-        )
-
-        if not group_info:
-            group_info = GroupInfo(
-                authority_provided_id=h_group.authority_provided_id,
-                consumer_key=consumer_key,
-            )
-            self._db.add(group_info)
-
-        group_info.consumer_key = consumer_key
-        group_info.update_from_dict(
-            params, skip_keys={"authority_provided_id", "id", "info"}
+        columns = [
+            column
+            for column in GroupInfo.columns()
+            if column in params and column not in self._SKIP_COLUMNS
+        ]
+
+        values = {
+            h_group.authority_provided_id: {
+                **{column: params[column] for column in columns},
+                "authority_provided_id": h_group.authority_provided_id,
+                "consumer_key": consumer_key,
+                "info": {"type": self.GROUPING_TYPES[h_group.type]},
+            }
+            # The same group can't be upserted twice in one statement.
+            for h_group in h_groups
+        }
+
+        group_infos = self._db.bulk.upsert(
+            GroupInfo,
+            list(values.values()),
+            returning=True,
+            update_elements=["consumer_key", "info", *columns],
         )
 
         if self._lti_user.is_instructor:
-            group_info.upsert_instructor(
-                dict(email=self._lti_user.email, **self._lti_user.h_user._asdict())
+            instructor = dict(
+                email=self._lti_user.email, **self._lti_user.h_user._asdict()
             )
 
-        group_info.type = self.GROUPING_TYPES[h_group.type]
+            self._db.bulk.upsert(
+                GroupInfoInstructor,
+                [
+                    dict(instructor, group_info_id=group_info.id)
+                    for group_info in group_infos
+                ],
+            )
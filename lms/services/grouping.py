@@ -26,75 +26,94 @@ class GroupingService:
 
         return db_grouping or grouping
 
-    def upsert_canvas_section(
-        self, tool_consumer_instance_guid, context_id, section_id, section_name
-    ):
+    def upsert_many(self, grouping_class, parent, groupings):
         """
-        Upsert a Grouping for a course section.
-
-        :param tool_consumer_instance_guid: Tool consumer GUID
-        :param context_id: Course id the section is a part of
-        :param section_id: A section id for a section group
-        :param section_name: The name of the section
+        Upsert many groupings of the same type and parent in one query.
+
+        :param grouping_class: The type of the groupings (e.g. CanvasSection)
+        :param parent: The grouping (e.g. Course) that they all belong to
+        :param groupings: Dicts with each grouping's authority_provided_id,
+            lms_id, lms_name and extra
+        :return: The upserted `grouping_class` objects, in the same order as
+            `groupings`
         """
+        values = {
+            grouping["authority_provided_id"]: {
+                "application_instance_id": self._application_instance.id,
+                "parent_id": parent.id,
+                "type": grouping_class.__mapper_args__["polymorphic_identity"],
+                **grouping,
+            }
+            # The same grouping can't be upserted twice in one statement.
+            for grouping in groupings
+        }
+
+        upserted = {
+            grouping.authority_provided_id: grouping
+            for grouping in self._db.bulk.upsert(
+                Grouping, list(values.values()), returning=True
+            )
+        }
 
-        section_authority_provided_id = hashed_id(
-            tool_consumer_instance_guid, context_id, section_id
-        )
-
-        course_authority_provided_id = hashed_id(
-            tool_consumer_instance_guid, context_id
-        )
+        return [upserted[grouping["authority_provided_id"]] for grouping in groupings]
 
-        course = self._course_service.get(course_authority_provided_id)
+    def upsert_canvas_sections(self, tool_consumer_instance_guid, context_id, sections):
+        """
+        Upsert the Groupings for a course's sections.
 
-        return self.upsert(
-            CanvasSection(
-                application_instance=self._application_instance,
-                authority_provided_id=section_authority_provided_id,
-                lms_id=section_id,
-                lms_name=section_name,
-                parent_id=course.id,
-            )
+        :param tool_consumer_instance_guid: Tool consumer GUID
+        :param context_id: Course id the sections are a part of
+        :param sections: Section dicts (with "id" and "name") from the Canvas API
+        :return: The CanvasSection for each section, in order
+        """
+        return self.upsert_many(
+            CanvasSection,
+            self._course(tool_consumer_instance_guid, context_id),
+            [
+                {
+                    "authority_provided_id": hashed_id(
+                        tool_consumer_instance_guid, context_id, section["id"]
+                    ),
+                    "lms_id": section["id"],
+                    "lms_name": section["name"],
+                    "extra": {},
+                }
+                for section in sections
+            ],
         )
 
-    def upsert_canvas_group(  # pylint: disable=too-many-arguments
-        self,
-        tool_consumer_instance_guid,
-        context_id,
-        group_id,
-        group_name,
-        group_set_id,
-    ):
+    def upsert_canvas_groups(self, tool_consumer_instance_guid, context_id, groups):
         """
-        Upserst a Grouping for a canvas group.
+        Upsert the Groupings for a course's Canvas groups.
 
         :param tool_consumer_instance_guid: Tool consumer GUID
-        :param context_id: Course id the group is a part of
-        :param group_id: Canvas group id
-        :param group_name: The name of the group
-        :param group_set_id: Id of the canvas group set this group belongs to
+        :param context_id: Course id the groups are a part of
+        :param groups: Group dicts (with "id", "name" and "group_category_id")
+            from the Canvas API
+        :return: The CanvasGroup for each group, in order
         """
-
-        group_authority_provided_id = hashed_id(
-            tool_consumer_instance_guid, context_id, "canvas_group", group_id
+        return self.upsert_many(
+            CanvasGroup,
+            self._course(tool_consumer_instance_guid, context_id),
+            [
+                {
+                    "authority_provided_id": hashed_id(
+                        tool_consumer_instance_guid,
+                        context_id,
+                        "canvas_group",
+                        group["id"],
+                    ),
+                    "lms_id": group["id"],
+                    "lms_name": group["name"],
+                    "extra": {"group_set_id": group["group_category_id"]},
+                }
+                for group in groups
+            ],
         )
 
-        course_authority_provided_id = hashed_id(
-            tool_consumer_instance_guid, context_id
-        )
-
-        course = self._course_service.get(course_authority_provided_id)
-
-        return self.upsert(
-            CanvasGroup(
-                application_instance=self._application_instance,
-                authority_provided_id=group_authority_provided_id,
-                lms_id=group_id,
-                lms_name=group_name,
-                parent_id=course.id,
-                extra={"group_set_id": group_set_id},
-            )
+    def _course(self, tool_consumer_instance_guid, context_id):
+        return self._course_service.get(
+            hashed_id(tool_consumer_instance_guid, context_id)
         )
 
 
@@ -1,11 +1,182 @@
 """The H API service."""
+from threading import Event, Lock
 
 from h_api.bulk_api import BulkAPI, CommandBuilder
 
 from lms.models import HUser
 from lms.services import HAPIError, HTTPError
 
-__all__ = ["HAPI"]
+__all__ = ["HAPI", "BulkSyncCoalescer", "sync_commands"]
+
+
+def sync_commands(syncs):
+    """
+    Return the bulk API commands to sync users and their groups to h.
+
+    Each user and group is upserted once (with its attributes from the last
+    sync that has it) and each user is made a member of each of their groups.
+
+    :param syncs: (user, groups) pairs of h user upsert attributes and a list
+        of h group upsert attributes
+    """
+    users, groups, memberships = {}, {}, {}
+    for user, user_groups in syncs:
+        users[user["username"]] = user
+        for group in user_groups:
+            groups[group["authority_provided_id"]] = group
+            memberships[(user["username"], group["authority_provided_id"])] = None
+
+    user_refs = {username: f"user_{i}" for i, username in enumerate(users)}
+    group_refs = {group_id: f"group_{i}" for i, group_id in enumerate(groups)}
+
+    # The bulk API needs the users and groups before the memberships. The
+    # command builders pop keys off the dicts they're given.
+    return (
+        [
+            CommandBuilder.user.upsert(dict(user), user_refs[username])
+            for username, user in users.items()
+        ]
+        + [
+            CommandBuilder.group.upsert(dict(group), group_refs[group_id])
+            for group_id, group in groups.items()
+        ]
+        + [
+            CommandBuilder.group_membership.create(
+                user_refs[username], group_refs[group_id]
+            )
+            for username, group_id in memberships
+        ]
+    )
+
+
+class BulkSyncCoalescer:
+    """
+    Combine the syncs to h of concurrent requests into single bulk API calls.
+
+    Shared between all the requests (threads) that a process handles. The
+    first sync to arrive waits `window` seconds for others to join it and
+    then sends them all to h in one call. If that call fails each sync is
+    sent on its own, so every caller gets the result of its own sync.
+
+    With a `window` of 0 each sync is sent straight away.
+
+    Only syncs from the same process are coalesced, so this only helps when
+    each process handles several requests at once (threaded workers). With
+    workers that handle one request at a time (gunicorn's default sync
+    workers) there's never anything to coalesce with and a `window` just
+    delays every sync.
+    """
+
+    def __init__(self, window=0, max_syncs=50):
+        """
+        Create a new BulkSyncCoalescer.
+
+        :param window: Seconds to wait for concurrent syncs to coalesce
+        :param max_syncs: Send a batch as soon as it has this many syncs
+        """
+        self.window = window
+        self.max_syncs = max_syncs
+
+        self._lock = Lock()
+        self._batch = None
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """Return a BulkSyncCoalescer configured from the app's settings."""
+        window = settings.get("h_bulk_coalesce_window")
+
+        return cls(window=float(window) if window else 0, **kwargs)
+
+    def sync(self, user, groups, execute):
+        """
+        Sync `user` and their `groups` to h, along with any concurrent syncs.
+
+        :param user: The h user upsert attributes
+        :param groups: The h group upsert attributes of the user's groups
+        :param execute: Function to send a list of (user, groups) syncs to h
+            in one bulk API call
+        :raise HAPIError: If syncing `user` and `groups` fails
+        """
+        if not self.window:
+            execute([(user, groups)])
+            return
+
+        with self._lock:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+
+            result = batch.add((user, groups))
+
+            if len(batch.syncs) >= self.max_syncs:
+                # Later syncs start a new batch.
+                self._batch = None
+                batch.full.set()
+
+        if leader:
+            # Wait for more syncs (or until the batch is full).
+            batch.full.wait(self.window)
+
+            with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+
+            batch.send(execute)
+        else:
+            result.done.wait()
+
+        if result.error is not None:
+            raise result.error
+
+
+class _Batch:
+    """Syncs waiting to be sent to h together and their results."""
+
+    def __init__(self):
+        self.syncs = []
+        self.results = []
+        self.full = Event()
+
+    def add(self, sync):
+        self.syncs.append(sync)
+        self.results.append(_Result())
+        return self.results[-1]
+
+    def send(self, execute):
+        try:
+            self._send(execute)
+        except Exception as err:  # pylint:disable=broad-except
+            # Don't leave the other callers waiting forever.
+            for result in self.results:
+                if result.error is None:
+                    result.error = err
+        finally:
+            for result in self.results:
+                result.done.set()
+
+    def _send(self, execute):
+        try:
+            execute(self.syncs)
+        except HAPIError as err:
+            if len(self.syncs) == 1:
+                self.results[0].error = err
+            else:
+                self._send_one_by_one(execute)
+
+    def _send_one_by_one(self, execute):
+        """Retry each sync on its own so that one bad sync doesn't fail the rest."""
+        for sync, result in zip(self.syncs, self.results):
+            try:
+                execute([sync])
+            except HAPIError as err:
+                result.error = err
+
+
+class _Result:
+    def __init__(self):
+        self.error = None
+        self.done = Event()
 
 
 class HAPI:
@@ -17,6 +188,7 @@ class HAPI:
 
     def __init__(self, _context, request):
         self._request = request
+        self._coalescer = request.registry["h_api.coalescer"]
 
         settings = request.registry.settings
 
@@ -32,6 +204,7 @@ class HAPI:
         :param commands: Instances of h_api Commands
         """
 
+        # The config command has to say how many commands there are.
         commands = list(commands)
         commands = [
             CommandBuilder.configure(
@@ -43,10 +216,28 @@ class HAPI:
         self._api_request(
             "POST",
             path="bulk",
+            # BulkAPI checks that the sequence of commands is valid (for
+            # example that they only refer to users and groups that earlier
+            # commands upsert) before anything is sent to h.
             body=BulkAPI.to_string(commands),
             headers={"Content-Type": "application/vnd.hypothesis.v1+x-ndjson"},
         )
 
+    def sync(self, user, groups):
+        """
+        Upsert an h user and groups and make the user a member of the groups.
+
+        Concurrent syncs by other requests may be sent to h in the same bulk
+        API call (see BulkSyncCoalescer).
+
+        :param user: The h user upsert attributes
+        :param groups: The h group upsert attributes of each group
+        :raise HAPIError: If the sync fails
+        """
+        self._coalescer.sync(
+            user, groups, lambda syncs: self.execute_bulk(commands=sync_commands(syncs))
+        )
+
     def get_user(self, username):
         """
         Return the h user for the given username.
@@ -93,3 +284,9 @@ class HAPI:
             raise HAPIError("Connecting to Hypothesis failed", response) from err
 
         return response
+
+
+def includeme(config):
+    config.registry["h_api.coalescer"] = BulkSyncCoalescer.from_settings(
+        config.registry.settings
+    )
@@ -0,0 +1,142 @@
+import logging
+from datetime import timedelta
+
+import newrelic.agent
+import sqlalchemy as sa
+
+from lms.models import HSyncedMembership, HSyncJob
+from lms.services.exceptions import HAPIError
+from lms.services.h_api import sync_commands
+
+__all__ = ["HSyncQueue"]
+
+LOG = logging.getLogger(__name__)
+
+
+class HSyncQueue:
+    """
+    A durable queue of syncs of LTI users and groups to h.
+
+    Launches add jobs to the queue in their DB transaction instead of calling
+    the h API, and a worker (bin/h_sync_worker.py) sends them to h in
+    batches. Workers claim jobs with `SELECT ... FOR UPDATE SKIP LOCKED` so
+    any number of them can run at once. Failed jobs are retried with
+    exponential backoff.
+
+    Times come from the DB's clock, as the jobs' default times do.
+    """
+
+    BACKOFF = 30
+    """Seconds to wait before retrying a job that has failed once."""
+
+    MAX_BACKOFF = 3600
+    """The longest to wait between retries of a job, in seconds."""
+
+    def __init__(self, db, h_api):
+        self._db = db
+        self._h_api = h_api
+
+    def can_defer(self, username, authority_provided_ids):
+        """
+        Return True if a sync of this user and these groups can be queued.
+
+        Launches can only be left to sync in the background if the h user
+        and groups already exist and the user is already a member of the
+        groups. Otherwise the client wouldn't be able to show the user the
+        groups' annotations.
+        """
+        return HSyncedMembership.all_exist(self._db, username, authority_provided_ids)
+
+    def synced(self, username, authority_provided_ids):
+        """Record that a user and groups were synced to h (by the caller)."""
+        HSyncedMembership.record(self._db, username, authority_provided_ids)
+
+    def enqueue(self, user, groups):
+        """
+        Queue a sync of `user` and `groups` to h.
+
+        The job is added in the DB session's transaction so it's only queued
+        if the transaction commits.
+
+        :param user: The h user upsert attributes
+        :param groups: The h group upsert attributes of each of the groups to
+            upsert and make the user a member of
+        """
+        self._db.add(HSyncJob(user=user, groups=groups))
+
+    def stats(self):
+        """Return the number of queued jobs and the age of the oldest, in seconds."""
+        depth, oldest_age = self._db.execute(
+            sa.select(
+                sa.func.count(),
+                sa.func.extract(
+                    "epoch", sa.func.localtimestamp() - sa.func.min(HSyncJob.created)
+                ),
+            )
+        ).one()
+
+        return depth, float(oldest_age or 0)
+
+    def process(self, limit=100):
+        """
+        Send up to `limit` queued jobs to h in one bulk API call.
+
+        This must be called in a transaction which is committed afterwards:
+        jobs that were sent are deleted and jobs that failed are rescheduled.
+        If the batch fails each job is tried on its own so that one bad job
+        doesn't hold up the rest.
+
+        :return: The number of jobs that were claimed
+        """
+        jobs = (
+            self._db.query(HSyncJob)
+            .filter(HSyncJob.run_after <= sa.func.localtimestamp())
+            .order_by(HSyncJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        if not jobs:
+            return 0
+
+        try:
+            self._send(jobs)
+        except HAPIError as err:
+            if len(jobs) == 1:
+                self._retry_later(jobs[0], err)
+                return 1
+
+            for job in jobs:
+                try:
+                    self._send([job])
+                except HAPIError as job_err:
+                    self._retry_later(job, job_err)
+
+        return len(jobs)
+
+    def _send(self, jobs):
+        self._h_api.execute_bulk(
+            commands=sync_commands((job.user, job.groups) for job in jobs)
+        )
+
+        now = self._db.scalar(sa.select(sa.func.localtimestamp()))
+        for job in jobs:
+            self._db.delete(job)
+            newrelic.agent.record_custom_metric(
+                "Custom/HSyncQueue/Latency", (now - job.created).total_seconds()
+            )
+        newrelic.agent.record_custom_metric("Custom/HSyncQueue/Sent", len(jobs))
+
+    def _retry_later(self, job, err):
+        job.attempts += 1
+        job.last_error = err.explanation
+        backoff = min(self.BACKOFF * 2 ** (job.attempts - 1), self.MAX_BACKOFF)
+        job.run_after = sa.func.localtimestamp() + timedelta(seconds=backoff)
+
+        LOG.warning("h sync job %d failed (attempt %d)", job.id, job.attempts)
+        newrelic.agent.record_custom_metric("Custom/HSyncQueue/Failed", 1)
+
+
+def factory(_context, request):
+    return HSyncQueue(request.db, request.find_service(name="h_api"))
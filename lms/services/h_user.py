@@ -0,0 +1,87 @@
+from lms.models import GradingInfo, HUser
+from lms.services.cache import TTLCache
+
+__all__ = ["HUserService"]
+
+
+class HUserService:
+    """
+    Look up h users' display names.
+
+    Display names are looked up in a cache shared between requests, then in
+    the `GradingInfo`s of students who have launched assignments and only
+    then in h. Each lookup from h is a separate h API call.
+
+    Launches record the launching user's display name in the cache (see
+    `remember()`), so students who have launched recently (including Canvas
+    students, who don't have `GradingInfo`s) are found without calling h.
+    """
+
+    DEFAULT_TTL = 24 * 60 * 60
+    """
+    Seconds to cache display names for.
+
+    Display names only change when the user launches again with a new one,
+    and that launch replaces the cached one.
+    """
+
+    MAXSIZE = 10000
+    """The most display names to cache."""
+
+    def __init__(self, db, h_api, cache):
+        """
+        Initialize a new HUserService.
+
+        :param db: The DB session
+        :param h_api: The HAPI service
+        :param cache: A `TTLCache` of display names by username
+        """
+        self._db = db
+        self._h_api = h_api
+        self._cache = cache
+
+    def get_user(self, username):
+        """
+        Return the h user with `username` (and their display name).
+
+        :rtype: HUser
+        :raise HAPIError: if the user isn't known locally and fetching them
+            from h fails
+        """
+        display_name = self._cache.get(username)
+        if display_name is not None:
+            return HUser(username=username, display_name=display_name)
+
+        display_name = (
+            self._db.query(GradingInfo.h_display_name)
+            .filter_by(h_username=username)
+            # If there are several the most recently updated one wins.
+            .order_by(GradingInfo.updated.desc())
+            .limit(1)
+            .scalar()
+        )
+
+        if display_name is None:
+            user = self._h_api.get_user(username)
+        else:
+            user = HUser(username=username, display_name=display_name)
+
+        self._cache.set(username, user.display_name)
+        return user
+
+    def remember(self, h_user):
+        """Record `h_user`'s display name (for example from an LTI launch)."""
+        self._cache.set(h_user.username, h_user.display_name)
+
+
+def factory(_context, request):
+    return HUserService(
+        request.db, request.find_service(name="h_api"), request.registry["h_user.cache"]
+    )
+
+
+def includeme(config):
+    # Display names by h username.
+    config.registry["h_user.cache"] = TTLCache(
+        HUserService.DEFAULT_TTL, maxsize=HUserService.MAXSIZE
+    )
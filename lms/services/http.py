@@ -1,20 +1,143 @@
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
+
 import requests
+from pyramid.settings import asbool
 from requests import RequestException
+from requests.adapters import HTTPAdapter
 
 from lms.services.exceptions import HTTPError
 
 
+class HTTPTransport:
+    """
+    A process-wide pool of `requests` sessions, one per upstream host.
+
+    A single HTTPTransport is shared by every request that a worker process
+    handles so that TCP and TLS connections to h, Canvas, Blackboard, etc are
+    kept alive and re-used between requests instead of being re-opened for
+    every outbound call.
+
+    HTTPTransport has the same `request()` and `send()` methods as
+    `requests.Session` so it can be used anywhere that a session is expected.
+    It's safe to use from multiple threads.
+
+    Because the sessions are shared between different users' requests cookies
+    are never stored.
+    """
+
+    def __init__(self, pool_maxsize=10, pool_block=False, keep_alive=True, max_age=300):
+        """
+        Create a new HTTPTransport.
+
+        :param pool_maxsize: The maximum number of connections to keep open to
+            each host
+        :param pool_block: What to do when all of a host's connections are in
+            use: if True wait for a connection to become free, if False open
+            an extra connection that'll be discarded after use
+        :param keep_alive: Whether to keep connections open between requests
+        :param max_age: How long (in seconds) to re-use a host's connections
+            for before replacing them with new ones, or None to re-use them
+            forever
+        """
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._keep_alive = keep_alive
+        self._max_age = max_age
+
+        # Host -> (session, time the session was created).
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Return an HTTPTransport configured from the app's settings."""
+
+        def setting(name, default, type_):
+            value = settings.get(name)
+            return default if value is None else type_(value)
+
+        return cls(
+            pool_maxsize=setting("http_pool_maxsize", 10, int),
+            pool_block=setting("http_pool_block", False, asbool),
+            keep_alive=setting("http_keep_alive", True, asbool),
+            max_age=setting("http_connection_max_age", 300, int) or None,
+        )
+
+    def request(self, method, url, **kwargs):
+        """Send a request using the session for `url`'s host."""
+        return self.session(url).request(method, url, **kwargs)
+
+    def send(self, request, **kwargs):
+        """Send a prepared request using the session for its host."""
+        return self.session(request.url).send(request, **kwargs)
+
+    def session(self, url):
+        """Return the session to use for requests to `url`'s host."""
+        parsed_url = urlparse(url)
+        host = (parsed_url.scheme, parsed_url.netloc)
+        now = time.monotonic()
+
+        with self._lock:
+            session, created = self._sessions.get(host, (None, None))
+
+            if session and self._max_age and now - created >= self._max_age:
+                # The session's connections are too old: replace them.
+                # Closing the old session only closes its idle connections,
+                # any that are still in use are closed when they're released.
+                session.close()
+                session = None
+
+            if not session:
+                session = self._new_session()
+                self._sessions[host] = (session, now)
+
+        return session
+
+    def close(self):
+        """Close all of the transport's connections."""
+        with self._lock:
+            for session, _created in self._sessions.values():
+                session.close()
+
+            self._sessions = {}
+
+    def _new_session(self):
+        session = requests.Session()
+
+        adapter = HTTPAdapter(
+            # We use a separate session (and so a separate urllib3 pool
+            # manager) per host so each only ever needs one pool.
+            pool_connections=1,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        # Never store cookies: sessions are shared across users.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        if not self._keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
+
+
 class HTTPService:
     """Send HTTP requests with `requests` and receive the responses."""
 
-    def __init__(self, _session=None):
-        # A requests session is used so that cookies are persisted across
-        # requests and urllib3 connection pooling is used (which means that
-        # underlying TCP connections are re-used when making multiple requests
-        # to the same host, e.g. pagination).
-        #
-        # See https://docs.python-requests.org/en/latest/user/advanced/#session-objects
-        self._session = _session or requests.Session()
+    def __init__(self, session=None):
+        """
+        Create a new HTTPService.
+
+        :param session: The session or HTTPTransport to send requests with.
+            Normally this is the app's shared HTTPTransport so that
+            connections are re-used across requests
+        """
+        self._session = session or requests.Session()
 
     def get(self, *args, **kwargs):
         return self.request("GET", *args, **kwargs)
@@ -90,5 +213,5 @@ class HTTPService:
         return response
 
 
-def factory(_context, _request):
-    return HTTPService()
+def factory(_context, request):
+    return HTTPService(request.registry["http.transport"])
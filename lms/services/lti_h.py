@@ -1,7 +1,52 @@
-from h_api.bulk_api import CommandBuilder
+import hashlib
+import json
+
+import newrelic.agent
 from pyramid.httpexceptions import HTTPInternalServerError
 
+from lms.models import GroupInfo
 from lms.services import HAPIError
+from lms.services.cache import TTLCache
+
+
+class HSyncFingerprints:
+    """
+    Fingerprints of the data most recently synced to h for each user and course.
+
+    Shared between all the requests that a process handles. Launching the same
+    assignment again soon after (with the same name, course title and groups)
+    produces the same fingerprint, and the sync can be skipped.
+
+    Fingerprints expire after `ttl` seconds so that changes made to the h
+    users and groups by anything else are corrected by the next launch.
+    """
+
+    DEFAULT_TTL = 600
+
+    def __init__(self, ttl=DEFAULT_TTL, maxsize=4096):
+        self._cache = TTLCache(ttl, maxsize=maxsize)
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """Return an HSyncFingerprints configured from the app's settings."""
+        ttl = settings.get("h_sync_fingerprint_ttl")
+
+        return cls(ttl=cls.DEFAULT_TTL if ttl is None else int(ttl), **kwargs)
+
+    @staticmethod
+    def fingerprint(data):
+        """Return a fingerprint of the JSON serializable `data`."""
+        return hashlib.sha256(
+            json.dumps(data, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def is_fresh(self, key, fingerprint):
+        """Return True if `fingerprint` was synced for `key` recently."""
+        return self._cache.get(key) == fingerprint
+
+    def set(self, key, fingerprint):
+        """Record that the data with `fingerprint` was synced for `key`."""
+        self._cache.set(key, fingerprint)
 
 
 class LTIHService:
@@ -19,8 +64,8 @@ class LTIHService:
     """
 
     def __init__(self, _context, request):
+        self._request = request
         self._lti_user = request.lti_user
-        self._h_user = request.lti_user.h_user
 
         self._authority = request.registry.settings["h_authority"]
         self._application_instance_service = request.find_service(
@@ -28,6 +73,12 @@ class LTIHService:
         )
         self._h_api = request.find_service(name="h_api")
         self._group_info_service = request.find_service(name="group_info")
+        # In deferred mode launches queue syncs for a worker to send to h.
+        self._h_sync_queue = (
+            request.find_service(name="h_sync_queue")
+            if request.registry.settings.get("h_sync_deferred")
+            else None
+        )
 
     def sync(self, h_groups, group_info_params):
         """
@@ -36,6 +87,15 @@ class LTIHService:
         This will upsert the provided list of groups, the current user and
         make that user a member of each group.
 
+        Nothing is done if exactly the same data was synced recently (see
+        HSyncFingerprints). A sync is only recorded as recent once the
+        request's transaction commits.
+
+        In deferred mode (the "h_sync_deferred" setting) the sync is queued
+        and sent to h by a worker if the user is already a member of the
+        groups in h. The first launch of each user in each group still waits
+        for h, because the client can't show a group that doesn't exist yet.
+
         :param h_groups: the list of models.HGroup objects to upsert
         :param group_info_params: the params to record for these groups in
             models.GroupInfo
@@ -47,51 +107,106 @@ class LTIHService:
         if not self._application_instance_service.get().provisioning:
             return
 
-        try:
-            self._h_api.execute_bulk(commands=self._yield_commands(h_groups))
+        # So that the grading UI doesn't have to ask h for it.
+        self._request.find_service(name="h_user").remember(self._lti_user.h_user)
 
-        except HAPIError as err:
-            raise HTTPInternalServerError(explanation=err.explanation) from err
+        fingerprints = self._request.registry["lti_h.fingerprints"]
+        key, fingerprint = self._fingerprint(h_groups, group_info_params)
+        if fingerprints.is_fresh(key, fingerprint):
+            newrelic.agent.record_custom_metric("Custom/HSync/Skipped", 1)
+            return
 
-        # Keep a note of the groups locally for reporting purposes.
-        for h_group in h_groups:
-            self._group_info_service.upsert(
-                h_group=h_group,
-                consumer_key=self._lti_user.oauth_consumer_key,
-                params=group_info_params,
-            )
+        group_ids = [h_group.authority_provided_id for h_group in h_groups]
+        h_user = self._lti_user.h_user
+        user = self._user_attributes(h_user)
+        groups = [self._group_attributes(h_group) for h_group in h_groups]
 
-    def _yield_commands(self, h_groups):
-        yield self._user_upsert(self._h_user)
+        if self._h_sync_queue and self._h_sync_queue.can_defer(
+            h_user.username, group_ids
+        ):
+            self._h_sync_queue.enqueue(user, groups)
+            newrelic.agent.record_custom_metric("Custom/HSync/Deferred", 1)
+        else:
+            try:
+                self._h_api.sync(user, groups)
 
-        for i, h_group in enumerate(h_groups):
-            yield self._group_upsert(h_group, f"group_{i}")
+            except HAPIError as err:
+                raise HTTPInternalServerError(explanation=err.explanation) from err
 
-        for i in range(len(h_groups)):
-            yield CommandBuilder.group_membership.create("user_0", f"group_{i}")
+            if self._h_sync_queue:
+                self._h_sync_queue.synced(h_user.username, group_ids)
 
-    def _user_upsert(self, h_user, ref="user_0"):
-        return CommandBuilder.user.upsert(
-            {
-                "authority": self._authority,
-                "username": h_user.username,
-                "display_name": h_user.display_name,
-                "identities": [
-                    {
-                        "provider": h_user.provider,
-                        "provider_unique_id": h_user.provider_unique_id,
-                    }
-                ],
-            },
-            ref,
+        # Keep a note of the groups locally for reporting purposes.
+        self._group_info_service.upsert_many(
+            h_groups=h_groups,
+            consumer_key=self._lti_user.oauth_consumer_key,
+            params=group_info_params,
+        )
+
+        # If the rest of the launch fails the GroupInfo upsert is rolled back,
+        # so the next launch mustn't skip the sync.
+        self._request.tm.get().addAfterCommitHook(
+            self._record_fingerprint, args=(fingerprints, key, fingerprint)
+        )
+        newrelic.agent.record_custom_metric("Custom/HSync/Synced", 1)
+
+    def _fingerprint(self, h_groups, group_info_params):
+        """Return the fingerprint store key and fingerprint of a sync."""
+        group_ids = [h_group.authority_provided_id for h_group in h_groups]
+        key = (
+            self._authority,
+            self._lti_user.oauth_consumer_key,
+            self._lti_user.h_user.username,
+            *group_ids,
         )
 
-    def _group_upsert(self, h_group, ref):
-        return CommandBuilder.group.upsert(
+        fingerprint = HSyncFingerprints.fingerprint(
             {
-                "authority": self._authority,
-                "name": h_group.name,
-                "authority_provided_id": h_group.authority_provided_id,
-            },
-            ref,
+                "user": self._lti_user.h_user._asdict(),
+                "groups": [
+                    [h_group.authority_provided_id, h_group.name, h_group.type]
+                    for h_group in h_groups
+                ],
+                # What the GroupInfo upsert records (the rest of the launch
+                # params, like the nonce, change every launch).
+                "group_info": {
+                    column: group_info_params.get(column)
+                    for column in GroupInfo.columns()
+                },
+                "email": self._lti_user.email,
+                "is_instructor": self._lti_user.is_instructor,
+            }
         )
+
+        return key, fingerprint
+
+    @staticmethod
+    def _record_fingerprint(success, fingerprints, key, fingerprint):
+        if success:
+            fingerprints.set(key, fingerprint)
+
+    def _user_attributes(self, h_user):
+        return {
+            "authority": self._authority,
+            "username": h_user.username,
+            "display_name": h_user.display_name,
+            "identities": [
+                {
+                    "provider": h_user.provider,
+                    "provider_unique_id": h_user.provider_unique_id,
+                }
+            ],
+        }
+
+    def _group_attributes(self, h_group):
+        return {
+            "authority": self._authority,
+            "name": h_group.name,
+            "authority_provided_id": h_group.authority_provided_id,
+        }
+
+
+def includeme(config):
+    config.registry["lti_h.fingerprints"] = HSyncFingerprints.from_settings(
+        config.registry.settings
+    )
@@ -0,0 +1,166 @@
+import atexit
+import logging
+import time
+from datetime import datetime
+from threading import Lock, Timer
+
+import newrelic.agent
+import sqlalchemy as sa
+from pyramid.events import NewRequest
+from sqlalchemy.exc import SQLAlchemyError
+
+from lms.models import LtiLaunches, LtiLaunchRollup
+
+LOG = logging.getLogger(__name__)
+
+
+class LTILaunchRecorder:
+    """
+    Records of LTI launches buffered by a process and written to the DB in bulk.
+
+    A launch is only buffered once the DB session that it was recorded in has
+    committed, so launches that fail aren't recorded (just as if they'd been
+    added to the session). The buffer is written with one multi-row INSERT
+    (and counted in `LtiLaunchRollup`), outside of any request's transaction,
+    when it has `max_size` launches in it, when its oldest launch is `max_age`
+    seconds old (a daemon timer thread writes it then, even if no more
+    launches are recorded) and when the process exits.
+
+    If the buffer grows to `max_buffer` launches (because writing it keeps
+    failing) the oldest launches are dropped.
+    """
+
+    DB_INFO_KEY = "lti_launches.recorder"
+    """The `Session.info` key of the recorder that `LtiLaunches.add()` uses."""
+
+    PENDING_KEY = "lti_launches.pending"
+    """The `Session.info` key of the launches waiting for a session to commit."""
+
+    # pylint:disable=too-many-arguments
+    def __init__(
+        self, engine, max_size=100, max_age=10, max_buffer=10000, timer=time.monotonic
+    ):
+        self._engine = engine
+        self._max_size = max_size
+        self._max_age = max_age
+        self._max_buffer = max_buffer
+        self._timer = timer
+        self._lock = Lock()
+        self._buffer = _Buffer()
+
+    def watch(self, db):
+        """Make `LtiLaunches.add()` record launches in `db` with this recorder."""
+        db.info[self.DB_INFO_KEY] = self
+
+    def record(self, db, context_id, lti_key):
+        """Buffer a launch once `db` commits its current transaction."""
+        row = {
+            "created": datetime.utcnow(),
+            "context_id": context_id,
+            "lti_key": lti_key,
+        }
+
+        pending = db.info.get(self.PENDING_KEY)
+        if pending is None:
+            pending = db.info[self.PENDING_KEY] = []
+
+            def after_commit(_session):
+                self.extend(pending)
+                pending.clear()
+
+            sa.event.listen(db, "after_commit", after_commit)
+            sa.event.listen(db, "after_rollback", lambda _session: pending.clear())
+
+        pending.append(row)
+
+    def extend(self, rows):
+        """Buffer `rows` and write the buffer to the DB if it's full or old."""
+        if not rows:
+            return
+
+        with self._lock:
+            if not self._buffer.rows:
+                self._start_buffer()
+
+            self._buffer.rows.extend(rows)
+            self._drop_overflow()
+
+            due = (
+                len(self._buffer.rows) >= self._max_size
+                or self._timer() - self._buffer.oldest >= self._max_age
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered launches to the DB."""
+        with self._lock:
+            buffer, self._buffer = self._buffer, _Buffer()
+
+        if buffer.flush_timer:
+            buffer.flush_timer.cancel()
+
+        rows = buffer.rows
+        if not rows:
+            return
+
+        start = self._timer()
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(sa.insert(LtiLaunches).values(rows))
+                LtiLaunchRollup.increment(connection, rows)
+        except SQLAlchemyError:
+            LOG.exception("Writing %d LTI launches failed", len(rows))
+            newrelic.agent.record_custom_metric("Custom/LtiLaunches/FlushFailed", 1)
+
+            # Put them back to try again later (when the buffer is full or
+            # `max_age` from now).
+            with self._lock:
+                if not self._buffer.rows:
+                    self._start_buffer()
+                self._buffer.rows[:0] = rows
+                self._drop_overflow()
+            return
+
+        newrelic.agent.record_custom_metric("Custom/LtiLaunches/Flushed", len(rows))
+        newrelic.agent.record_custom_metric(
+            "Custom/LtiLaunches/FlushTime", self._timer() - start
+        )
+
+    def _start_buffer(self):
+        """Start filling the (empty) buffer and schedule writing it."""
+        self._buffer.oldest = self._timer()
+        self._buffer.flush_timer = Timer(self._max_age, self.flush)
+        self._buffer.flush_timer.daemon = True
+        self._buffer.flush_timer.start()
+
+    def _drop_overflow(self):
+        overflow = len(self._buffer.rows) - self._max_buffer
+
+        if overflow > 0:
+            del self._buffer.rows[:overflow]
+            LOG.warning("Dropped %d buffered LTI launches", overflow)
+            newrelic.agent.record_custom_metric("Custom/LtiLaunches/Dropped", overflow)
+
+
+class _Buffer:
+    """Buffered launches and the timer that'll write them when they're too old."""
+
+    def __init__(self):
+        self.rows = []
+        self.oldest = None
+        self.flush_timer = None
+
+
+def includeme(config):
+    # Launches buffered by this process.
+    recorder = config.registry["lti_launches.recorder"] = LTILaunchRecorder(
+        config.registry["sqlalchemy.engine"]
+    )
+    atexit.register(recorder.flush)
+
+    def watch_db_session(event):
+        recorder.watch(event.request.db)
+
+    config.add_subscriber(watch_db_session, NewRequest)
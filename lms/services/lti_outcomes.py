@@ -1,4 +1,7 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlparse
 from xml.parsers.expat import ExpatError
 
 import xmltodict
@@ -7,7 +10,37 @@ from lms.services.exceptions import HTTPError, LTIOutcomesAPIError
 
 log = logging.getLogger(__name__)
 
-__all__ = ["LTIOutcomesClient"]
+__all__ = ["LTIOutcomesClient", "LMSConcurrencyLimits"]
+
+
+class LMSConcurrencyLimits:
+    """
+    Limits on how many requests are sent to each LMS at once.
+
+    Shared by all the requests (threads) that a process handles, so that
+    concurrent requests for the same LMS share its limit. LMSs are told apart
+    by the host of their URLs.
+
+    The limits are per process: each worker process can send `limit`
+    requests to an LMS at once.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+
+        self._lock = Lock()
+        self._semaphores = {}
+
+    def slot(self, url):
+        """Return a context manager that holds one of the LMS at `url`'s slots."""
+        host = urlparse(url).netloc
+
+        with self._lock:
+            try:
+                return self._semaphores[host]
+            except KeyError:
+                semaphore = self._semaphores[host] = BoundedSemaphore(self.limit)
+                return semaphore
 
 
 class LTIOutcomesClient:
@@ -17,9 +50,13 @@ class LTIOutcomesClient:
     See https://www.imsglobal.org/specs/ltiomv1p0/specification.
     """
 
+    READ_RESULTS_MAXIMUM_CONCURRENCY = 5
+    """The most requests each process sends to an LMS at once when reading many results."""
+
     def __init__(self, _context, request):
         self.oauth1_service = request.find_service(name="oauth1")
         self.http_service = request.find_service(name="http")
+        self._limits = request.registry["lti_outcomes.limits"]
 
         self.service_url = request.parsed_params["lis_outcome_service_url"]
 
@@ -31,13 +68,53 @@ class LTIOutcomesClient:
         :return: The last-submitted score or `None` if no score has been
                  submitted.
         """
+        return self._read_result(lis_result_sourcedid, self.oauth1_service.get_client())
+
+    def read_results(self, lis_result_sourcedids):
+        """
+        Return the last-submitted scores for many submissions.
 
+        The LTI Outcomes API can only read one result per request so the
+        requests are sent concurrently. At most READ_RESULTS_MAXIMUM_CONCURRENCY
+        are sent to the LMS at once, including those of any other requests
+        that this process is handling for the same LMS.
+
+        :param lis_result_sourcedids: The submission ids
+        :return: A dict of each submission id to its score (as returned by
+            `read_result()`) or, if reading it failed, the
+            `LTIOutcomesAPIError` that was raised
+        """
+        lis_result_sourcedids = list(dict.fromkeys(lis_result_sourcedids))
+        if not lis_result_sourcedids:
+            return {}
+
+        # Get the OAuth1 client up front: it needs the DB, which the worker
+        # threads mustn't use.
+        auth = self.oauth1_service.get_client()
+
+        def read(lis_result_sourcedid):
+            try:
+                with self._limits.slot(self.service_url):
+                    return self._read_result(lis_result_sourcedid, auth)
+            except LTIOutcomesAPIError as err:
+                return err
+
+        concurrency = min(
+            len(lis_result_sourcedids), self.READ_RESULTS_MAXIMUM_CONCURRENCY
+        )
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return dict(
+                zip(lis_result_sourcedids, executor.map(read, lis_result_sourcedids))
+            )
+
+    def _read_result(self, lis_result_sourcedid, auth):
         result = self._send_request(
             {
                 "readResultRequest": {
                     "resultRecord": {"sourcedGUID": {"sourcedId": lis_result_sourcedid}}
                 }
-            }
+            },
+            auth,
         )
 
         try:
@@ -81,14 +158,17 @@ class LTIOutcomesClient:
                     "The pre-record hook must return the request body as a dict"
                 )
 
-        self._send_request({"replaceResultRequest": request})
+        self._send_request(
+            {"replaceResultRequest": request}, self.oauth1_service.get_client()
+        )
 
-    def _send_request(self, request_body):
+    def _send_request(self, request_body, auth):
         """
         Send a signed request to an LMS's Outcome Management Service endpoint.
 
         :arg request_body: The content to send as the POX body element of the
                            request
+        :arg auth: The OAuth1 client to sign the request with
 
         :raise LTIOutcomesAPIError: if the request fails for any reason
 
@@ -106,7 +186,7 @@ class LTIOutcomesClient:
                 url=self.service_url,
                 data=xml_body,
                 headers={"Content-Type": "application/xml"},
-                auth=self.oauth1_service.get_client(),
+                auth=auth,
             )
         except HTTPError as err:
             raise LTIOutcomesAPIError(
@@ -184,3 +264,9 @@ class LTIOutcomesClient:
                 "imsx_POXBody": body,
             }
         }
+
+
+def includeme(config):
+    config.registry["lti_outcomes.limits"] = LMSConcurrencyLimits(
+        LTIOutcomesClient.READ_RESULTS_MAXIMUM_CONCURRENCY
+    )
@@ -1,13 +1,20 @@
 import datetime
+import hashlib
 
+import newrelic.agent
+import sqlalchemy as sa
 from sqlalchemy.orm.exc import NoResultFound
 
 from lms.models import OAuth2Token
 from lms.services import OAuth2TokenError
+from lms.services.cache import memoize
 
 
 class OAuth2TokenService:
-    """Save and retrieve OAuth2Tokens from the DB."""
+    """Save, retrieve and refresh OAuth2Tokens from the DB."""
+
+    REFRESH_AHEAD = datetime.timedelta(minutes=5)
+    """How long before an access token expires to refresh it."""
 
     def __init__(self, db, consumer_key, user_id):
         """
@@ -20,6 +27,8 @@ class OAuth2TokenService:
         self._db = db
         self._consumer_key = consumer_key
         self._user_id = user_id
+        # The session of the refresh in progress (see refresh()), if any.
+        self._refresh_db = None
 
     def save(self, access_token, refresh_token, expires_in):
         """
@@ -28,37 +37,135 @@ class OAuth2TokenService:
         If there's already an OAuth2Token for the user's consumer key and user
         ID then overwrite its values. Otherwise create a new OAuth2Token and
         add it to the DB.
+
+        Tokens saved during `refresh()` are saved in the refresh's own
+        transaction.
         """
-        try:
-            oauth2_token = self.get()
-        except OAuth2TokenError:
+        db = self._refresh_db or self._db
+
+        oauth2_token = self._query(db).one_or_none()
+        if oauth2_token is None:
             oauth2_token = OAuth2Token(
                 consumer_key=self._consumer_key, user_id=self._user_id
             )
-            self._db.add(oauth2_token)
+            db.add(oauth2_token)
 
         oauth2_token.access_token = access_token
         oauth2_token.refresh_token = refresh_token
         oauth2_token.expires_in = expires_in
         oauth2_token.received_at = datetime.datetime.utcnow()
 
+    @memoize
     def get(self):
         """
         Return the user's saved OAuth 2 token from the DB.
 
+        The token is only queried for once: later calls return the same
+        object, which `save()` and `refresh()` keep up to date.
+
         :raise OAuth2TokenError: if we don't have an OAuth 2 token for the user
         """
         try:
-            return (
-                self._db.query(OAuth2Token)
-                .filter_by(consumer_key=self._consumer_key, user_id=self._user_id)
-                .one()
-            )
+            return self._query(self._db).one()
         except NoResultFound as err:
             raise OAuth2TokenError(
                 "We don't have an OAuth 2 token for this user"
             ) from err
 
+    def get_fresh(self, refresh):
+        """
+        Return the user's token, refreshing it first if it's about to expire.
+
+        Refreshing ahead of time saves sending a request with an expired access
+        token only to have it fail, then refreshing and retrying.
+
+        :param refresh: A function that takes the user's refresh token, gets a
+            new access token from the authorization server, saves it (with
+            `save()`) and returns the new access token
+        :raise OAuth2TokenError: if we don't have an OAuth 2 token for the user
+        """
+        oauth2_token = self.get()
+
+        if (
+            oauth2_token.refresh_token
+            and oauth2_token.expires_at
+            and oauth2_token.expires_at - self.REFRESH_AHEAD
+            <= datetime.datetime.utcnow()
+        ):
+            self.refresh(refresh, oauth2_token.access_token)
+
+        return oauth2_token
+
+    def refresh(self, refresh, stale_access_token):
+        """
+        Refresh the user's access token, unless another request already has.
+
+        Only one request refreshes a user's token at a time. Concurrent
+        requests wait for that refresh and then use the token it got.
+
+        The refresh runs in a DB transaction of its own which is committed as
+        soon as the new token is saved, rather than in the request's
+        transaction. So the lock is only held while refreshing, and waiting
+        requests see the new token as soon as they get the lock.
+
+        :param refresh: A function as for `get_fresh()`
+        :param stale_access_token: The access token that needs replacing
+        :raise OAuth2TokenError: if we don't have an OAuth 2 token for the user
+        :return: The new access token
+        """
+        db = sa.orm.Session(bind=self._db.get_bind())
+
+        try:
+            with db.begin():
+                self._lock(db)
+
+                # Another request may have refreshed the token while we were
+                # waiting for the lock.
+                oauth2_token = self._query(db).one_or_none()
+                if oauth2_token is None:
+                    raise OAuth2TokenError(
+                        "We don't have an OAuth 2 token for this user"
+                    )
+
+                if oauth2_token.access_token != stale_access_token:
+                    newrelic.agent.record_custom_metric(
+                        "Custom/OAuth2Token/RefreshReused", 1
+                    )
+                    access_token = oauth2_token.access_token
+                else:
+                    newrelic.agent.record_custom_metric("Custom/OAuth2Token/Refresh", 1)
+                    self._refresh_db = db
+                    try:
+                        access_token = refresh(oauth2_token.refresh_token)
+                    finally:
+                        self._refresh_db = None
+        finally:
+            db.close()
+
+        # Pick up the new token in the request's session too.
+        self._db.refresh(self.get())
+
+        return access_token
+
+    def _query(self, db):
+        return db.query(OAuth2Token).filter_by(
+            consumer_key=self._consumer_key, user_id=self._user_id
+        )
+
+    def _lock(self, db):
+        """Lock refreshing the user's token until `db`'s transaction ends."""
+        key = hashlib.sha256(
+            f"oauth2_token:{self._consumer_key}:{self._user_id}".encode("utf-8")
+        ).digest()
+
+        db.execute(
+            sa.select(
+                sa.func.pg_advisory_xact_lock(
+                    int.from_bytes(key[:8], "big", signed=True)
+                )
+            )
+        )
+
 
 def oauth2_token_service_factory(_context, request):
     return OAuth2TokenService(
@@ -1,3 +1,5 @@
+from functools import partial
+
 from marshmallow import fields
 
 from lms.services import HTTPError, OAuth2TokenError
@@ -84,12 +86,34 @@ class OAuthHTTPService:
         (https://datatracker.ietf.org/doc/html/rfc6749#section-6) to get a new
         access token for the current user and save it to the DB.
 
+        Only one request refreshes a user's access token at a time. If another
+        request has already refreshed the token this reuses its new token.
+
         :raise OAuth2TokenError: if we don't have a refresh token for the user
         :raise HTTPError: if the HTTP request fails
         :raise ValidationError: if the server's access token response is invalid
         """
-        refresh_token = self._oauth2_token_service.get().refresh_token
+        return self._oauth2_token_service.refresh(
+            partial(self._refresh_access_token, token_url, redirect_uri, auth),
+            self._oauth2_token_service.get().access_token,
+        )
+
+    def refresh_access_token_if_expiring(self, token_url, redirect_uri, auth):
+        """
+        Refresh the user's access token if it's about to expire.
+
+        Takes the same arguments as `refresh_access_token()`.
+
+        :raise OAuth2TokenError: if we don't have an access token for the user
+            or their refresh token is invalid
+        :raise HTTPError: if the HTTP request fails
+        :raise ValidationError: if the server's access token response is invalid
+        """
+        self._oauth2_token_service.get_fresh(
+            partial(self._refresh_access_token, token_url, redirect_uri, auth)
+        )
 
+    def _refresh_access_token(self, token_url, redirect_uri, auth, refresh_token):
         try:
             return self._token_request(
                 token_url=token_url,
@@ -1,7 +1,16 @@
 """Custom Pyramid tweens."""
+import logging
+
 from pyramid.tweens import EXCVIEW
 
-__all__ = ["rollback_db_session_tween_factory"]
+from lms.db import collect_query_stats
+
+__all__ = ["rollback_db_session_tween_factory", "query_stats_tween_factory"]
+
+LOG = logging.getLogger(__name__)
+
+REPEATED_STATEMENT_WARNING = 5
+"""Warn about requests that execute the same statement this many times."""
 
 
 def rollback_db_session_tween_factory(handler, _registry):
@@ -30,5 +39,46 @@ def rollback_db_session_tween_factory(handler, _registry):
     return rollback_db_session_tween
 
 
+def query_stats_tween_factory(handler, registry):
+    """Return the query_stats_tween."""
+    dev = registry.settings.get("dev")
+
+    def query_stats_tween(request):
+        """
+        Log the number of SQL statements that each request executes.
+
+        Statements that are executed over and over again (usually an N+1 query
+        in a loop) are logged as warnings. In dev the stats are also added to
+        the response in an X-DB-Query-Stats header.
+        """
+        with collect_query_stats() as stats:
+            try:
+                response = handler(request)
+            finally:
+                LOG.debug("%s %s: %s", request.method, request.path, stats)
+
+                for statement, count in stats.repeated(
+                    REPEATED_STATEMENT_WARNING
+                ).items():
+                    LOG.warning(
+                        "%s %s executed the same statement %d times: %s",
+                        request.method,
+                        request.path,
+                        count,
+                        statement,
+                    )
+
+        if dev:
+            response.headers["X-DB-Query-Stats"] = str(stats)
+
+        return response
+
+    return query_stats_tween
+
+
 def includeme(config):
     config.add_tween("lms.tweens.rollback_db_session_tween_factory", under=EXCVIEW)
+    # Over pyramid_tm so that committing the transaction is counted too.
+    config.add_tween(
+        "lms.tweens.query_stats_tween_factory", over="pyramid_tm.tm_tween_factory"
+    )
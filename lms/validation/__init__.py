@@ -45,6 +45,7 @@ suitable validation schema's ``__init__()`` method and then call the schema's
 """
 from lms.validation._api import (
     APIReadResultSchema,
+    APIReadResultsSchema,
     APIRecordResultSchema,
     APIRecordSpeedgraderSchema,
 )
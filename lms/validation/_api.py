@@ -5,7 +5,12 @@ from webargs import fields
 
 from lms.validation._base import JSONPyramidRequestSchema, PyramidRequestSchema
 
-__all__ = ["APIRecordSpeedgraderSchema", "APIReadResultSchema", "APIRecordResultSchema"]
+__all__ = [
+    "APIRecordSpeedgraderSchema",
+    "APIReadResultSchema",
+    "APIReadResultsSchema",
+    "APIRecordResultSchema",
+]
 
 
 class APIRecordSpeedgraderSchema(JSONPyramidRequestSchema):
@@ -51,6 +56,25 @@ class APIReadResultSchema(PyramidRequestSchema):
     """
 
 
+class APIReadResultsSchema(JSONPyramidRequestSchema):
+    """Schema for validating proxy requests to LTI Outcomes API for reading many grades."""
+
+    lis_outcome_service_url = fields.Str(required=True)
+    """URL provided by the LMS to submit grades or other results to."""
+
+    lis_result_sourcedids = fields.List(
+        fields.Str(),
+        required=True,
+        validate=marshmallow.validate.Length(min=1, max=50),
+    )
+    """
+    The `lis_result_sourcedid`s of the submissions to read the grades of.
+
+    The LMS is called for each of them, so callers with more than this should
+    page through them to keep each request short.
+    """
+
+
 class APIRecordResultSchema(JSONPyramidRequestSchema):
     """Schema for validating proxy requests to LTI Outcomes API for recording grades."""
 
@@ -4,6 +4,7 @@ from marshmallow import pre_load
 from pyramid.httpexceptions import HTTPUnsupportedMediaType
 from webargs import pyramidparser
 
+from lms.validation._compiled import Fallback, compile_schema
 from lms.validation._exceptions import ValidationError
 
 __all__ = ["PlainSchema", "PyramidRequestSchema", "RequestsResponseSchema"]
@@ -122,7 +123,14 @@ class JSONPyramidRequestSchema(PyramidRequestSchema):
 
 
 class RequestsResponseSchema(PlainSchema):
-    """Base class for schemas that validate ``requests`` lib responses."""
+    """
+    Base class for schemas that validate ``requests`` lib responses.
+
+    Responses are loaded by a compiled version of the schema if possible,
+    which is much faster than marshmallow for big responses, falling back on
+    marshmallow for schemas and responses that it can't handle (see
+    :mod:`lms.validation._compiled`). Either way the results are the same.
+    """
 
     def __init__(self, response):
         super().__init__()
@@ -138,6 +146,15 @@ class RequestsResponseSchema(PlainSchema):
 
         :raise lms.validation.ValidationError: if the response isn't valid
         """
+        if not args and not kwargs:
+            compiled = compile_schema(type(self), ignore_hooks=("_pre_load",))
+
+            if compiled:
+                try:
+                    return compiled.load(self, self._json())
+                except Fallback:
+                    pass
+
         try:
             result = self.load(self.context["response"], *args, **kwargs)
         except marshmallow.ValidationError as err:
@@ -153,3 +170,9 @@ class RequestsResponseSchema(PlainSchema):
             raise marshmallow.ValidationError(
                 "response doesn't have a valid JSON body"
             ) from err
+
+    def _json(self):
+        try:
+            return self.context["response"].json()
+        except (AttributeError, ValueError) as err:
+            raise Fallback() from err
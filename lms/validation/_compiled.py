@@ -0,0 +1,275 @@
+"""
+Fast-path loading of API responses with simple marshmallow schemas.
+
+marshmallow deserializes every field of every object one at a time, through
+several layers of method calls, and that dominates the time it takes to parse
+big API responses (for example a page of 1,000 files). Most of our response
+schemas only use a few simple field types though, and JSON values of the right
+types come out of those fields unchanged. So a schema can be "compiled" once
+into a flat loader that just checks the types of the values and copies them.
+
+A compiled loader only handles the happy path. As soon as it comes across
+anything that it doesn't handle exactly like marshmallow would (including
+every kind of invalid data) it raises `Fallback` and the caller must load the
+data with marshmallow instead. So the results and the errors are always the
+same as marshmallow's.
+"""
+import functools
+
+import marshmallow
+from marshmallow import fields, missing
+from marshmallow.decorators import POST_LOAD, VALIDATES_SCHEMA
+
+__all__ = ["Fallback", "compile_schema"]
+
+
+class Fallback(Exception):
+    """The data must be loaded by marshmallow instead."""
+
+
+class _Uncompilable(Exception):
+    """A schema uses features that compiled loaders don't support."""
+
+
+@functools.lru_cache(maxsize=None)
+def compile_schema(schema_class, ignore_hooks=()):
+    """
+    Return a compiled loader for `schema_class`, or None if it can't be compiled.
+
+    Each schema class is only compiled once.
+
+    :param schema_class: The marshmallow schema class to compile
+    :param ignore_hooks: Names of `pre_load` hooks that the caller does the
+        work of itself, before calling the loader
+    """
+    try:
+        return CompiledSchema(schema_class, ignore_hooks)
+    except _Uncompilable:
+        return None
+
+
+class CompiledSchema:
+    """A flat loader for the fields and hooks of a marshmallow schema."""
+
+    def __init__(self, schema_class, ignore_hooks=()):
+        hooks = _load_hooks(schema_class, ignore_hooks)
+
+        if set(hooks) - {
+            (VALIDATES_SCHEMA, True),
+            (POST_LOAD, True),
+            (POST_LOAD, False),
+        }:
+            raise _Uncompilable()
+
+        self._validators = hooks.get((VALIDATES_SCHEMA, True), [])
+        # marshmallow runs the pass_many post_load hooks first.
+        self._post_loads = [
+            (name, True) for name in hooks.get((POST_LOAD, True), [])
+        ] + [(name, False) for name in hooks.get((POST_LOAD, False), [])]
+        self._load_object = _compile_object(schema_class)
+
+    def load(self, schema, data):
+        """
+        Load `data` as `schema` (an instance of the compiled class) would.
+
+        :raise Fallback: if `data` must be loaded by marshmallow instead
+        """
+        many = bool(schema.many)
+
+        if many:
+            if type(data) is not list:  # pylint:disable=unidiomatic-typecheck
+                raise Fallback()
+            result = [self._load_object(item) for item in data]
+        else:
+            result = self._load_object(data)
+
+        try:
+            for name in self._validators:
+                getattr(schema, name)(result, partial=schema.partial, many=many)
+
+            for name, pass_many in self._post_loads:
+                processor = getattr(schema, name)
+
+                if many and not pass_many:
+                    result = [
+                        processor(item, many=many, partial=schema.partial)
+                        for item in result
+                    ]
+                else:
+                    result = processor(result, many=many, partial=schema.partial)
+        except marshmallow.ValidationError as err:
+            raise Fallback() from err
+
+        return result
+
+
+def _load_hooks(schema_class, ignore_hooks):
+    """Return `schema_class`'s load and validation hooks (minus `ignore_hooks`)."""
+    hooks = {}
+
+    # pylint:disable=protected-access
+    for key, names in schema_class._hooks.items():
+        names = [name for name in names if name not in ignore_hooks]
+
+        if not names:
+            continue
+
+        # Field validators (@validates) have a plain string key.
+        if not isinstance(key, tuple):
+            raise _Uncompilable()
+
+        if key[0].endswith("_dump"):
+            continue
+
+        for name in names:
+            hook_kwargs = getattr(schema_class, name).__marshmallow_hook__
+            if hook_kwargs[key].get("pass_original"):
+                raise _Uncompilable()
+
+        hooks[key] = names
+
+    return hooks
+
+
+def _compile_object(schema_class):
+    """Return a function that loads one object with `schema_class`'s fields."""
+    opts = schema_class.opts
+
+    if (
+        opts.unknown != marshmallow.EXCLUDE
+        or opts.fields
+        or opts.exclude
+        or opts.dump_only
+        or opts.ordered
+    ):
+        raise _Uncompilable()
+
+    compiled_fields = [
+        (
+            name if field.data_key is None else field.data_key,
+            field.attribute or name,
+            field.required,
+            field.load_default,
+            _compile_field(field),
+        )
+        # pylint:disable=protected-access
+        for name, field in schema_class._declared_fields.items()
+        if not field.dump_only
+    ]
+
+    if any("." in attribute for _, attribute, *_ in compiled_fields):
+        raise _Uncompilable()
+
+    def load_object(data):
+        if type(data) is not dict:  # pylint:disable=unidiomatic-typecheck
+            raise Fallback()
+
+        result = {}
+
+        for data_key, attribute, required, load_default, load_value in compiled_fields:
+            value = data.get(data_key, missing)
+
+            if value is not missing:
+                result[attribute] = load_value(value)
+            elif required:
+                raise Fallback()
+            elif load_default is not missing:
+                result[attribute] = (
+                    load_default() if callable(load_default) else load_default
+                )
+
+        return result
+
+    return load_object
+
+
+_EXACT_TYPES = {fields.String: str, fields.Integer: int, fields.Boolean: bool}
+"""Fields which return JSON values of these types unchanged."""
+
+
+def _compile_field(field):
+    """Return a function that loads a (present) value as `field` would."""
+    convert = _compile_converter(field)
+    allow_none = field.allow_none
+    validators = field.validators
+
+    def load_value(value):
+        if value is None:
+            if allow_none:
+                return None
+            raise Fallback()
+
+        value = convert(value)
+
+        for validator in validators:
+            try:
+                valid = validator(value)
+            except marshmallow.ValidationError as err:
+                raise Fallback() from err
+
+            # Validator functions return False to reject a value and may
+            # return None (or anything else) to accept it.
+            if (
+                valid is not None
+                and not valid
+                and not isinstance(validator, marshmallow.validate.Validator)
+            ):
+                raise Fallback()
+
+        return value
+
+    return load_value
+
+
+def _compile_converter(field):
+    field_class = type(field)
+
+    if field_class in _EXACT_TYPES:
+        if field_class is fields.Boolean and (
+            field.truthy is not fields.Boolean.truthy
+            or field.falsy is not fields.Boolean.falsy
+        ):
+            raise _Uncompilable()
+
+        return _exact_type(_EXACT_TYPES[field_class])
+
+    if field_class is fields.Raw:
+        return lambda value: value
+
+    if field_class is fields.List:
+        return _list_of(_compile_field(field.inner))
+
+    if field_class is fields.Nested:
+        nested = field.nested
+
+        if (
+            not (isinstance(nested, type) and issubclass(nested, marshmallow.Schema))
+            or field.only is not None
+            or field.exclude
+            or field.unknown
+            or _load_hooks(nested, ())
+        ):
+            raise _Uncompilable()
+
+        load_object = _compile_object(nested)
+        return _list_of(load_object) if field.many else load_object
+
+    raise _Uncompilable()
+
+
+def _exact_type(type_):
+    def convert(value):
+        if type(value) is not type_:  # pylint:disable=unidiomatic-typecheck
+            raise Fallback()
+        return value
+
+    return convert
+
+
+def _list_of(load_item):
+    def convert(value):
+        if type(value) is not list:  # pylint:disable=unidiomatic-typecheck
+            raise Fallback()
+        return [load_item(item) for item in value]
+
+    return convert
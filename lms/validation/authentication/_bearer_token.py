@@ -1,9 +1,12 @@
 """Schema for our bearer token-based LTI authentication."""
+import hashlib
+import time
 from datetime import timedelta
 
 import marshmallow
 
 from lms.models import LTIUser
+from lms.services.cache import TTLCache
 from lms.validation import ValidationError
 from lms.validation._base import PyramidRequestSchema
 from lms.validation.authentication._exceptions import (
@@ -66,6 +69,9 @@ class BearerTokenSchema(PyramidRequestSchema):
     display_name = marshmallow.fields.Str(required=True)
     email = marshmallow.fields.Str()
 
+    _verified_lti_users = TTLCache(ttl=0, maxsize=4096)
+    """LTIUsers from bearer tokens that have been verified, until they expire."""
+
     def __init__(self, request):
         super().__init__(request)
         self.context["secret"] = request.registry.settings["jwt_secret"]
@@ -130,6 +136,38 @@ class BearerTokenSchema(PyramidRequestSchema):
                     exc_class = InvalidSessionTokenError
             raise exc_class(messages=error.messages) from error
 
+    @classmethod
+    def cached_lti_user(cls, request, location, authorization):
+        """
+        Return an models.LTIUser from the request's authorization param.
+
+        The same as ``lti_user()`` except that the LTIUsers from valid bearer
+        tokens are cached (keyed by a digest of the token) until the tokens
+        expire. Requests with a bearer token that has already been verified
+        don't construct a schema or verify the token again.
+
+        :arg request: the Pyramid request
+        :arg location: where the authorization param is in the request
+        :arg authorization: the value of the request's authorization param, a
+            ``"Bearer <ENCODED_JWT>"`` string
+
+        :raise: the same exceptions as ``lti_user()``
+        :rtype: LTIUser
+        """
+        secret = request.registry.settings["jwt_secret"]
+        key = hashlib.sha256(f"{secret}\n{authorization}".encode("utf-8")).digest()
+
+        lti_user = cls._verified_lti_users.get(key)
+
+        if lti_user is None:
+            schema = cls(request)
+            lti_user = schema.lti_user(location=location)
+            cls._verified_lti_users.set(
+                key, lti_user, ttl=schema.context["expires_at"] - time.time()
+            )
+
+        return lti_user
+
     @marshmallow.post_dump
     def _encode_jwt(self, data, **_kwargs):
         """
@@ -149,6 +187,8 @@ class BearerTokenSchema(PyramidRequestSchema):
         """
         Return the payload from the JWT in the authorization param in ``data``.
 
+        The JWT's expiry time is put in ``self.context["expires_at"]``.
+
         This uses a Marshmallow technique called "enveloping", see:
 
         https://marshmallow.readthedocs.io/en/2.x-line/extending.html#example-enveloping
@@ -161,7 +201,9 @@ class BearerTokenSchema(PyramidRequestSchema):
         jwt = data["authorization"][len("Bearer ") :]
 
         try:
-            return _jwt.decode_jwt(jwt, self.context["secret"])
+            payload, self.context["expires_at"] = _jwt.decode_jwt_with_expiry(
+                jwt, self.context["secret"]
+            )
         except ExpiredJWTError as err:
             raise marshmallow.ValidationError(
                 "Expired session token", "authorization"
@@ -171,6 +213,8 @@ class BearerTokenSchema(PyramidRequestSchema):
                 "Invalid session token", "authorization"
             ) from err
 
+        return payload
+
     @marshmallow.post_load
     def _make_user(self, data, **_kwargs):  # pylint:disable=no-self-use
         # See https://marshmallow.readthedocs.io/en/2.x-line/quickstart.html#deserializing-to-objects
@@ -6,7 +6,7 @@ import jwt
 
 from lms.validation.authentication._exceptions import ExpiredJWTError, InvalidJWTError
 
-__all__ = ["decode_jwt", "encode_jwt"]
+__all__ = ["decode_jwt", "decode_jwt_with_expiry", "encode_jwt"]
 
 
 def decode_jwt(jwt_str, secret):
@@ -26,6 +26,22 @@ def decode_jwt(jwt_str, secret):
     :return: ``jwt_str``'s payload, decoded
     :rtype: dict
     """
+    payload, _exp = decode_jwt_with_expiry(jwt_str, secret)
+    return payload
+
+
+def decode_jwt_with_expiry(jwt_str, secret):
+    """
+    Return the payload decoded from ``jwt_str`` and its expiry time.
+
+    The same as ``decode_jwt()`` but also returns the UNIX time that
+    ``jwt_str`` expires at (its ``exp`` claim).
+
+    :raise ExpiredJWTError: if the JWT's timestamp has expired
+    :raise InvalidJWTError: if decoding fails for any other reason
+
+    :rtype: tuple(dict, int)
+    """
     try:
         payload = jwt.decode(
             jwt_str, secret, algorithms=["HS256"], options={"require": ["exp"]}
@@ -35,8 +51,8 @@ def decode_jwt(jwt_str, secret):
     except jwt.InvalidTokenError as err:
         raise InvalidJWTError() from err
 
-    del payload["exp"]
-    return payload
+    exp = payload.pop("exp")
+    return payload, exp
 
 
 ONE_HOUR = datetime.timedelta(hours=1)
@@ -79,7 +79,9 @@ class AdminViews:
         require_csrf=True,
     )
     def update_instance(self):
-        ai = self._get_ai_or_404(self.request.matchdict["consumer_key"])
+        ai = self._get_ai_or_404(
+            self.request.matchdict["consumer_key"], for_update=True
+        )
 
         for setting, sub_setting in (
             ("canvas", "sections_enabled"),
@@ -100,8 +102,10 @@ class AdminViews:
             )
         )
 
-    def _get_ai_or_404(self, consumer_key):
+    def _get_ai_or_404(self, consumer_key, for_update=False):
         try:
+            if for_update:
+                return self.application_instance_service.get_for_update(consumer_key)
             return self.application_instance_service.get(consumer_key)
         except ConsumerKeyError as err:
             raise HTTPNotFound() from err
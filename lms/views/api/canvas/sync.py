@@ -86,6 +86,9 @@ class Sync:
             raise CanvasGroupSetNotFound(group_set=group_set_id) from canvas_api_error
 
         if not groups:
+            # The instructor is told to add groups in Canvas and try again, so
+            # don't serve them this empty response from the cache again.
+            self._canvas_api.invalidate("group_category_groups", group_set_id)
             raise CanvasGroupSetEmpty(group_set=group_set_id)
 
         return groups
@@ -119,30 +122,19 @@ class Sync:
         tool_guid = self._request.json["lms"]["tool_consumer_instance_guid"]
         context_id = self._request.json["course"]["context_id"]
 
-        return [
-            self._grouping_service.upsert_canvas_group(
-                tool_consumer_instance_guid=tool_guid,
-                context_id=context_id,
-                group_name=group["name"],
-                group_id=group["id"],
-                group_set_id=group["group_category_id"],
-            )
-            for group in groups
-        ]
+        return self._grouping_service.upsert_canvas_groups(
+            tool_consumer_instance_guid=tool_guid, context_id=context_id, groups=groups
+        )
 
     def _to_section_groupings(self, sections):
         tool_guid = self._request.json["lms"]["tool_consumer_instance_guid"]
         context_id = self._request.json["course"]["context_id"]
 
-        return [
-            self._grouping_service.upsert_canvas_section(
-                tool_consumer_instance_guid=tool_guid,
-                context_id=context_id,
-                section_id=section["id"],
-                section_name=section["name"],
-            )
-            for section in sections
-        ]
+        return self._grouping_service.upsert_canvas_sections(
+            tool_consumer_instance_guid=tool_guid,
+            context_id=context_id,
+            sections=sections,
+        )
 
     def _sync_to_h(self, groups):
         lti_h_svc = self._request.find_service(name="lti_h")
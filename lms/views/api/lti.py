@@ -4,8 +4,10 @@ from datetime import timezone
 from pyramid.view import view_config, view_defaults
 
 from lms.security import Permissions
+from lms.services import LTIOutcomesAPIError
 from lms.validation import (
     APIReadResultSchema,
+    APIReadResultsSchema,
     APIRecordResultSchema,
     APIRecordSpeedgraderSchema,
 )
@@ -45,6 +47,28 @@ class LTIOutcomesViews:
 
         return {"currentScore": current_score}
 
+    @view_config(route_name="lti_api.results.read", schema=APIReadResultsSchema)
+    def read_results(self):
+        """
+        Proxy requests for many students' current results to LTI Outcomes Result API.
+
+        The LMS's API is called concurrently for the students and their
+        results are returned together. If reading a student's result fails
+        the others are still returned, along with an error for that student.
+        """
+        results = self.lti_outcomes_client.read_results(
+            self.parsed_params["lis_result_sourcedids"]
+        )
+
+        return {
+            "results": {
+                lis_result_sourcedid: {"error": result.explanation}
+                if isinstance(result, LTIOutcomesAPIError)
+                else {"currentScore": result}
+                for lis_result_sourcedid, result in results.items()
+            }
+        }
+
     @view_config(
         route_name="lti_api.submissions.record", schema=APIRecordSpeedgraderSchema
     )
@@ -41,7 +41,7 @@ class BasicLTILaunchViews:
         self.context.js_config.enable_lti_launch_mode()
         self.context.js_config.maybe_set_focused_user()
 
-        request.find_service(name="application_instance").get().update_lms_data(
+        request.find_service(name="application_instance").update_lms_data(
             self.request.params
         )
 
@@ -101,7 +101,8 @@ class BasicLTILaunchViews:
         the assignment we have to use this ``file_id`` to get a download URL
         for the file from the Canvas API. We then pass that download URL to
         Via. We have to re-do this file-ID-for-download-URL exchange on every
-        single launch because Canvas's download URLs are temporary.
+        single launch because Canvas's download URLs are temporary (though
+        CanvasAPIClient caches each URL until shortly before it expires).
         """
 
         course_id = self.request.params["custom_canvas_course_id"]
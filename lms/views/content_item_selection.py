@@ -49,9 +49,7 @@ from lms.validation import ContentItemSelectionLTILaunchSchema
     schema=ContentItemSelectionLTILaunchSchema,
 )
 def content_item_selection(context, request):
-    request.find_service(name="application_instance").get().update_lms_data(
-        request.params
-    )
+    request.find_service(name="application_instance").update_lms_data(request.params)
 
     context.get_or_create_course()
 
@@ -1,8 +1,20 @@
+import sqlalchemy as sa
 from pyramid.view import view_config
 
-from lms.models import ApplicationInstance, LtiLaunches
+from lms.models import ApplicationInstance, LtiLaunchRollup
 from lms.security import Permissions
 
+PAGE_SIZE = 100
+"""The number of rows in each page of the tables in the report."""
+
+LAUNCH_SORTS = {
+    "launches": lambda totals: totals.launches.desc(),
+    "last_launch": lambda totals: totals.last_launch.desc(),
+    "context_id": lambda totals: totals.context_id,
+    "consumer_key": lambda totals: totals.lti_key,
+}
+"""The orders that the launches table can be sorted in, by launch totals columns."""
+
 
 @view_config(
     route_name="reports",
@@ -10,17 +22,113 @@ from lms.security import Permissions
     permission=Permissions.REPORTS_VIEW,
 )
 def list_application_instances(request):
+    sort = request.params.get("sort")
+    if sort not in LAUNCH_SORTS:
+        sort = "launches"
+
+    def order(totals):
+        return LAUNCH_SORTS[sort](totals), totals.lti_key, totals.context_id
+
+    # Get the page of launch totals first and then look up the application
+    # instances for just the rows in the page.
+    page = _page_number(request, "page")
+    totals = _launch_totals().subquery()
+    page_of_totals = _page(
+        sa.select(totals).order_by(*order(totals.c)), page
+    ).subquery()
     launches = request.db.execute(
-        "SELECT context_id, count(context_id), \
-      lms_url, requesters_email, consumer_key FROM lti_launches LEFT JOIN \
-      application_instances on \
-      lti_launches.lti_key=application_instances.consumer_key GROUP BY \
-      context_id, consumer_key, requesters_email, lms_url ORDER BY \
-      count(CONTEXT_ID) DESC;"
+        sa.select(
+            page_of_totals.c.context_id,
+            page_of_totals.c.launches,
+            ApplicationInstance.lms_url,
+            ApplicationInstance.requesters_email,
+            page_of_totals.c.lti_key,
+        )
+        .outerjoin_from(
+            page_of_totals,
+            ApplicationInstance,
+            ApplicationInstance.consumer_key == page_of_totals.c.lti_key,
+        )
+        .order_by(*order(page_of_totals.c))
+    ).fetchall()
+
+    apps_page = _page_number(request, "apps_page")
+    apps = request.db.execute(
+        _page(
+            sa.select(ApplicationInstance).order_by(ApplicationInstance.id), apps_page
+        )
     ).fetchall()
+
     return {
-        "apps": request.db.query(ApplicationInstance).all(),
-        "launches": launches,
-        "num_launches": request.db.query(LtiLaunches).count(),
+        "apps": [row[0] for row in apps[:PAGE_SIZE]],
+        "apps_pages": _page_urls(request, "apps_page", apps_page, apps),
+        "num_apps": request.db.query(ApplicationInstance).count(),
+        "launches": launches[:PAGE_SIZE],
+        "launches_pages": _page_urls(request, "page", page, launches),
+        "num_launches": request.db.execute(
+            sa.select(sa.func.coalesce(sa.func.sum(LtiLaunchRollup.launches), 0))
+        ).scalar(),
+        "sort": sort,
+        "sort_urls": {
+            name: _url(request, sort=name, page=None) for name in LAUNCH_SORTS
+        },
         "logout_url": request.route_url("logout"),
     }
+
+
+def _launch_totals():
+    """Return a query for the number of launches per context and consumer key."""
+    return (
+        sa.select(
+            LtiLaunchRollup.context_id,
+            LtiLaunchRollup.lti_key,
+            sa.func.sum(LtiLaunchRollup.launches).label("launches"),
+            sa.func.max(LtiLaunchRollup.day).label("last_launch"),
+        )
+        # Launches without a context ID are included in the total number of
+        # launches but not listed.
+        .where(LtiLaunchRollup.context_id != LtiLaunchRollup.MISSING).group_by(
+            LtiLaunchRollup.context_id, LtiLaunchRollup.lti_key
+        )
+    )
+
+
+def _page_number(request, param):
+    """Return the page number in the query param `param` (defaulting to 1)."""
+    try:
+        return max(int(request.params.get(param, 1)), 1)
+    except ValueError:
+        return 1
+
+
+def _page(query, page):
+    """
+    Return `query` limited to the rows of page number `page`.
+
+    One extra row is included to find out whether there's a next page.
+    """
+    return query.limit(PAGE_SIZE + 1).offset((page - 1) * PAGE_SIZE)
+
+
+def _page_urls(request, param, page, rows):
+    """
+    Return the URLs of the pages before and after page number `page`.
+
+    :param param: The name of the query param with the page number in it
+    :param rows: The rows of the page, including the extra row (see `_page()`)
+    """
+    return {
+        "prev": _url(request, **{param: page - 1}) if page > 1 else None,
+        "next": _url(request, **{param: page + 1}) if len(rows) > PAGE_SIZE else None,
+    }
+
+
+def _url(request, **params):
+    """Return the URL of the report with `params` changed (or removed if None)."""
+    query = dict(request.params)
+    query.update(params)
+
+    return request.route_url(
+        "reports",
+        _query={key: value for key, value in query.items() if value is not None},
+    )
@@ -1,5 +1,6 @@
 import functools
 import os
+from contextlib import contextmanager
 from unittest import mock
 
 import factory.random
@@ -7,6 +8,7 @@ import pytest
 import sqlalchemy
 
 from lms import db
+from lms.db import collect_query_stats, instrument
 
 
 def get_test_database_url(default):
@@ -61,6 +63,35 @@ def db_engine():
     return engine
 
 
+@pytest.fixture
+def query_budget(db_engine):
+    """
+    Return a context manager that limits the SQL statements run inside it.
+
+    The test fails if the code in the `with` block executes more than
+    `statements` SQL statements or the same statement more than `max_repeats`
+    times (for example an N+1 query in a loop):
+
+        with query_budget(statements=2):
+            ...
+    """
+    instrument(db_engine)
+
+    @contextmanager
+    def query_budget(statements, max_repeats=1):
+        with collect_query_stats() as stats:
+            yield stats
+
+        assert (
+            stats.statements <= statements
+        ), f"{stats.statements} SQL statements executed (budget {statements})"
+        assert not stats.repeated(
+            max_repeats + 1
+        ), f"SQL statements repeated: {stats.repeated(max_repeats + 1)}"
+
+    return query_budget
+
+
 def autopatcher(request, target, **kwargs):
     """Patch and cleanup automatically. Wraps :py:func:`mock.patch`."""
     options = {"autospec": True}
@@ -69,6 +69,18 @@ class TestConfigure:
 
         assert configurator.registry.settings["dev"] is True
 
+    def test_h_sync_deferred_can_be_set_to_True(self, setting_getter):
+        def get(envvar_name, *_args, **_kwargs):
+            if envvar_name == "H_SYNC_DEFERRED":
+                return "true"
+            return mock.DEFAULT
+
+        setting_getter.get.side_effect = get
+
+        configurator = configure({})
+
+        assert configurator.registry.settings["h_sync_deferred"] is True
+
     def test_the_aes_secret_setting_is_the_LMS_SECRET_env_var_as_a_byte_string(
         self, setting_getter
     ):
@@ -1,9 +1,10 @@
 import pytest
 import sqlalchemy as sa
 from h_matchers import Any
-from sqlalchemy.engine import CursorResult
 
 from lms.db import BASE, BulkAction
+from lms.models import GroupInfo
+from tests import factories
 
 
 class TestBulkAction:
@@ -44,7 +45,7 @@ class TestBulkAction:
             ],
         )
 
-        assert isinstance(result, CursorResult)
+        assert result == 3
 
         self.assert_has_rows(
             db_session,
@@ -54,8 +55,168 @@ class TestBulkAction:
             {"id": 4, "name": "over_block_size", "other": "post_4"},
         )
 
-    def test_upsert_does_nothing_if_given_an_empty_list_of_values(self, db_session):
-        assert BulkAction(db_session).upsert(self.TableWithBulkUpsert, []) == []
+    def test_upsert_returning(self, db_session):
+        existing = self.TableWithBulkUpsert(id=1, name="pre_existing_1")
+        db_session.add(existing)
+        db_session.flush()
+
+        result = BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [{"id": 1, "name": "update_old"}, {"id": 2, "name": "create_with_id"}],
+            returning=True,
+        )
+
+        assert (
+            result
+            == Any.list.containing(
+                [
+                    existing,
+                    Any.instance_of(self.TableWithBulkUpsert).with_attrs(
+                        {"id": 2, "name": "create_with_id"}
+                    ),
+                ]
+            ).only()
+        )
+        # The object that was already in the session has been updated.
+        assert existing.name == "update_old"
+
+    def test_upsert_with_update_elements(self, db_session):
+        db_session.add(self.TableWithBulkUpsert(id=1, name="old_name", other="old"))
+        db_session.flush()
+
+        BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [{"id": 1, "name": "new_name", "other": "new"}],
+            update_elements=["other"],
+        )
+
+        self.assert_has_rows(db_session, {"id": 1, "name": "old_name", "other": "new"})
+
+    @pytest.mark.parametrize("copy", (False, True))
+    def test_upsert_in_chunks(self, db_session, copy):
+        db_session.add(self.TableWithBulkUpsert(id=1, name="pre_existing_1"))
+        db_session.flush()
+
+        def values():
+            for i in range(1, 8):
+                yield {"id": i, "name": f"name_{i}"}
+
+        result = BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert, values(), chunk_size=3, copy=copy
+        )
+
+        assert result == 7
+        self.assert_has_rows(
+            db_session, *[{"id": i, "name": f"name_{i}"} for i in range(1, 8)]
+        )
+
+    def test_upsert_executes_one_statement_per_chunk(self, db_session, inserts):
+        BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [{"id": i, "name": f"name_{i}"} for i in range(7)],
+            chunk_size=3,
+        )
+
+        assert len(inserts) == 3
+
+    def test_upsert_keeps_chunks_within_the_bind_parameter_limit(
+        self, db_session, inserts, monkeypatch
+    ):
+        monkeypatch.setattr(BulkAction, "MAX_PARAMETERS", 6)
+
+        BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [{"id": i, "name": f"name_{i}", "other": "other"} for i in range(5)],
+        )
+
+        # 3 columns per row, so only 2 rows fit in each statement.
+        assert len(inserts) == 3
+
+    @pytest.mark.parametrize("copy", (False, True))
+    @pytest.mark.usefixtures("with_upsert_use_onupdate")
+    def test_upsert_doesnt_modify_the_values(self, db_session, copy):
+        values = [{"id": 1, "name": "name"}]
+
+        BulkAction(db_session).upsert(self.TableWithBulkUpsert, values, copy=copy)
+
+        assert values == [{"id": 1, "name": "name"}]
+
+    def test_upsert_with_copy(self, db_session):
+        db_session.add(
+            self.TableWithBulkUpsert(id=1, name="pre_existing_1", other="pre")
+        )
+        db_session.flush()
+
+        result = BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [
+                {"id": 1, "name": "update_old", "other": "post_1"},
+                {"id": 2, "name": "tab\tnew\nline\r\\N", "other": None},
+            ],
+            copy=True,
+        )
+
+        assert result == 2
+        self.assert_has_rows(
+            db_session,
+            {"id": 1, "name": "update_old", "other": "pre"},
+            {"id": 2, "name": "tab\tnew\nline\r\\N", "other": None},
+        )
+
+    def test_upsert_with_copy_returning(self, db_session):
+        result = BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [{"id": 1, "name": "name"}],
+            returning=True,
+            copy=True,
+        )
+
+        assert result == [
+            Any.instance_of(self.TableWithBulkUpsert).with_attrs(
+                {"id": 1, "name": "name"}
+            )
+        ]
+
+    def test_upsert_with_copy_can_be_repeated_in_a_transaction(self, db_session):
+        bulk = BulkAction(db_session)
+
+        bulk.upsert(self.TableWithBulkUpsert, [{"id": 1, "name": "first"}], copy=True)
+        bulk.upsert(self.TableWithBulkUpsert, [{"id": 1, "name": "second"}], copy=True)
+
+        self.assert_has_rows(db_session, {"id": 1, "name": "second"})
+
+    def test_upsert_with_copy_json(self, db_session):
+        application_instance = factories.ApplicationInstance()
+        db_session.flush()
+
+        result = BulkAction(db_session).upsert(
+            GroupInfo,
+            [
+                {
+                    "authority_provided_id": "authority_provided_id",
+                    "consumer_key": application_instance.consumer_key,
+                    "info": {"type": "course", "list": ["tab\t"]},
+                }
+            ],
+            returning=True,
+            copy=True,
+        )
+
+        # pylint:disable=protected-access
+        assert result[0]._info == {"type": "course", "list": ["tab\t"]}
+
+    @pytest.mark.parametrize("returning,expected", ((False, 0), (True, [])))
+    def test_upsert_does_nothing_if_given_an_empty_list_of_values(
+        self, db_session, inserts, returning, expected
+    ):
+
+        assert (
+            BulkAction(db_session).upsert(
+                self.TableWithBulkUpsert, iter([]), returning=returning
+            )
+            == expected
+        )
+        assert not inserts
 
     @pytest.mark.parametrize("column", ("scalar", "callable", "sql", "default"))
     @pytest.mark.usefixtures("with_upsert_use_onupdate")
@@ -79,6 +240,50 @@ class TestBulkAction:
             {"id": 2, "name": "pre_existing_2", column: 1},
         )
 
+    @pytest.mark.parametrize("copy", (False, True))
+    @pytest.mark.usefixtures("with_upsert_use_onupdate", "with_upsert_only_changed")
+    def test_upsert_only_changed(self, db_session, copy):
+        db_session.add_all(
+            [
+                self.TableWithBulkUpsert(id=1, name="unchanged", scalar=0),
+                self.TableWithBulkUpsert(id=2, name="old_name", scalar=0),
+            ]
+        )
+        db_session.flush()
+
+        result = BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [
+                {"id": 1, "name": "unchanged"},
+                {"id": 2, "name": "new_name"},
+                {"id": 3, "name": "new_row"},
+            ],
+            copy=copy,
+        )
+
+        assert result == 2
+        self.assert_has_rows(
+            db_session,
+            # The unchanged row wasn't updated at all.
+            {"id": 1, "name": "unchanged", "scalar": 0},
+            {"id": 2, "name": "new_name", "scalar": 42},
+            {"id": 3, "name": "new_row"},
+        )
+
+    @pytest.mark.usefixtures("with_upsert_only_changed")
+    def test_upsert_only_changed_compares_nulls(self, db_session):
+        db_session.add(self.TableWithBulkUpsert(id=1, name="name", other=None))
+        db_session.flush()
+
+        result = BulkAction(db_session).upsert(
+            self.TableWithBulkUpsert,
+            [{"id": 1, "name": "name", "other": "other"}],
+            update_elements=["other"],
+        )
+
+        assert result == 1
+        self.assert_has_rows(db_session, {"id": 1, "name": "name", "other": "other"})
+
     def test_it_fails_with_missing_config(self, db_session):
         with pytest.raises(AttributeError):
             BulkAction(db_session).upsert(
@@ -107,6 +312,27 @@ class TestBulkAction:
             ).only()
         )
 
+    @pytest.fixture
+    def inserts(self, db_session):
+        """Return the INSERT statements that the test executes."""
+        statements = []
+
+        def before_cursor_execute(
+            _conn, _cursor, statement, _parameters, _context, _executemany
+        ):
+            if statement.startswith("INSERT INTO test_table_with_bulk_upsert"):
+                statements.append(statement)
+
+        sa.event.listen(db_session.bind, "before_cursor_execute", before_cursor_execute)
+        yield statements
+        sa.event.remove(db_session.bind, "before_cursor_execute", before_cursor_execute)
+
+    @pytest.fixture
+    def with_upsert_only_changed(self):
+        self.TableWithBulkUpsert.BULK_CONFIG.upsert_only_changed = True
+        yield
+        self.TableWithBulkUpsert.BULK_CONFIG.upsert_only_changed = False
+
     @pytest.fixture
     def with_upsert_use_onupdate(self):
         self.TableWithBulkUpsert.BULK_CONFIG.upsert_use_onupdate = True
@@ -0,0 +1,192 @@
+import csv
+import gzip
+from datetime import date, datetime
+
+import pytest
+import sqlalchemy as sa
+
+from lms.db._partitions import MonthlyPartitions, add_months
+from lms.models import LtiLaunches
+
+
+class TestMonthlyPartitions:
+    def test_name(self, partitions):
+        assert partitions.name(date(2021, 9, 1)) == "lti_launches_y2021m09"
+
+    def test_months_is_empty_if_there_are_only_the_default_partition(
+        self, partitions, connection
+    ):
+        assert not partitions.months(connection)
+
+    def test_create(self, partitions, connection, db_session):
+        partitions.create(connection, date(2021, 10, 1))
+        partitions.create(connection, date(2021, 9, 1))
+        # Creating one that already exists does nothing.
+        partitions.create(connection, date(2021, 10, 1))
+
+        assert partitions.months(connection) == [date(2021, 9, 1), date(2021, 10, 1)]
+        add_launch(db_session, datetime(2021, 10, 31, 23, 59))
+        assert self.partition_counts(connection) == {"lti_launches_y2021m10": 1}
+
+    def test_create_moves_rows_out_of_the_default_partition(
+        self, partitions, connection, db_session
+    ):
+        add_launch(db_session, datetime(2021, 10, 1))
+        add_launch(db_session, datetime(2021, 11, 1))
+
+        partitions.create(connection, date(2021, 10, 1))
+
+        assert self.partition_counts(connection) == {
+            "lti_launches_y2021m10": 1,
+            "lti_launches_default": 1,
+        }
+
+    def test_maintain_creates_partitions_for_the_coming_months(
+        self, partitions, connection
+    ):
+        partitions.create(connection, date(2021, 11, 1))
+
+        created, removed, removed_default_rows = partitions.maintain(
+            connection, date(2021, 10, 15), months_ahead=2
+        )
+
+        assert created == [date(2021, 10, 1), date(2021, 12, 1)]
+        assert not removed
+        assert not removed_default_rows
+        assert partitions.months(connection) == [
+            date(2021, 10, 1),
+            date(2021, 11, 1),
+            date(2021, 12, 1),
+        ]
+
+    def test_maintain_removes_expired_partitions(
+        self, partitions, connection, db_session, tmp_path
+    ):
+        for month in [7, 8, 9, 10]:
+            partitions.create(connection, date(2021, month, 1))
+        add_launch(db_session, datetime(2021, 7, 2), context_id="context\nid")
+        add_launch(db_session, datetime(2021, 9, 2))
+
+        _, removed, _ = partitions.maintain(
+            connection,
+            date(2021, 10, 15),
+            months_ahead=0,
+            retention_months=1,
+            archive_dir=tmp_path,
+        )
+
+        assert removed == [date(2021, 7, 1), date(2021, 8, 1)]
+        assert partitions.months(connection) == [date(2021, 9, 1), date(2021, 10, 1)]
+        assert self.partition_counts(connection) == {"lti_launches_y2021m09": 1}
+        assert not connection.execute(
+            sa.text("SELECT to_regclass('lti_launches_y2021m07')")
+        ).scalar()
+        with gzip.open(tmp_path / "lti_launches_y2021m07.csv.gz", "rt") as file:
+            rows = list(csv.DictReader(file))
+        assert rows == [
+            {
+                "id": rows[0]["id"],
+                "created": "2021-07-02 00:00:00",
+                "context_id": "context\nid",
+                "lti_key": "lti_key",
+            }
+        ]
+        assert (tmp_path / "lti_launches_y2021m08.csv.gz").exists()
+
+    def test_maintain_without_an_archive_dir(
+        self, partitions, connection, db_session, tmp_path
+    ):
+        partitions.create(connection, date(2021, 7, 1))
+
+        add_launch(db_session, datetime(1970, 1, 1))
+
+        _, removed, removed_default_rows = partitions.maintain(
+            connection, date(2021, 10, 15), months_ahead=0, retention_months=0
+        )
+
+        assert removed == [date(2021, 7, 1)]
+        assert removed_default_rows == 1
+        assert partitions.months(connection) == [date(2021, 10, 1)]
+        assert not list(tmp_path.iterdir())
+
+    def test_maintain_removes_expired_rows_from_the_default_partition(
+        self, partitions, connection, db_session, tmp_path
+    ):
+        partitions.create(connection, date(2021, 9, 1))
+        add_launch(db_session, datetime(1970, 1, 1))
+        add_launch(db_session, datetime(2021, 8, 31))
+        add_launch(db_session, datetime(2021, 9, 2))
+        add_launch(db_session, datetime(2022, 1, 1))
+
+        _, _, removed_default_rows = partitions.maintain(
+            connection,
+            date(2021, 9, 15),
+            months_ahead=0,
+            retention_months=0,
+            archive_dir=tmp_path,
+        )
+
+        assert removed_default_rows == 2
+        assert self.partition_counts(connection) == {
+            "lti_launches_y2021m09": 1,
+            "lti_launches_default": 1,
+        }
+        with gzip.open(
+            tmp_path / "lti_launches_default_before_y2021m09.csv.gz", "rt"
+        ) as file:
+            rows = list(csv.DictReader(file))
+        assert [row["created"] for row in rows] == [
+            "1970-01-01 00:00:00",
+            "2021-08-31 00:00:00",
+        ]
+
+    def test_maintain_doesnt_export_the_default_partition_if_it_has_no_expired_rows(
+        self, partitions, connection, tmp_path
+    ):
+        partitions.maintain(
+            connection,
+            date(2021, 9, 15),
+            months_ahead=0,
+            retention_months=0,
+            archive_dir=tmp_path,
+        )
+
+        assert not list(tmp_path.iterdir())
+
+    def partition_counts(self, connection):
+        return dict(
+            connection.execute(
+                sa.text(
+                    "SELECT tableoid::regclass::text, count(*) FROM lti_launches "
+                    "GROUP BY tableoid"
+                )
+            ).fetchall()
+        )
+
+    @pytest.fixture
+    def partitions(self):
+        return MonthlyPartitions(LtiLaunches.__table__)
+
+    @pytest.fixture
+    def connection(self, db_session):
+        return db_session.connection()
+
+
+@pytest.mark.parametrize(
+    "month,months,expected",
+    [
+        (date(2021, 10, 1), 0, date(2021, 10, 1)),
+        (date(2021, 10, 1), 3, date(2022, 1, 1)),
+        (date(2021, 1, 1), -1, date(2020, 12, 1)),
+        (date(2021, 10, 1), -22, date(2019, 12, 1)),
+    ],
+)
+def test_add_months(month, months, expected):
+    assert add_months(month, months) == expected
+
+
+def add_launch(db_session, created, context_id="context_id"):
+    db_session.add(
+        LtiLaunches(created=created, context_id=context_id, lti_key="lti_key")
+    )
+    db_session.flush()
@@ -0,0 +1,71 @@
+import pytest
+import sqlalchemy as sa
+
+from lms.db._query_stats import QueryStats, collect_query_stats, instrument
+
+
+class TestQueryStats:
+    def test_add(self, stats):
+        stats.add("SELECT 1", 0.5)
+        stats.add("SELECT 2", 0.25)
+
+        assert stats.statements == 2
+        assert stats.duration == 0.75
+
+    def test_repeated(self, stats):
+        for statement in ["SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"] * 2:
+            stats.add(statement, 0)
+
+        assert stats.repeated() == {"SELECT 1": 4, "SELECT 2": 2, "SELECT 3": 2}
+        assert stats.repeated(3) == {"SELECT 1": 4}
+
+    def test_str(self, stats):
+        stats.add("SELECT 1", 0.0015)
+        stats.add("SELECT 1", 0.001)
+
+        assert str(stats) == "statements=2; time_ms=2.5; max_repeats=2"
+
+    def test_str_with_no_statements(self, stats):
+        assert str(stats) == "statements=0; time_ms=0.0; max_repeats=0"
+
+    @pytest.fixture
+    def stats(self):
+        return QueryStats()
+
+
+class TestCollectQueryStats:
+    def test_it_counts_the_statements_executed_in_the_block(self, connection):
+        with collect_query_stats() as stats:
+            connection.execute(sa.text("SELECT 1"))
+            connection.execute(sa.text("SELECT 1"))
+        connection.execute(sa.text("SELECT 2"))
+
+        assert stats.statements == 2
+        assert stats.duration > 0
+        assert stats.repeated() == {"SELECT 1": 2}
+
+    def test_nested_blocks_are_counted_by_the_outer_blocks_too(self, connection):
+        with collect_query_stats() as outer:
+            connection.execute(sa.text("SELECT 1"))
+            with collect_query_stats() as inner:
+                connection.execute(sa.text("SELECT 2"))
+            connection.execute(sa.text("SELECT 3"))
+
+        assert outer.statements == 3
+        assert inner.statements == 1
+
+    def test_instrumenting_an_engine_twice_counts_statements_once(
+        self, db_engine, connection
+    ):
+        instrument(db_engine)
+
+        with collect_query_stats() as stats:
+            connection.execute(sa.text("SELECT 1"))
+
+        assert stats.statements == 1
+
+    @pytest.fixture
+    def connection(self, db_engine):
+        instrument(db_engine)
+        with db_engine.connect() as connection:
+            yield connection
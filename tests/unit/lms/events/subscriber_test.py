@@ -1,3 +1,5 @@
+import logging
+
 import pytest
 from h_matchers import Any
 
@@ -42,6 +44,30 @@ class TestFilesDiscovered:
             Any.instance_of(File).with_attrs(new_attrs)
         ]
 
+    @pytest.mark.parametrize("name,message", (("new", "1 of 1"), (None, "0 of 1")))
+    @pytest.mark.usefixtures("existing_file")
+    def test_it_logs_how_many_files_were_new_or_changed(
+        self, pyramid_request, existing_attrs, caplog, name, message
+    ):
+        caplog.set_level(logging.DEBUG)
+
+        files_discovered(
+            event=FilesDiscoveredEvent(
+                request=pyramid_request, values=[dict(existing_attrs, name=name)]
+            )
+        )
+
+        assert caplog.messages == [f"{message} discovered files were new or changed"]
+
+    def test_query_budget(self, pyramid_request, db_session, query_budget):
+        db_session.flush()
+        values = [{"type": "file", "lms_id": f"id_{i}"} for i in range(20)]
+
+        with query_budget(statements=1):
+            files_discovered(
+                event=FilesDiscoveredEvent(request=pyramid_request, values=values)
+            )
+
     # We don't cover the application instance id here 'cos it's annoying
     @pytest.mark.parametrize("field", ("type", "lms_id", "course_id"))
     @pytest.mark.usefixtures("existing_file")
@@ -1,8 +1,7 @@
-import factory
 import pytest
 from sqlalchemy.exc import IntegrityError
 
-from lms.models import GroupInfo
+from lms.models import GroupInfo, GroupInfoInstructor
 from tests import factories
 
 
@@ -45,43 +44,40 @@ class TestGroupInfo:
         ):
             db_session.flush()
 
-    def test_upsert_instructor_when_no_existing_instructors(self, group_info):
-        instructor = factories.HUser()._asdict()
-
-        group_info.upsert_instructor(instructor)
+    def test_instructors(self, db_session, group_info):
+        db_session.add(group_info)
+        db_session.flush()
+        instructors = [
+            GroupInfoInstructor(group_info_id=group_info.id, **h_user._asdict())
+            for h_user in factories.HUser.build_batch(2)
+        ]
+        db_session.add_all(instructors)
+        db_session.flush()
 
-        assert group_info.instructors == [instructor]
+        db_session.refresh(group_info)
+        assert group_info.instructors == instructors
 
-    def test_upsert_instructor_when_existing_instructors(
-        self, group_info, existing_instructors
+    def test_deleting_a_group_info_deletes_its_instructors(
+        self, db_session, group_info
     ):
-        new_instructor = factories.HUser(username="new_instructor")._asdict()
-
-        group_info.upsert_instructor(new_instructor)
-
-        assert group_info.instructors == existing_instructors + [new_instructor]
+        group_info.instructors = [GroupInfoInstructor(username="username")]
+        db_session.add(group_info)
+        db_session.flush()
 
-    def test_upsert_instructor_when_existing_matching_instructor(
-        self, group_info, existing_instructors
-    ):
-        updated_instructor = factories.HUser(
-            username=group_info.instructors[1]["username"], display_name="updated"
-        )._asdict()
+        db_session.delete(group_info)
+        db_session.flush()
 
-        group_info.upsert_instructor(updated_instructor)
+        assert not db_session.query(GroupInfoInstructor).count()
 
-        assert group_info.instructors == [
-            existing_instructors[0],
-            updated_instructor,
-            existing_instructors[2],
+    def test_instructor_usernames_are_unique_per_group(self, db_session, group_info):
+        group_info.instructors = [
+            GroupInfoInstructor(username="username"),
+            GroupInfoInstructor(username="username"),
         ]
+        db_session.add(group_info)
 
-    def test_upsert_instructor_when_existing_equal_instructor(
-        self, group_info, existing_instructors
-    ):
-        group_info.upsert_instructor(existing_instructors[1])
-
-        assert group_info.instructors == existing_instructors
+        with pytest.raises(IntegrityError, match="uq__group_info_instructor"):
+            db_session.flush()
 
     def test_set_and_get_type(self):
         group_info = GroupInfo()
@@ -97,14 +93,6 @@ class TestGroupInfo:
             group_info.info = None
 
         assert group_info.type is None
-        assert group_info.instructors == []
-
-    @pytest.fixture
-    def existing_instructors(self, group_info):
-        group_info.instructors = factory.build_batch(
-            dict, 3, FACTORY_CLASS=factories.HUser
-        )
-        return group_info.instructors
 
     @pytest.fixture(autouse=True)
     def application_instance(self):
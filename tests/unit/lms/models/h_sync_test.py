@@ -0,0 +1,43 @@
+from lms.models import HSyncedMembership, HSyncJob
+
+
+class TestHSyncJob:
+    def test_defaults(self, db_session):
+        db_session.add(HSyncJob(user={"username": "user"}, groups=[]))
+        db_session.flush()
+
+        job = db_session.query(HSyncJob).one()
+        assert job.created
+        assert job.run_after == job.created
+        assert not job.attempts
+        assert job.last_error is None
+
+
+class TestHSyncedMembership:
+    def test_record(self, db_session):
+        HSyncedMembership.record(db_session, "user", ["group_1", "group_2"])
+        # Recording the same memberships again does nothing.
+        HSyncedMembership.record(db_session, "user", ["group_2"])
+
+        assert sorted(
+            (row.username, row.authority_provided_id)
+            for row in db_session.query(HSyncedMembership)
+        ) == [("user", "group_1"), ("user", "group_2")]
+
+    def test_record_with_no_groups(self, db_session):
+        HSyncedMembership.record(db_session, "user", [])
+
+        assert not db_session.query(HSyncedMembership).count()
+
+    def test_all_exist(self, db_session):
+        HSyncedMembership.record(db_session, "user", ["group_1", "group_2"])
+        HSyncedMembership.record(db_session, "other_user", ["group_3"])
+
+        assert HSyncedMembership.all_exist(db_session, "user", ["group_1"])
+        assert HSyncedMembership.all_exist(
+            db_session, "user", ["group_1", "group_2", "group_1"]
+        )
+        assert not HSyncedMembership.all_exist(
+            db_session, "user", ["group_1", "group_3"]
+        )
+        assert not HSyncedMembership.all_exist(db_session, "other_user", ["group_1"])
@@ -1,6 +1,10 @@
-from datetime import datetime
+from datetime import date, datetime
+from unittest import mock
 
-from lms.models import LtiLaunches
+import pytest
+from h_matchers import Any
+
+from lms.models import LtiLaunches, LtiLaunchRollup
 
 
 class TestLTILaunches:
@@ -14,3 +18,96 @@ class TestLTILaunches:
         assert lti_launch.context_id == "TEST_CONTEXT_ID"
         assert lti_launch.lti_key == "TEST_OAUTH_CONSUMER_KEY"
         assert lti_launch.created >= before <= after
+
+    def test_add_counts_the_launch(self, db_session):
+        LtiLaunches.add(db_session, "TEST_CONTEXT_ID", "TEST_OAUTH_CONSUMER_KEY")
+
+        assert db_session.query(LtiLaunchRollup).one().launches == 1
+
+    def test_add_records_the_launch_with_the_sessions_recorder(self, db_session):
+        recorder = mock.Mock(spec_set=["record"])
+        db_session.info["lti_launches.recorder"] = recorder
+
+        LtiLaunches.add(db_session, "TEST_CONTEXT_ID", "TEST_OAUTH_CONSUMER_KEY")
+
+        recorder.record.assert_called_once_with(
+            db_session, "TEST_CONTEXT_ID", "TEST_OAUTH_CONSUMER_KEY"
+        )
+        assert not db_session.query(LtiLaunches).count()
+
+
+class TestLtiLaunchRollup:
+    def test_increment(self, db_session):
+        LtiLaunchRollup.increment(
+            db_session,
+            [
+                launch(1, "key", "context"),
+                launch(1, "key", "context"),
+                launch(2, "key", "context"),
+                launch(1, "key", "other_context"),
+                launch(1, None, None),
+            ],
+        )
+        LtiLaunchRollup.increment(db_session, [launch(1, "key", "context")])
+
+        assert (
+            self.counts(db_session)
+            == Any.list.containing(
+                [
+                    ("key", "context", date(2021, 10, 1), 3),
+                    ("key", "context", date(2021, 10, 2), 1),
+                    ("key", "other_context", date(2021, 10, 1), 1),
+                    ("", "", date(2021, 10, 1), 1),
+                ]
+            ).only()
+        )
+
+    def test_increment_does_nothing_with_no_launches(self, db_session):
+        LtiLaunchRollup.increment(db_session, [])
+
+        assert not self.counts(db_session)
+
+    def test_backfill(self, db_session):
+        LtiLaunchRollup.increment(db_session, [launch(1, "stale", "stale")])
+        db_session.add_all(
+            [
+                LtiLaunches(**launch(1, "key", "context")),
+                LtiLaunches(**launch(1, "key", "context")),
+                LtiLaunches(**launch(2, "key", "context")),
+                LtiLaunches(**launch(1, None, None)),
+            ]
+        )
+        db_session.flush()
+
+        LtiLaunchRollup.backfill(db_session)
+
+        assert (
+            self.counts(db_session)
+            == Any.list.containing(
+                [
+                    ("key", "context", date(2021, 10, 1), 2),
+                    ("key", "context", date(2021, 10, 2), 1),
+                    ("", "", date(2021, 10, 1), 1),
+                ]
+            ).only()
+        )
+
+    def counts(self, db_session):
+        return [
+            (rollup.lti_key, rollup.context_id, rollup.day, rollup.launches)
+            for rollup in db_session.query(LtiLaunchRollup)
+        ]
+
+    @pytest.fixture(autouse=True)
+    def expire_rollups(self, db_session):
+        # increment() and backfill() don't update objects in the session.
+        yield
+        db_session.expire_all()
+
+
+def launch(day, lti_key, context_id):
+    return {
+        "created": datetime(2021, 10, day, 12),
+        "lti_key": lti_key,
+        "context_id": context_id,
+    }
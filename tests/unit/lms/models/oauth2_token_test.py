@@ -105,6 +105,18 @@ class TestOAuth2Token:
 
         assert isinstance(token.received_at, datetime.datetime)
 
+    def test_expires_at(self, init_kwargs):
+        token = OAuth2Token(
+            **init_kwargs,
+            received_at=datetime.datetime(2021, 10, 18, 12, 0, 0),
+            expires_in=3600,
+        )
+
+        assert token.expires_at == datetime.datetime(2021, 10, 18, 13, 0, 0)
+
+    def test_expires_at_is_None_if_we_dont_know_expires_in(self, init_kwargs):
+        assert OAuth2Token(**init_kwargs).expires_at is None
+
     @pytest.fixture(autouse=True)
     def application_instance(self):
         """Return the ApplicationInstance that the test OAuth2Token's belong to."""
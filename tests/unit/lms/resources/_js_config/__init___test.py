@@ -12,7 +12,7 @@ pytestmark = pytest.mark.usefixtures(
     "application_instance_service",
     "grading_info_service",
     "grant_token_service",
-    "h_api",
+    "h_user_service",
     "vitalsource_service",
 )
 
@@ -359,7 +359,7 @@ class TestMaybeSetFocusedUser:
         assert "focus" not in js_config.asdict()["hypothesisClient"]
 
     def test_it_sets_the_focused_user_if_theres_a_focused_user_param(
-        self, h_api, js_config
+        self, h_user_service, js_config
     ):
         # maybe_set_focused_user() doesn't work properly unless
         # enable_lti_launch_mode() has been called first because it depends on
@@ -369,18 +369,20 @@ class TestMaybeSetFocusedUser:
 
         js_config.maybe_set_focused_user()
 
-        # It gets the display name from the h API.
-        h_api.get_user.assert_called_once_with("example_h_username")
+        # It looks up the display name.
+        h_user_service.get_user.assert_called_once_with("example_h_username")
         # It sets the focused user.
         assert js_config.asdict()["hypothesisClient"]["focus"] == {
             "user": {
                 "username": "example_h_username",
-                "displayName": h_api.get_user.return_value.display_name,
+                "displayName": h_user_service.get_user.return_value.display_name,
             },
         }
 
-    def test_display_name_falls_back_to_a_default_value(self, h_api, js_config):
-        h_api.get_user.side_effect = HAPIError()
+    def test_display_name_falls_back_to_a_default_value(
+        self, h_user_service, js_config
+    ):
+        h_user_service.get_user.side_effect = HAPIError()
         # maybe_set_focused_user() doesn't work properly unless
         # enable_lti_launch_mode() has been called first because it depends on
         # enable_lti_launch_mode() having inserted the "hypothesisClient"
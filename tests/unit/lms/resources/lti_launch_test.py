@@ -10,6 +10,15 @@ from lms.services import ConsumerKeyError
 pytestmark = pytest.mark.usefixtures("application_instance_service", "course_service")
 
 
+@pytest.mark.usefixtures("has_course")
+class TestGetOrCreateCourse:
+    def test_it_only_gets_the_course_once(self, lti_launch, course_service):
+        assert lti_launch.get_or_create_course() == lti_launch.get_or_create_course()
+
+        course_service.get_or_create.assert_called_once()
+        course_service.upsert.assert_called_once()
+
+
 class TestHGroup:
     @pytest.mark.usefixtures("has_course")
     def test_it(self, lti_launch, course_service):
@@ -431,99 +431,98 @@ class TestAuthenticatedUserID:
 
 class TestGetLTIUser:
     def test_it_returns_the_LTIUsers_from_LTI_launch_params(
-        self,
-        bearer_token_schema,
-        LaunchParamsAuthSchema,
-        launch_params_auth_schema,
-        pyramid_request,
+        self, LaunchParamsAuthSchema, launch_params_auth_schema, pyramid_request
     ):
-        bearer_token_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
-
         lti_user = _get_lti_user(pyramid_request)
 
         LaunchParamsAuthSchema.assert_called_once_with(pyramid_request)
         launch_params_auth_schema.lti_user.assert_called_once_with()
         assert lti_user == launch_params_auth_schema.lti_user.return_value
 
-    def test_it_returns_LTIUsers_from_authorization_headers(
+    def test_LaunchParamsAuthSchema_overrides_BearerTokenSchema(
+        self, BearerTokenSchema, launch_params_auth_schema, pyramid_request
+    ):
+        pyramid_request.headers["Authorization"] = "Bearer token"
+
+        assert (
+            _get_lti_user(pyramid_request)
+            == launch_params_auth_schema.lti_user.return_value
+        )
+        BearerTokenSchema.cached_lti_user.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "location",
+        [
+            "headers",
+            "querystring",
+            "form",
+        ],
+    )
+    def test_it_returns_LTIUsers_from_bearer_tokens(
         self,
         launch_params_auth_schema,
         BearerTokenSchema,
-        bearer_token_schema,
         pyramid_request,
+        location,
     ):
         launch_params_auth_schema.lti_user.side_effect = ValidationError(
             ["TEST_ERROR_MESSAGE"]
         )
+        self.set_authorization(pyramid_request, location, "Bearer token")
 
         lti_user = _get_lti_user(pyramid_request)
 
-        BearerTokenSchema.assert_called_once_with(pyramid_request)
-        bearer_token_schema.lti_user.assert_called_once_with(location="headers")
-        assert lti_user == bearer_token_schema.lti_user.return_value
+        BearerTokenSchema.cached_lti_user.assert_called_once_with(
+            pyramid_request, location, "Bearer token"
+        )
+        assert lti_user == BearerTokenSchema.cached_lti_user.return_value
 
-    def test_it_returns_LTIUsers_from_authorization_query_string_params(
-        self, launch_params_auth_schema, bearer_token_schema, pyramid_request
+    def test_it_tries_each_bearer_token_in_turn(
+        self, BearerTokenSchema, pyramid_request
     ):
-        launch_params_auth_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
+        del pyramid_request.POST["oauth_signature"]
+        for location in ("headers", "querystring", "form"):
+            self.set_authorization(pyramid_request, location, f"Bearer {location}")
         lti_user = factories.LTIUser()
-        bearer_token_schema.lti_user.side_effect = [
+        BearerTokenSchema.cached_lti_user.side_effect = [
             ValidationError(["TEST_ERROR_MESSAGE"]),
             lti_user,
-            ValidationError(["TEST_ERROR_MESSAGE"]),
         ]
 
         returned_lti_user = _get_lti_user(pyramid_request)
 
-        assert bearer_token_schema.lti_user.call_args_list == [
-            call(location="headers"),
-            call(location="querystring"),
+        assert BearerTokenSchema.cached_lti_user.call_args_list == [
+            call(pyramid_request, "headers", "Bearer headers"),
+            call(pyramid_request, "querystring", "Bearer querystring"),
         ]
         assert returned_lti_user == lti_user
 
-    def test_it_returns_LTIUsers_from_authorization_form_fields(
-        self, launch_params_auth_schema, bearer_token_schema, pyramid_request
+    def test_it_ignores_authorization_params_that_arent_bearer_tokens(
+        self, BearerTokenSchema, pyramid_request
     ):
-        launch_params_auth_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
-        lti_user = factories.LTIUser()
-        bearer_token_schema.lti_user.side_effect = [
-            ValidationError(["TEST_ERROR_MESSAGE"]),
-            ValidationError(["TEST_ERROR_MESSAGE"]),
-            lti_user,
-        ]
+        del pyramid_request.POST["oauth_signature"]
+        self.set_authorization(pyramid_request, "headers", "Basic dXNlcjpwYXNz")
+        self.set_authorization(pyramid_request, "querystring", "Bearer querystring")
 
-        returned_lti_user = _get_lti_user(pyramid_request)
+        _get_lti_user(pyramid_request)
 
-        assert bearer_token_schema.lti_user.call_args_list == [
-            call(location="headers"),
-            call(location="querystring"),
-            call(location="form"),
-        ]
-        assert returned_lti_user == lti_user
+        BearerTokenSchema.cached_lti_user.assert_called_once_with(
+            pyramid_request, "querystring", "Bearer querystring"
+        )
 
     def test_it_returns_LTIUsers_from_OAuth2_state_params(
         self,
-        launch_params_auth_schema,
-        bearer_token_schema,
+        BearerTokenSchema,
         OAuthCallbackSchema,
         canvas_oauth_callback_schema,
         pyramid_request,
     ):
-        launch_params_auth_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
-        bearer_token_schema.lti_user.side_effect = ValidationError(
-            ["TEST_ERROR_MESSAGE"]
-        )
+        del pyramid_request.POST["oauth_signature"]
+        pyramid_request.params["state"] = "state"
 
         lti_user = _get_lti_user(pyramid_request)
 
+        BearerTokenSchema.cached_lti_user.assert_not_called()
         OAuthCallbackSchema.assert_called_once_with(pyramid_request)
         canvas_oauth_callback_schema.lti_user.assert_called_once_with()
         assert lti_user == canvas_oauth_callback_schema.lti_user.return_value
@@ -531,14 +530,16 @@ class TestGetLTIUser:
     def test_it_returns_None_if_all_schemas_fail(
         self,
         launch_params_auth_schema,
-        bearer_token_schema,
+        BearerTokenSchema,
         canvas_oauth_callback_schema,
         pyramid_request,
     ):
+        pyramid_request.headers["Authorization"] = "Bearer token"
+        pyramid_request.params["state"] = "state"
         launch_params_auth_schema.lti_user.side_effect = ValidationError(
             ["TEST_ERROR_MESSAGE"]
         )
-        bearer_token_schema.lti_user.side_effect = ValidationError(
+        BearerTokenSchema.cached_lti_user.side_effect = ValidationError(
             ["TEST_ERROR_MESSAGE"]
         )
         canvas_oauth_callback_schema.lti_user.side_effect = ValidationError(
@@ -547,22 +548,40 @@ class TestGetLTIUser:
 
         assert _get_lti_user(pyramid_request) is None
 
-    def test_LaunchParamsAuthSchema_overrides_BearerTokenSchema(
-        self, launch_params_auth_schema, pyramid_request
+    def test_it_returns_None_if_there_are_no_credentials(
+        self,
+        LaunchParamsAuthSchema,
+        BearerTokenSchema,
+        OAuthCallbackSchema,
+        pyramid_request,
     ):
-        assert (
-            _get_lti_user(pyramid_request)
-            == launch_params_auth_schema.lti_user.return_value
-        )
+        del pyramid_request.POST["oauth_signature"]
+
+        assert _get_lti_user(pyramid_request) is None
+
+        LaunchParamsAuthSchema.assert_not_called()
+        BearerTokenSchema.cached_lti_user.assert_not_called()
+        OAuthCallbackSchema.assert_not_called()
+
+    @pytest.fixture
+    def pyramid_request(self, pyramid_request):
+        # DummyRequest uses the same dict for its query string and form.
+        pyramid_request.GET = {}
+        return pyramid_request
+
+    @staticmethod
+    def set_authorization(pyramid_request, location, value):
+        if location == "headers":
+            pyramid_request.headers["Authorization"] = value
+        elif location == "querystring":
+            pyramid_request.GET["authorization"] = value
+        else:
+            pyramid_request.POST["authorization"] = value
 
     @pytest.fixture(autouse=True)
     def BearerTokenSchema(self, patch):
         return patch("lms.security.BearerTokenSchema")
 
-    @pytest.fixture
-    def bearer_token_schema(self, BearerTokenSchema):
-        return BearerTokenSchema.return_value
-
     @pytest.fixture(autouse=True)
     def OAuthCallbackSchema(self, patch):
         return patch("lms.security.OAuthCallbackSchema")
@@ -1,13 +1,17 @@
 import pytest
 
-from lms.services import includeme, vitalsource
-from lms.services.canvas_api import canvas_api_client_factory
+from lms.services import h_sync_queue, h_user, includeme, vitalsource
+from lms.services.application_instance import ApplicationInstanceCache
+from lms.services.cache import PublicURLCache, TTLCache
+from lms.services.canvas_api import CanvasAPICache, canvas_api_client_factory
 from lms.services.grading_info import GradingInfoService
 from lms.services.group_info import GroupInfoService
-from lms.services.h_api import HAPI
+from lms.services.h_api import HAPI, BulkSyncCoalescer
+from lms.services.http import HTTPTransport
 from lms.services.launch_verifier import LaunchVerifier
-from lms.services.lti_h import LTIHService
-from lms.services.lti_outcomes import LTIOutcomesClient
+from lms.services.lti_h import HSyncFingerprints, LTIHService
+from lms.services.lti_launch_recorder import LTILaunchRecorder
+from lms.services.lti_outcomes import LMSConcurrencyLimits, LTIOutcomesClient
 from lms.services.oauth1 import OAuth1Service
 
 
@@ -22,6 +26,8 @@ class TestIncludeme:
             ("lti_outcomes_client", LTIOutcomesClient),
             ("group_info", GroupInfoService),
             ("lti_h", LTIHService),
+            ("h_sync_queue", h_sync_queue.factory),
+            ("h_user", h_user.factory),
             ("oauth1", OAuth1Service),
             ("vitalsource", vitalsource.factory),
         ),
@@ -30,3 +36,22 @@ class TestIncludeme:
         includeme(pyramid_config)
 
         assert pyramid_config.find_service_factory(name=name) == service_class
+
+    @pytest.mark.parametrize(
+        "key,cls",
+        (
+            ("http.transport", HTTPTransport),
+            ("canvas_api.cache", CanvasAPICache),
+            ("blackboard_api.public_url_cache", PublicURLCache),
+            ("application_instance.cache", ApplicationInstanceCache),
+            ("h_api.coalescer", BulkSyncCoalescer),
+            ("h_user.cache", TTLCache),
+            ("lti_h.fingerprints", HSyncFingerprints),
+            ("lti_launches.recorder", LTILaunchRecorder),
+            ("lti_outcomes.limits", LMSConcurrencyLimits),
+        ),
+    )
+    def test_it_creates_the_shared_object(self, key, cls, pyramid_config):
+        includeme(pyramid_config)
+
+        assert isinstance(pyramid_config.registry[key], cls)
@@ -1,9 +1,16 @@
 from unittest import mock
 
 import pytest
+import sqlalchemy as sa
+from pyramid.events import NewRequest
 
+from lms.models import ApplicationInstance
 from lms.services import ConsumerKeyError
-from lms.services.application_instance import factory
+from lms.services.application_instance import (
+    ApplicationInstanceCache,
+    factory,
+    includeme,
+)
 from tests import factories
 
 
@@ -31,10 +38,113 @@ class TestApplicationInstanceService:
         with pytest.raises(ConsumerKeyError):
             svc.get(None)
 
+    def test_get_for_update_returns_a_fresh_copy(
+        self, svc, pyramid_request, db_session, application_instance
+    ):
+        svc.get(application_instance.consumer_key)
+        db_session.expunge_all()
+        change_in_another_process(db_session, application_instance)
+
+        fresh = factory(mock.sentinel.context, pyramid_request).get_for_update(
+            application_instance.consumer_key
+        )
+
+        assert fresh.lms_url == "https://changed.example.com"
+
+    def test_updating_a_stale_copy_fails(
+        self, svc, pyramid_request, db_session, application_instance
+    ):
+        svc.get(application_instance.consumer_key)
+        db_session.expunge_all()
+        change_in_another_process(db_session, application_instance)
+        stale = factory(mock.sentinel.context, pyramid_request).get(
+            application_instance.consumer_key
+        )
+
+        stale.settings.set("canvas", "sections_enabled", False)
+
+        with pytest.raises(sa.orm.exc.StaleDataError):
+            db_session.flush()
+
+    def test_updating_after_a_concurrent_update(
+        self, svc, pyramid_request, db_session, application_instance
+    ):
+        svc.get(application_instance.consumer_key)
+        db_session.expunge_all()
+        change_in_another_process(db_session, application_instance)
+        application_instance = factory(
+            mock.sentinel.context, pyramid_request
+        ).get_for_update(application_instance.consumer_key)
+
+        application_instance.settings.set("canvas", "sections_enabled", False)
+        db_session.flush()
+
+        db_session.expire_all()
+        # Neither change was lost.
+        assert application_instance.lms_url == "https://changed.example.com"
+        assert not application_instance.settings.get("canvas", "sections_enabled")
+
+    def test_update_lms_data(
+        self, svc, pyramid_request, db_session, application_instance
+    ):
+        application_instance.consumer_key = pyramid_request.lti_user.oauth_consumer_key
+        db_session.flush()
+        svc.get()
+        db_session.expunge_all()
+        change_in_another_process(db_session, application_instance)
+
+        factory(mock.sentinel.context, pyramid_request).update_lms_data(
+            {
+                "tool_consumer_instance_guid": "GUID",
+                "tool_consumer_instance_name": "NAME",
+            }
+        )
+        db_session.flush()
+
+        db_session.expire_all()
+        application_instance = ApplicationInstance.get_by_consumer_key(
+            db_session, application_instance.consumer_key
+        )
+        assert application_instance.tool_consumer_instance_guid == "GUID"
+        assert application_instance.tool_consumer_instance_name == "NAME"
+        assert application_instance.lms_url == "https://changed.example.com"
+
+    def test_update_lms_data_doesnt_reload_the_application_instance_if_nothing_changes(
+        self, svc, pyramid_request, db_session, application_instance
+    ):
+        application_instance.consumer_key = pyramid_request.lti_user.oauth_consumer_key
+        application_instance.tool_consumer_instance_guid = "GUID"
+        db_session.flush()
+
+        with mock.patch.object(db_session, "refresh") as refresh:
+            svc.update_lms_data({"tool_consumer_instance_guid": "GUID"})
+
+        refresh.assert_not_called()
+
+    def test_decrypted_developer_secret(
+        self, pyramid_request, application_instance, cache
+    ):
+        svc = factory(mock.sentinel.context, pyramid_request)
+
+        secret = svc.decrypted_developer_secret(application_instance, "aes_secret")
+
+        cache.decrypted_developer_secret.assert_called_once_with(
+            application_instance, "aes_secret"
+        )
+        assert secret == cache.decrypted_developer_secret.return_value
+
     @pytest.fixture
     def svc(self, pyramid_request):
         return factory(mock.sentinel.context, pyramid_request)
 
+    @pytest.fixture
+    def cache(self, pyramid_request):
+        cache = mock.create_autospec(
+            ApplicationInstanceCache, instance=True, spec_set=True
+        )
+        pyramid_request.registry["application_instance.cache"] = cache
+        return cache
+
     @pytest.fixture(autouse=True)
     def application_instance(self, db_session):
         ai = factories.ApplicationInstance()
@@ -54,7 +164,9 @@ class TestFactory:
         application_instance_service = factory(mock.sentinel.context, pyramid_request)
 
         ApplicationInstanceService.assert_called_once_with(
-            pyramid_request.db, pyramid_request.lti_user.oauth_consumer_key
+            pyramid_request.db,
+            pyramid_request.lti_user.oauth_consumer_key,
+            cache=pyramid_request.registry["application_instance.cache"],
         )
         assert application_instance_service == ApplicationInstanceService.return_value
 
@@ -63,9 +175,194 @@ class TestFactory:
 
         application_instance_service = factory(mock.sentinel.context, pyramid_request)
 
-        ApplicationInstanceService.assert_called_once_with(pyramid_request.db, None)
+        ApplicationInstanceService.assert_called_once_with(
+            pyramid_request.db,
+            None,
+            cache=pyramid_request.registry["application_instance.cache"],
+        )
         assert application_instance_service == ApplicationInstanceService.return_value
 
     @pytest.fixture(autouse=True)
     def ApplicationInstanceService(self, patch):
         return patch("lms.services.application_instance.ApplicationInstanceService")
+
+
+class TestApplicationInstanceCache:
+    def test_get_queries_the_db(self, cache, db_session, application_instance):
+        assert (
+            cache.get(db_session, application_instance.consumer_key)
+            == application_instance
+        )
+
+    def test_get_returns_None_if_the_consumer_key_doesnt_exist(self, cache, db_session):
+        assert cache.get(db_session, "NOPE") is None
+
+    def test_get_returns_the_instance_already_in_the_session(
+        self, cache, db_session, application_instance
+    ):
+        cache.get(db_session, application_instance.consumer_key)
+
+        assert (
+            cache.get(db_session, application_instance.consumer_key)
+            is application_instance
+        )
+
+    def test_get_doesnt_query_the_db_again(
+        self, cache, db_session, other_db_session, application_instance
+    ):
+        cache.get(db_session, application_instance.consumer_key)
+        expected = {
+            column: getattr(application_instance, column)
+            for column in ApplicationInstance.columns()
+        }
+        # Change the row in the DB without the ORM noticing.
+        db_session.execute(
+            sa.update(ApplicationInstance)
+            .values(lms_url="https://changed.example.com")
+            .execution_options(synchronize_session=False)
+        )
+
+        cached = cache.get(other_db_session, application_instance.consumer_key)
+
+        assert cached is not application_instance
+        assert cached in other_db_session
+        assert {
+            column: getattr(cached, column) for column in ApplicationInstance.columns()
+        } == expected
+
+    def test_get_returns_independent_copies_of_the_settings(
+        self, cache, db_session, other_db_session, application_instance
+    ):
+        cache.get(db_session, application_instance.consumer_key)
+        cached = cache.get(other_db_session, application_instance.consumer_key)
+        cached.settings.set("canvas", "sections_enabled", False)
+        other_db_session.expunge_all()
+
+        cached = cache.get(other_db_session, application_instance.consumer_key)
+
+        assert cached.settings.get("canvas", "sections_enabled") is True
+
+    def test_changes_evict_the_application_instance(
+        self, cache, db_session, application_instance
+    ):
+        cache.get(db_session, application_instance.consumer_key)
+        course = factories.Course()
+        db_session.flush()
+
+        application_instance.lms_url = "https://changed.example.com"
+        course.lms_name = "changed"
+        db_session.flush()
+
+        assert not cache._snapshots  # pylint:disable=protected-access
+
+    def test_uncommitted_changes_arent_cached(
+        self, cache, db_session, application_instance
+    ):
+        cache.watch(db_session)
+        application_instance.lms_url = "https://changed.example.com"
+        db_session.flush()
+
+        cache.get(db_session, application_instance.consumer_key)
+
+        assert not cache._snapshots  # pylint:disable=protected-access
+
+    def test_committing_evicts_the_changed_application_instances_again(
+        self, cache, db_session, application_instance
+    ):
+        application_instance.lms_url = "https://changed.example.com"
+        cache.get(db_session, application_instance.consumer_key)
+        cache._snapshots.set(  # pylint:disable=protected-access
+            application_instance.consumer_key, {}
+        )
+
+        db_session.dispatch.after_commit(db_session)
+
+        assert not cache._snapshots  # pylint:disable=protected-access
+
+    def test_rolling_back_forgets_the_changes(
+        self, cache, db_session, application_instance
+    ):
+        application_instance.lms_url = "https://changed.example.com"
+        cache.get(db_session, application_instance.consumer_key)
+
+        db_session.dispatch.after_rollback(db_session)
+        cache.get(db_session, application_instance.consumer_key)
+
+        assert cache._snapshots  # pylint:disable=protected-access
+
+    def test_decrypted_developer_secret(self, cache, application_instance):
+        application_instance.decrypted_developer_secret = mock.create_autospec(
+            application_instance.decrypted_developer_secret, return_value="secret"
+        )
+
+        for _ in range(2):
+            assert (
+                cache.decrypted_developer_secret(application_instance, "aes_secret")
+                == "secret"
+            )
+
+        application_instance.decrypted_developer_secret.assert_called_once_with(
+            "aes_secret"
+        )
+
+    def test_evict(self, cache, db_session, application_instance):
+        cache.get(db_session, application_instance.consumer_key)
+
+        cache.evict(application_instance.consumer_key)
+
+        assert not cache._snapshots  # pylint:disable=protected-access
+
+    @pytest.fixture
+    def cache(self):
+        return ApplicationInstanceCache()
+
+    @pytest.fixture
+    def application_instance(self, db_session):
+        application_instance = factories.ApplicationInstance(
+            settings={"canvas": {"sections_enabled": True}}
+        )
+        db_session.flush()
+        return application_instance
+
+    @pytest.fixture
+    def other_db_session(self, db_session):
+        other_db_session = db_session.__class__(bind=db_session.bind)
+        yield other_db_session
+        other_db_session.close()
+
+
+class TestIncludeMe:
+    def test_it(self, pyramid_config):
+        includeme(pyramid_config)
+
+        assert isinstance(
+            pyramid_config.registry["application_instance.cache"],
+            ApplicationInstanceCache,
+        )
+
+    def test_it_watches_the_db_session_of_each_request(
+        self, pyramid_config, pyramid_request
+    ):
+        includeme(pyramid_config)
+
+        pyramid_config.registry.notify(NewRequest(pyramid_request))
+
+        assert "application_instance_cache.changed" in pyramid_request.db.info
+
+
+def change_in_another_process(db_session, application_instance):
+    """Change `application_instance`'s row without the ORM noticing."""
+    db_session.execute(
+        sa.update(ApplicationInstance)
+        .where(ApplicationInstance.id == application_instance.id)
+        .values(
+            lms_url="https://changed.example.com",
+            version=ApplicationInstance.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+@pytest.fixture(autouse=True)
+def application_instance_cache(pyramid_request):
+    pyramid_request.registry["application_instance.cache"] = ApplicationInstanceCache()
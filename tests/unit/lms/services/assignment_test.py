@@ -49,6 +49,15 @@ class TestAssignmentService:
             == "NEW_DOCUMENT_URL"
         )
 
+    def test_set_document_url_replaces_the_cached_assignment(self, svc):
+        assert svc.get("TOOL_CONSUMER_INSTANCE_GUID", "RESOURCE_LINK_ID") is None
+
+        svc.set_document_url(
+            "TOOL_CONSUMER_INSTANCE_GUID", "RESOURCE_LINK_ID", "NEW_DOCUMENT_URL"
+        )
+
+        assert svc.get("TOOL_CONSUMER_INSTANCE_GUID", "RESOURCE_LINK_ID")
+
     def test_set_document_url_overwrites_an_existing_document_url(
         self, svc, assignment
     ):
@@ -83,6 +83,17 @@ class TestBasicClientRequest:
         oauth_http_service.request.assert_called_once_with("GET", expected_url)
         assert response == oauth_http_service.request.return_value
 
+    def test_it_refreshes_the_access_token_first_if_its_expiring(
+        self, basic_client, oauth_http_service
+    ):
+        basic_client.request("GET", "/foo")
+
+        oauth_http_service.refresh_access_token_if_expiring.assert_called_once_with(
+            "https://blackboard.example.com/learn/api/public/v1/oauth2/token",
+            sentinel.redirect_uri,
+            auth=(sentinel.client_id, sentinel.client_secret),
+        )
+
     # If the request fails on first attempt request() sends a refresh token
     # request and then re-tries the original request.
     def test_it_refreshes_and_tries_again_if_the_first_request_fails(
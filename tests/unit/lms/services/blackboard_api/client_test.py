@@ -10,6 +10,7 @@ from lms.services.blackboard_api.client import (
     PAGINATION_MAX_REQUESTS,
     BlackboardAPIClient,
 )
+from lms.services.cache import PublicURLCache
 from lms.services.exceptions import BlackboardFileNotFoundInCourse, HTTPError
 from tests import factories
 
@@ -192,6 +193,17 @@ class TestPublicURL:
         )
         assert public_url == blackboard_public_url_schema.parse.return_value
 
+    @pytest.mark.usefixtures("blackboard_public_url_schema")
+    def test_it_caches_the_url(self, svc, basic_client, public_url_cache):
+        public_url = svc.public_url("COURSE_ID", "FILE_ID")
+
+        assert svc.public_url("COURSE_ID", "FILE_ID") == public_url
+        basic_client.request.assert_called_once()
+        assert (
+            public_url_cache.get(("host", "key", "user_id", "COURSE_ID", "FILE_ID"))
+            == public_url
+        )
+
     def test_it_raises_BlackboardFileNotFoundInCourse_if_the_Blackboard_API_404s(
         self, svc, basic_client
     ):
@@ -219,8 +231,15 @@ def basic_client():
 
 
 @pytest.fixture
-def svc(basic_client, pyramid_request):
-    return BlackboardAPIClient(basic_client, pyramid_request)
+def public_url_cache():
+    return PublicURLCache()
+
+
+@pytest.fixture
+def svc(basic_client, pyramid_request, public_url_cache):
+    return BlackboardAPIClient(
+        basic_client, pyramid_request, public_url_cache, ("host", "key", "user_id")
+    )
 
 
 @pytest.fixture(autouse=True)
@@ -240,4 +259,6 @@ def BlackboardPublicURLSchema(patch):
 
 @pytest.fixture
 def blackboard_public_url_schema(BlackboardPublicURLSchema):
-    return BlackboardPublicURLSchema.return_value
+    schema = BlackboardPublicURLSchema.return_value
+    schema.parse.return_value = "https://blackboard.example.com/file.pdf"
+    return schema
@@ -27,11 +27,25 @@ def test_blackboard_api_client_factory(
         oauth_http_service=oauth_http_service,
     )
     BlackboardAPIClient.assert_called_once_with(
-        BasicClient.return_value, pyramid_request
+        BasicClient.return_value,
+        pyramid_request,
+        public_url_cache=sentinel.public_url_cache,
+        cache_scope=(
+            application_instance.lms_host(),
+            pyramid_request.lti_user.oauth_consumer_key,
+            pyramid_request.lti_user.user_id,
+        ),
     )
     assert service == BlackboardAPIClient.return_value
 
 
+@pytest.fixture(autouse=True)
+def public_url_cache(pyramid_request):
+    pyramid_request.registry[
+        "blackboard_api.public_url_cache"
+    ] = sentinel.public_url_cache
+
+
 @pytest.fixture(autouse=True)
 def BasicClient(patch):
     return patch("lms.services.blackboard_api.factory.BasicClient")
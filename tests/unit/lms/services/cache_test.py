@@ -0,0 +1,251 @@
+import gc
+import inspect
+import weakref
+from unittest.mock import Mock, sentinel
+
+import pytest
+
+from lms.services.cache import PublicURLCache, TTLCache, invalidate, memoize
+
+# 2021-10-18T12:16:40Z as a UNIX time.
+NOW = 1634559400
+
+
+class TestTTLCache:
+    def test_get_returns_the_value(self, cache):
+        cache.set("key", sentinel.value)
+
+        assert cache.get("key") == sentinel.value
+
+    def test_get_returns_the_default_if_theres_no_value(self, cache):
+        assert cache.get("key", sentinel.default) == sentinel.default
+
+    def test_get_returns_the_default_if_the_value_has_expired(self, cache, timer):
+        cache.set("key", sentinel.value)
+        timer.return_value = 10
+
+        assert cache.get("key") is None
+        assert not cache
+
+    def test_set_with_a_custom_ttl(self, cache, timer):
+        cache.set("key", sentinel.value, ttl=20)
+        timer.return_value = 19
+
+        assert cache.get("key") == sentinel.value
+
+    def test_set_discards_expired_values_when_full(self, cache, timer):
+        cache.set("short_lived", sentinel.value, ttl=1)
+        cache.set("long_lived", sentinel.value, ttl=100)
+        timer.return_value = 5
+
+        cache.set("new", sentinel.value)
+
+        assert cache.get("short_lived") is None
+        assert cache.get("long_lived") == sentinel.value
+
+    def test_set_discards_the_oldest_values_when_full(self, cache):
+        cache.set("oldest", sentinel.value)
+        cache.set("newest", sentinel.value)
+        # Setting an existing key makes it the newest.
+        cache.set("oldest", sentinel.value)
+
+        cache.set("new", sentinel.value)
+
+        assert cache.get("newest") is None
+        assert cache.get("oldest") == sentinel.value
+
+    def test_get_or_set_returns_the_cached_value(self, cache):
+        cache.set("key", sentinel.value)
+        create = Mock()
+
+        assert cache.get_or_set("key", create) == sentinel.value
+        create.assert_not_called()
+
+    def test_get_or_set_creates_and_caches_missing_values(self, cache):
+        value = cache.get_or_set("key", lambda: None)
+
+        assert value is None
+        assert cache.get("key", sentinel.default) is None
+
+    def test_delete(self, cache):
+        cache.set("key", sentinel.value)
+
+        cache.delete("key")
+        cache.delete("missing")
+
+        assert cache.get("key") is None
+
+    def test_delete_prefix(self, cache):
+        cache.set(("a", "b"), sentinel.value)
+        cache.set(("a", "c"), sentinel.value)
+
+        cache.delete_prefix(["a", "b"])
+
+        assert cache.get(("a", "b")) is None
+        assert cache.get(("a", "c")) == sentinel.value
+
+    def test_clear(self, cache):
+        cache.set("key", sentinel.value)
+
+        cache.clear()
+
+        assert not cache
+
+    @pytest.fixture
+    def timer(self):
+        return Mock(return_value=0)
+
+    @pytest.fixture
+    def cache(self, timer):
+        return TTLCache(ttl=10, maxsize=2, timer=timer)
+
+
+class TestPublicURLCache:
+    @pytest.mark.parametrize(
+        "url,ttl",
+        (
+            # Signed 1000s before "now" and valid for 3600s.
+            (
+                "https://s3.example.com/file.pdf?X-Amz-Date=20211018T120000Z&X-Amz-Expires=3600",
+                3600 - 1000 - PublicURLCache.SAFETY_MARGIN,
+            ),
+            (
+                f"https://cdn.example.com/file.pdf?Expires={NOW + 500}",
+                500 - PublicURLCache.SAFETY_MARGIN,
+            ),
+            ("https://lms.example.com/file.pdf", 300),
+            # Malformed expiry times are ignored.
+            ("https://s3.example.com/file.pdf?X-Amz-Expires=3600", 300),
+            ("https://cdn.example.com/file.pdf?Expires=soon", 300),
+        ),
+    )
+    def test_it_caches_urls_until_shortly_before_they_expire(
+        self, cache, timer, url, ttl
+    ):
+        cache.set("key", url)
+
+        timer.return_value = ttl - 1
+        assert cache.get("key") == url
+        timer.return_value = ttl
+        assert cache.get("key") is None
+
+    def test_it_doesnt_cache_urls_that_are_about_to_expire(self, cache):
+        url = f"https://cdn.example.com/file.pdf?Expires={NOW + 10}"
+
+        assert cache.get_or_set("key", lambda: url) == url
+        assert cache.get("key") is None
+
+    def test_set_with_a_custom_ttl(self, cache, timer):
+        cache.set("key", "https://lms.example.com/file.pdf", ttl=1000)
+        timer.return_value = 999
+
+        assert cache.get("key")
+
+    @pytest.mark.parametrize(
+        "settings,ttl",
+        (({}, PublicURLCache.DEFAULT_TTL), ({"public_url_cache_ttl": "60"}, 60)),
+    )
+    def test_from_settings(self, settings, ttl):
+        cache = PublicURLCache.from_settings(settings, maxsize=10)
+
+        assert (cache.ttl, cache.maxsize) == (ttl, 10)
+
+    @pytest.fixture
+    def timer(self):
+        return Mock(return_value=0)
+
+    @pytest.fixture
+    def cache(self, timer):
+        return PublicURLCache(ttl=300, timer=timer, clock=Mock(return_value=NOW))
+
+
+class TestMemoize:
+    def test_it_caches_the_return_value(self, obj):
+        assert obj.method(1) == obj.method(1) == obj.method(arg=1)
+
+        assert obj.calls == [(1, None)]
+
+    def test_it_caches_each_argument_separately(self, obj):
+        obj.method(1)
+        obj.method(1, "kwarg")
+        obj.method(2)
+
+        assert obj.calls == [(1, None), (1, "kwarg"), (2, None)]
+
+    def test_it_caches_separately_for_each_instance(self):
+        first, second = Example(), Example()
+
+        first.method(1)
+        second.method(1)
+
+        assert first.calls == second.calls == [(1, None)]
+
+    def test_it_doesnt_cache_exceptions(self, obj):
+        with pytest.raises(ZeroDivisionError):
+            obj.method(0)
+
+        with pytest.raises(ZeroDivisionError):
+            obj.method(0)
+
+        assert obj.calls == [(0, None), (0, None)]
+
+    def test_it_works_as_a_property(self, obj):
+        obj.property["key"] = "value"
+
+        assert obj.property == {"key": "value"}
+
+    def test_it_doesnt_keep_the_instance_alive(self):
+        obj = Example()
+        obj.method(1)
+        ref = weakref.ref(obj)
+
+        del obj
+        gc.collect()
+
+        assert ref() is None
+
+    def test_it_keeps_the_methods_signature(self):
+        assert inspect.signature(Example.method) == inspect.signature(
+            inspect.unwrap(Example.method)
+        )
+
+    @pytest.fixture
+    def obj(self):
+        return Example()
+
+
+class TestInvalidate:
+    def test_it(self, obj):
+        obj.method(1)
+        obj.method(2)
+
+        invalidate(obj.method, arg=1)
+        obj.method(1)
+        obj.method(2)
+
+        assert obj.calls == [(1, None), (2, None), (1, None)]
+
+    def test_it_does_nothing_if_theres_no_cached_value(self, obj):
+        invalidate(obj.method, 1)
+
+        assert obj.method(1) == 1
+
+    @pytest.fixture
+    def obj(self):
+        return Example()
+
+
+class Example:
+    def __init__(self):
+        self.calls = []
+
+    @memoize
+    def method(self, arg, kwarg=None):
+        """Return the reciprocal of `arg`."""
+        self.calls.append((arg, kwarg))
+        return 1 / arg
+
+    @property
+    @memoize
+    def property(self):
+        return {}
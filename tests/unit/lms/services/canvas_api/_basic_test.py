@@ -1,3 +1,4 @@
+from concurrent.futures import Future
 from unittest.mock import call, create_autospec
 
 import pytest
@@ -124,6 +125,102 @@ class TestBasicClient:
         with pytest.raises(CanvasAPIError):
             basic_client.send("METHOD", "path/", schema=Schema)
 
+    @pytest.mark.usefixtures("numbered_page_results")
+    def test_send_fetches_numbered_pages_concurrently(
+        self, basic_client, PaginatedSchema, http_session, ThreadPoolExecutor
+    ):
+        result = basic_client.send("METHOD", "path/", schema=PaginatedSchema)
+
+        ThreadPoolExecutor.assert_called_once_with(max_workers=3)
+        assert result == ["item_0", "item_1", "item_2", "item_3"]
+        assert [call_[0][0].url for call_ in http_session.send.call_args_list[1:]] == [
+            "http://example.com/list?per_page=10&page=2",
+            "http://example.com/list?per_page=10&page=3",
+            "http://example.com/list?per_page=10&page=4",
+        ]
+
+    @pytest.mark.usefixtures("numbered_page_results")
+    def test_send_limits_concurrency(
+        self, basic_client, PaginatedSchema, ThreadPoolExecutor
+    ):
+        basic_client.PAGINATION_MAXIMUM_CONCURRENCY = 2
+
+        basic_client.send("METHOD", "path/", schema=PaginatedSchema)
+
+        ThreadPoolExecutor.assert_called_once_with(max_workers=2)
+
+    @pytest.mark.usefixtures("numbered_page_results")
+    def test_send_only_fetches_numbered_pages_up_to_the_max_value(
+        self, basic_client, PaginatedSchema, http_session
+    ):
+        basic_client.PAGINATION_MAXIMUM_REQUESTS = 3
+
+        result = basic_client.send("METHOD", "path/", schema=PaginatedSchema)
+
+        assert result == ["item_0", "item_1", "item_2"]
+        assert http_session.send.call_count == 3
+
+    @pytest.mark.usefixtures("numbered_page_results", "ThreadPoolExecutor")
+    def test_iter_items_only_requests_numbered_pages_as_they_are_needed(
+        self, basic_client, PaginatedSchema, http_session
+    ):
+        basic_client.PAGINATION_MAXIMUM_CONCURRENCY = 1
+
+        items = basic_client.iter_items("METHOD", "path/", schema=PaginatedSchema)
+
+        assert [next(items), next(items)] == ["item_0", "item_1"]
+        # The first page, the page we've read and the one page in flight.
+        assert http_session.send.call_count == 3
+
+    @pytest.mark.parametrize(
+        "headers",
+        (
+            # Canvas doesn't always send a "last" link.
+            {"Link": '<http://example.com/list?page=bookmark:abc>; rel="next"'},
+            {
+                "Link": ", ".join(
+                    [
+                        '<http://example.com/list?page=bookmark:abc>; rel="next"',
+                        '<http://example.com/list?page=bookmark:xyz>; rel="last"',
+                    ]
+                )
+            },
+        ),
+    )
+    def test_send_follows_bookmark_pagination_links_one_at_a_time(
+        self, basic_client, PaginatedSchema, http_session, headers
+    ):
+        http_session.send.side_effect = [
+            factories.requests.Response(status_code=200, headers=headers),
+            factories.requests.Response(status_code=200),
+        ]
+
+        result = basic_client.send("METHOD", "path/", schema=PaginatedSchema)
+
+        assert result == ["item_0", "item_1"]
+        http_session.send.assert_called_with(
+            Any.request(url="http://example.com/list?page=bookmark:abc"),
+            timeout=Any(),
+        )
+
+    @pytest.mark.usefixtures("paginated_results")
+    def test_iter_pages(self, basic_client, PaginatedSchema):
+        pages = basic_client.iter_pages("METHOD", "path/", schema=PaginatedSchema)
+
+        assert list(pages) == [["item_0"], ["item_1"], ["item_2"]]
+
+    @pytest.mark.usefixtures("paginated_results")
+    def test_iter_items_only_requests_pages_as_they_are_needed(
+        self, basic_client, PaginatedSchema, http_session
+    ):
+        items = basic_client.iter_items("METHOD", "path/", schema=PaginatedSchema)
+
+        assert next(items) == "item_0"
+        http_session.send.assert_called_once()
+
+        assert list(items) == ["item_1", "item_2"]
+        assert http_session.send.call_count == 3
+
     @pytest.fixture(autouse=True)
     def has_ok_response(self, http_session):
         http_session.send.return_value = factories.requests.Response(status_code=200)
@@ -158,8 +255,40 @@ class TestBasicClient:
             factories.requests.Response(status_code=200),
         ]
 
+    @pytest.fixture
+    def numbered_page_results(self, http_session):
+        def send(request, **_kwargs):
+            if "&page=" in request.url:
+                # One of the numbered pages after the first.
+                return factories.requests.Response(status_code=200)
+
+            return factories.requests.Response(
+                status_code=200,
+                headers=self.link_headers(
+                    "http://example.com/list?per_page=10&page=2",
+                    last_url="http://example.com/list?per_page=10&page=4",
+                ),
+            )
+
+        http_session.send.side_effect = send
+
+    @pytest.fixture
+    def ThreadPoolExecutor(self, patch):
+        ThreadPoolExecutor = patch("lms.services.canvas_api._basic.ThreadPoolExecutor")
+
+        def submit(fn, *args):
+            # Run the "concurrent" requests one after the other, in order.
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        ThreadPoolExecutor.return_value.__enter__.return_value.submit.side_effect = (
+            submit
+        )
+        return ThreadPoolExecutor
+
     @classmethod
-    def link_headers(cls, next_url):
+    def link_headers(cls, next_url, last_url=None):
         # See: https://canvas.instructure.com/doc/api/file.pagination.html
 
         decoy_url = "http://example.com/decoy"
@@ -170,7 +299,7 @@ class TestBasicClient:
                     f'<{decoy_url}>; rel="current"',
                     f'<{next_url}>; rel="next"',
                     f'<{decoy_url}>; rel="first"',
-                    f'<{decoy_url}>; rel="last"',
+                    f'<{last_url or decoy_url}>; rel="last"',
                 ]
             )
         }
@@ -0,0 +1,89 @@
+import pytest
+
+from lms.services.cache import PublicURLCache
+from lms.services.canvas_api import CanvasAPICache
+
+
+class TestCanvasAPICache:
+    def test_get_or_set(self, cache, scope):
+        value = cache.get_or_set("list_files", scope, ("course_id",), lambda: "value")
+
+        assert value == "value"
+        assert cache.get("list_files", scope, ("course_id",)) == "value"
+
+    def test_it_scopes_values_to_the_user(self, cache, scope):
+        cache.get_or_set("list_files", scope, ("course_id",), lambda: "value")
+
+        other_scope = CanvasAPICache.scope("canvas.example.com", "key", "other_user")
+        assert cache.get("list_files", other_scope, ("course_id",)) is None
+
+    def test_it_uses_the_ttl_of_each_endpoint(self, TTLCache):
+        CanvasAPICache()
+
+        TTLCache.assert_any_call(CanvasAPICache.TTLS["course_sections"], maxsize=1024)
+
+    def test_it_limits_the_size_of_endpoints_with_big_entries(self, TTLCache):
+        CanvasAPICache()
+
+        TTLCache.assert_any_call(
+            CanvasAPICache.TTLS["course_group_memberships"],
+            maxsize=CanvasAPICache.MAXSIZES["course_group_memberships"],
+        )
+
+    def test_it_caches_public_urls_in_the_given_cache(self, scope):
+        public_url_cache = PublicURLCache()
+        cache = CanvasAPICache(public_url_cache=public_url_cache)
+
+        cache.get_or_set("public_url", scope, ("file_id",), lambda: "https://url")
+
+        assert public_url_cache.get((*scope, "file_id")) == "https://url"
+
+    def test_invalidate_everything_in_a_scope(self, cache, scope):
+        cache.get_or_set("list_files", scope, ("course_id",), lambda: "value")
+        cache.get_or_set("course_sections", scope, ("course_id",), lambda: "value")
+
+        cache.invalidate(scope)
+
+        assert cache.get("list_files", scope, ("course_id",)) is None
+        assert cache.get("course_sections", scope, ("course_id",)) is None
+
+    def test_invalidate_an_endpoint(self, cache, scope):
+        cache.get_or_set("list_files", scope, ("course_1",), lambda: "value")
+        cache.get_or_set("list_files", scope, ("course_2",), lambda: "value")
+        cache.get_or_set("course_sections", scope, ("course_1",), lambda: "value")
+
+        cache.invalidate(scope, "list_files", ("course_1",))
+
+        assert cache.get("list_files", scope, ("course_1",)) is None
+        assert cache.get("list_files", scope, ("course_2",)) == "value"
+        assert cache.get("course_sections", scope, ("course_1",)) == "value"
+
+    def test_get_or_set_records_misses_and_hits(self, cache, scope, newrelic):
+        cache.get_or_set("list_files", scope, ("course_id",), lambda: "value")
+
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/CanvasAPICache/list_files/Miss", 1
+        )
+        newrelic.agent.record_custom_metric.reset_mock()
+
+        cache.get_or_set("list_files", scope, ("course_id",), lambda: "other_value")
+
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/CanvasAPICache/list_files/Hit", 1
+        )
+
+    @pytest.fixture
+    def cache(self):
+        return CanvasAPICache()
+
+    @pytest.fixture
+    def scope(self):
+        return CanvasAPICache.scope("canvas.example.com", "key", "user_id")
+
+    @pytest.fixture
+    def TTLCache(self, patch):
+        return patch("lms.services.canvas_api._cache.TTLCache")
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("lms.services.canvas_api._cache.newrelic")
@@ -1,9 +1,11 @@
-from unittest.mock import sentinel
+from unittest.mock import create_autospec, sentinel
 
 import pytest
 from h_matchers import Any
 
+from lms.events import FilesDiscoveredEvent
 from lms.services import CanvasAPIError, CanvasAPIServerError, OAuth2TokenError
+from lms.services.canvas_api import CanvasAPICache
 from lms.services.canvas_api.client import CanvasAPIClient
 from tests import factories
 
@@ -20,6 +22,24 @@ class TestCanvasAPIClientGetToken:
         )
         assert token == authenticated_client.get_token.return_value
 
+    def test_get_token_invalidates_the_users_cached_responses(
+        self, canvas_api_client, cache, cache_scope
+    ):
+        cache.get_or_set("list_files", cache_scope, ("course_id",), lambda: "files")
+
+        canvas_api_client.get_token(sentinel.authorization_code)
+
+        assert cache.get("list_files", cache_scope, ("course_id",)) is None
+
+    def test_invalidate(self, canvas_api_client, cache, cache_scope):
+        cache.get_or_set("list_files", cache_scope, ("course_1",), lambda: "files")
+        cache.get_or_set("list_files", cache_scope, ("course_2",), lambda: "files")
+
+        canvas_api_client.invalidate("list_files", "course_1")
+
+        assert cache.get("list_files", cache_scope, ("course_1",)) is None
+        assert cache.get("list_files", cache_scope, ("course_2",)) == "files"
+
     @pytest.fixture
     def authenticated_client(self, patch):
         return patch("lms.services.canvas_api._authenticated.AuthenticatedClient")
@@ -269,6 +289,29 @@ class TestCanvasAPIClient:
         assert user_id in [u["id"] for u in response[0]["users"]]
         assert response[0]["group_category_id"] == group_category_id
 
+    @pytest.mark.usefixtures("list_groups_with_users_response")
+    def test_user_groups_fetches_the_courses_groups_once(
+        self, canvas_api_client, http_session
+    ):
+        canvas_api_client.user_groups(1, 1)
+        # Grading another student in the same course.
+        response = canvas_api_client.user_groups(1, 2)
+
+        assert not response
+        http_session.send.assert_called_once_with(
+            Any.request(
+                "GET",
+                url=Any.url.with_path("api/v1/courses/1/groups").with_query(
+                    {
+                        "only_own_groups": "False",
+                        "include[]": "users",
+                        "per_page": Any.string(),
+                    }
+                ),
+            ),
+            timeout=Any(),
+        )
+
     @pytest.mark.usefixtures("list_groups_response")
     def test_group_category_groups(self, canvas_api_client, http_session):
         response = canvas_api_client.group_category_groups("GROUP_CATEGORY")
@@ -383,6 +426,126 @@ class TestCanvasAPIClient:
 
         assert response == [files[0]]
 
+    def test_iter_files_notifies_as_each_page_is_read(
+        self, canvas_api_client, http_session, pyramid_request
+    ):
+        file_ = {"display_name": "display_name", "id": 1, "size": 12345}
+        http_session.send.side_effect = [
+            factories.requests.Response(
+                status_code=200,
+                json_data=[dict(file_, updated_at="updated_at")] * 2,
+                headers={"Link": '<http://example.com/next>; rel="next"'},
+            ),
+            factories.requests.Response(status_code=200, json_data=[]),
+        ]
+        pyramid_request.registry.notify = create_autospec(
+            pyramid_request.registry.notify
+        )
+
+        files = canvas_api_client.iter_files("COURSE_ID")
+
+        assert next(files)["id"] == 1
+        # Only the first page has been requested and its duplicates removed.
+        http_session.send.assert_called_once()
+        pyramid_request.registry.notify.assert_called_once_with(
+            Any.instance_of(FilesDiscoveredEvent).with_attrs(
+                {
+                    "values": [
+                        {
+                            "type": "canvas_file",
+                            "course_id": "COURSE_ID",
+                            "lms_id": 1,
+                            "name": "display_name",
+                            "size": 12345,
+                        }
+                    ]
+                }
+            )
+        )
+
+    def test_iter_files_uses_cached_list_files_responses(
+        self, canvas_api_client, http_session
+    ):
+        http_session.send.return_value = factories.requests.Response(
+            status_code=200,
+            json_data=[{"display_name": "name", "id": 1, "updated_at": "", "size": 1}],
+        )
+        files = canvas_api_client.list_files("COURSE_ID")
+
+        assert list(canvas_api_client.iter_files("COURSE_ID")) == files
+        http_session.send.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "method,args,json_data",
+        (
+            (
+                "authenticated_users_sections",
+                ["course_id"],
+                {"sections": [{"id": 1, "name": "name"}]},
+            ),
+            ("course_sections", ["course_id"], [{"id": 1, "name": "name"}]),
+            ("course_group_categories", ["course_id"], [{"id": 1, "name": "name"}]),
+            (
+                "group_category_groups",
+                ["group_category_id"],
+                [{"id": 1, "name": "name", "group_category_id": 1}],
+            ),
+            (
+                "list_files",
+                ["course_id"],
+                [{"display_name": "name", "id": 1, "updated_at": "", "size": 1}],
+            ),
+            ("public_url", ["file_id"], {"public_url": "https://example.com/file"}),
+        ),
+    )
+    def test_responses_are_cached_between_clients_for_the_same_user(
+        self,
+        canvas_api_client,
+        http_session,
+        authenticated_client,
+        pyramid_request,
+        cache,
+        cache_scope,
+        method,
+        args,
+        json_data,
+    ):
+        http_session.send.return_value = factories.requests.Response(
+            status_code=200, json_data=json_data
+        )
+        # A client for a later request from the same user.
+        other_client = CanvasAPIClient(
+            authenticated_client, pyramid_request, cache, cache_scope
+        )
+
+        result = getattr(canvas_api_client, method)(*args)
+
+        assert getattr(other_client, method)(*args) == result
+        http_session.send.assert_called_once()
+
+    def test_responses_arent_shared_between_users(
+        self,
+        canvas_api_client,
+        http_session,
+        authenticated_client,
+        pyramid_request,
+        cache,
+    ):
+        http_session.send.return_value = factories.requests.Response(
+            status_code=200, json_data=[{"id": 1, "name": "name"}]
+        )
+        other_users_client = CanvasAPIClient(
+            authenticated_client,
+            pyramid_request,
+            cache,
+            CanvasAPICache.scope("canvas.example.com", "consumer_key", "other_user"),
+        )
+
+        canvas_api_client.course_sections("course_id")
+        other_users_client.course_sections("course_id")
+
+        assert http_session.send.call_count == 2
+
     def test_public_url(self, canvas_api_client, http_session):
         http_session.send.return_value = factories.requests.Response(
             status_code=200, json_data={"public_url": "public_url_value"}
@@ -478,6 +641,7 @@ class TestMetaBehavior:
         "course_group_categories": ["course_id"],
         "users_sections": ["user_id", "course_id"],
         "list_files": ["course_id"],
+        "iter_files": ["course_id"],
         "public_url": ["file_id"],
     }
 
@@ -485,9 +649,20 @@ class TestMetaBehavior:
     def data_method(self, request, canvas_api_client):
         method, args = request.param
 
-        return lambda: getattr(canvas_api_client, method)(*args)
+        # Consume any iterators so that their requests are made.
+        return lambda: list(getattr(canvas_api_client, method)(*args))
+
+
+@pytest.fixture
+def cache():
+    return CanvasAPICache()
+
+
+@pytest.fixture
+def cache_scope():
+    return CanvasAPICache.scope("canvas.example.com", "consumer_key", "user_id")
 
 
 @pytest.fixture
-def canvas_api_client(authenticated_client, pyramid_request):
-    return CanvasAPIClient(authenticated_client, pyramid_request)
+def canvas_api_client(authenticated_client, pyramid_request, cache, cache_scope):
+    return CanvasAPIClient(authenticated_client, pyramid_request, cache, cache_scope)
@@ -2,6 +2,7 @@ from unittest.mock import sentinel
 
 import pytest
 
+from lms.services.canvas_api import CanvasAPICache
 from lms.services.canvas_api.factory import canvas_api_client_factory
 
 pytestmark = pytest.mark.usefixtures(
@@ -11,12 +12,23 @@ pytestmark = pytest.mark.usefixtures(
 
 class TestCanvasAPIClientFactory:
     def test_building_the_CanvasAPIClient(
-        self, pyramid_request, CanvasAPIClient, AuthenticatedClient
+        self,
+        pyramid_request,
+        CanvasAPIClient,
+        AuthenticatedClient,
+        application_instance_service,
     ):
         canvas_api = canvas_api_client_factory(sentinel.context, pyramid_request)
 
         CanvasAPIClient.assert_called_once_with(
-            AuthenticatedClient.return_value, pyramid_request
+            AuthenticatedClient.return_value,
+            pyramid_request,
+            cache=sentinel.cache,
+            cache_scope=CanvasAPICache.scope(
+                application_instance_service.get.return_value.lms_host(),
+                pyramid_request.lti_user.oauth_consumer_key,
+                pyramid_request.lti_user.user_id,
+            ),
         )
         assert canvas_api == CanvasAPIClient.return_value
 
@@ -26,7 +38,8 @@ class TestCanvasAPIClientFactory:
         canvas_api_client_factory(sentinel.context, pyramid_request)
 
         BasicClient.assert_called_once_with(
-            application_instance_service.get.return_value.lms_host()
+            application_instance_service.get.return_value.lms_host(),
+            session=sentinel.transport,
         )
 
     def test_building_the_AuthenticatedClient(
@@ -43,11 +56,21 @@ class TestCanvasAPIClientFactory:
             basic_client=BasicClient.return_value,
             oauth2_token_service=oauth2_token_service,
             client_id=application_instance_service.get.return_value.developer_key,
-            client_secret=application_instance_service.get().decrypted_developer_secret(
-                pyramid_request.registry.settings["aes_secret"]
-            ),
+            client_secret=application_instance_service.decrypted_developer_secret.return_value,
             redirect_uri=pyramid_request.route_url("canvas_api.oauth.callback"),
         )
+        application_instance_service.decrypted_developer_secret.assert_called_once_with(
+            application_instance_service.get.return_value,
+            pyramid_request.registry.settings["aes_secret"],
+        )
+
+    @pytest.fixture(autouse=True)
+    def http_transport(self, pyramid_request):
+        pyramid_request.registry["http.transport"] = sentinel.transport
+
+    @pytest.fixture(autouse=True)
+    def canvas_api_cache(self, pyramid_request):
+        pyramid_request.registry["canvas_api.cache"] = sentinel.cache
 
     @pytest.fixture(autouse=True)
     def BasicClient(self, patch):
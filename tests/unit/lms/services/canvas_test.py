@@ -5,6 +5,7 @@ import pytest
 
 from lms.services import (
     CanvasAPIPermissionError,
+    CanvasAPIServerError,
     CanvasFileNotFoundInCourse,
     CanvasService,
 )
@@ -177,17 +178,24 @@ class TestCanvasFileFinder:
     def test_assert_file_in_course_doesnt_raise_if_the_file_is_in_the_course(
         self, finder, canvas_api_client
     ):
-        canvas_api_client.list_files.return_value = [
-            {"id": sentinel.file_id},
-            {"id": sentinel.other_file_id},
-        ]
+        canvas_api_client.iter_files.return_value = iter(
+            [{"id": sentinel.file_id}, {"id": sentinel.other_file_id}]
+        )
 
         finder.assert_file_in_course(sentinel.course_id, str(sentinel.file_id))
 
+        canvas_api_client.iter_files.assert_called_once_with(sentinel.course_id)
+        # It stops looking once it finds the file.
+        assert list(canvas_api_client.iter_files.return_value) == [
+            {"id": sentinel.other_file_id}
+        ]
+
     def test_assert_file_in_course_raises_if_the_file_isnt_in_the_course(
         self, finder, canvas_api_client
     ):
-        canvas_api_client.list_files.return_value = [{"id": sentinel.other_file_id}]
+        canvas_api_client.iter_files.return_value = iter(
+            [{"id": sentinel.other_file_id}]
+        )
 
         with pytest.raises(CanvasFileNotFoundInCourse):
             finder.assert_file_in_course(sentinel.course_id, sentinel.file_id)
@@ -213,6 +221,84 @@ class TestCanvasFileFinder:
         canvas_api_client.list_files.assert_called_once_with(sentinel.course_id)
         assert matching_file_id == str(sentinel.matching_file_id)
 
+    def test_find_matching_file_in_course_returns_a_known_copy_from_the_db(
+        self, finder, canvas_api_client, file_service
+    ):
+        file_service.get.side_effect = [None, sentinel.file]
+        file_service.find_copies_in_course.return_value = [
+            factories.File(lms_id="copy_1"),
+            factories.File(lms_id="copy_2"),
+        ]
+
+        matching_file_id = finder.find_matching_file_in_course(
+            sentinel.course_id, [sentinel.file_id_1, sentinel.file_id_2]
+        )
+
+        file_service.find_copies_in_course.assert_called_once_with(
+            sentinel.file, sentinel.course_id
+        )
+        canvas_api_client.public_url.assert_called_once_with("copy_1")
+        # It doesn't need to list the course's files from the API.
+        canvas_api_client.list_files.assert_not_called()
+        assert matching_file_id == "copy_1"
+
+    @pytest.mark.parametrize(
+        "error", [CanvasAPIPermissionError, CanvasAPIServerError("Not Found")]
+    )
+    def test_find_matching_file_in_course_skips_copies_the_user_cant_see(
+        self, finder, canvas_api_client, file_service, error
+    ):
+        file_service.get.return_value = sentinel.file
+        file_service.find_copies_in_course.return_value = [
+            factories.File(lms_id="copy_1"),
+            factories.File(lms_id="copy_2"),
+        ]
+        canvas_api_client.public_url.side_effect = [error, sentinel.url]
+
+        matching_file_id = finder.find_matching_file_in_course(
+            sentinel.course_id, [sentinel.file_id]
+        )
+
+        assert canvas_api_client.public_url.call_args_list == [
+            call("copy_1"),
+            call("copy_2"),
+        ]
+        canvas_api_client.list_files.assert_not_called()
+        assert matching_file_id == "copy_2"
+
+    def test_find_matching_file_in_course_falls_back_to_the_api_if_the_user_cant_see_any_copies(
+        self, finder, canvas_api_client, file_service
+    ):
+        file_service.get.return_value = factories.File()
+        file_service.find_copies_in_course.return_value = [
+            factories.File(lms_id="copy_1")
+        ]
+        canvas_api_client.public_url.side_effect = CanvasAPIPermissionError
+        canvas_api_client.list_files.return_value = [
+            {
+                "id": sentinel.matching_file_id,
+                "display_name": file_service.get.return_value.name,
+                "size": file_service.get.return_value.size,
+            },
+        ]
+
+        matching_file_id = finder.find_matching_file_in_course(
+            sentinel.course_id, [sentinel.file_id]
+        )
+
+        canvas_api_client.list_files.assert_called_once_with(sentinel.course_id)
+        assert matching_file_id == str(sentinel.matching_file_id)
+
+    def test_find_matching_file_in_course_falls_back_to_the_api(
+        self, finder, canvas_api_client, file_service
+    ):
+        file_service.get.return_value = factories.File()
+        file_service.find_copies_in_course.return_value = []
+
+        finder.find_matching_file_in_course(sentinel.course_id, [sentinel.file_id])
+
+        canvas_api_client.list_files.assert_called_once_with(sentinel.course_id)
+
     def test_find_matching_file_in_course_with_multiple_file_ids(
         self, finder, canvas_api_client, file_service
     ):
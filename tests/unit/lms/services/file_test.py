@@ -1,3 +1,4 @@
+from datetime import datetime
 from unittest.mock import sentinel
 
 import pytest
@@ -25,6 +26,72 @@ class TestGet:
         assert not svc.get(file_.lms_id, file_.type)
 
 
+class TestFindCopiesInCourse:
+    def test_it(self, application_instance, svc):
+        file_ = factories.File(application_instance=application_instance)
+        older_copy, newer_copy = [
+            factories.File(
+                application_instance=application_instance,
+                course_id="copied_course",
+                name=file_.name,
+                size=file_.size,
+                created=created,
+            )
+            for created in (datetime(2021, 1, 1), datetime(2021, 2, 1))
+        ]
+        # Files that aren't copies.
+        factories.File(
+            application_instance=application_instance,
+            course_id="copied_course",
+            name=file_.name,
+            size=file_.size + 1,
+        )
+        factories.File(
+            application_instance=application_instance,
+            course_id="copied_course",
+            name=file_.name,
+            size=file_.size,
+            type="blackboard_file",
+        )
+        factories.File(
+            application_instance=application_instance,
+            course_id="other_course",
+            name=file_.name,
+            size=file_.size,
+        )
+        factories.File(course_id="copied_course", name=file_.name, size=file_.size)
+
+        assert svc.find_copies_in_course(file_, "copied_course") == [
+            newer_copy,
+            older_copy,
+        ]
+
+    def test_copies_discovered_at_the_same_time_are_newest_first(
+        self, application_instance, svc, db_session
+    ):
+        file_ = factories.File(application_instance=application_instance)
+        copies = [
+            factories.File(
+                application_instance=application_instance,
+                course_id="copied_course",
+                name=file_.name,
+                size=file_.size,
+                created=datetime(2021, 1, 1),
+            )
+            for _ in range(2)
+        ]
+        db_session.flush()
+
+        assert svc.find_copies_in_course(file_, "copied_course") == copies[::-1]
+
+    def test_it_doesnt_return_the_file_itself(self, application_instance, svc):
+        file_ = factories.File(
+            application_instance=application_instance, course_id="course_id"
+        )
+
+        assert not svc.find_copies_in_course(file_, "course_id")
+
+
 @pytest.mark.usefixtures("application_instance_service")
 class TestFactory:
     def test_it(self, pyramid_request):
@@ -1,20 +1,21 @@
 from unittest import mock
 
 import pytest
+from h_matchers import Any
 
-from lms.models import GroupInfo
+from lms.models import GroupInfo, GroupInfoInstructor
 from lms.services.group_info import GroupInfoService
 from tests import factories
 
 
-class TestGroupInfoUpsert:
+class TestGroupInfoUpsertMany:
     AUTHORITY = "TEST_AUTHORITY_PROVIDED_ID"
 
     def test_it_adds_a_new_GroupInfo_if_none_exists(
         self, application_instance, db_session, group_info_svc, params
     ):
-        group_info_svc.upsert(
-            factories.Course(authority_provided_id=self.AUTHORITY),
+        group_info_svc.upsert_many(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
             consumer_key=application_instance.consumer_key,
             params=params,
         )
@@ -37,8 +38,8 @@ class TestGroupInfoUpsert:
 
         db_session.add(pre_existing_group)
 
-        group_info_svc.upsert(
-            factories.Course(authority_provided_id=self.AUTHORITY),
+        group_info_svc.upsert_many(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
             consumer_key=application_instance.consumer_key,
             params=dict(params, context_title="NEW_TITLE"),
         )
@@ -50,11 +51,32 @@ class TestGroupInfoUpsert:
         assert group_info.context_title == "NEW_TITLE"
         assert group_info.type == "course_group"
 
+    def test_it_doesnt_change_columns_that_arent_in_params(
+        self, application_instance, db_session, group_info_svc
+    ):
+        db_session.add(
+            GroupInfo(
+                authority_provided_id=self.AUTHORITY,
+                consumer_key=application_instance.consumer_key,
+                context_label="OLD_LABEL",
+            )
+        )
+
+        group_info_svc.upsert_many(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
+            consumer_key=application_instance.consumer_key,
+            params={"context_title": "NEW_TITLE"},
+        )
+
+        group_info = self.get_inserted_group_info(db_session)
+        assert group_info.context_label == "OLD_LABEL"
+        assert group_info.context_title == "NEW_TITLE"
+
     def test_it_ignores_non_metadata_params(
         self, application_instance, db_session, group_info_svc, params
     ):
-        group_info_svc.upsert(
-            factories.Course(authority_provided_id=self.AUTHORITY),
+        group_info_svc.upsert_many(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
             consumer_key=application_instance.consumer_key,
             params=dict(
                 params,
@@ -73,34 +95,87 @@ class TestGroupInfoUpsert:
     def test_it_records_instructors_with_group_info(
         self, application_instance, db_session, group_info_svc, pyramid_request
     ):
-        group_info_svc.upsert(
-            factories.Course(authority_provided_id=self.AUTHORITY),
+        group_info_svc.upsert_many(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
             consumer_key=application_instance.consumer_key,
             params={},
         )
 
         group_info = self.get_inserted_group_info(db_session)
 
-        assert len(group_info.instructors) == 1
-        assert (
-            group_info.instructors[0]["username"]
-            == pyramid_request.lti_user.h_user.username
+        h_user = pyramid_request.lti_user.h_user
+        assert group_info.instructors == [
+            Any.instance_of(GroupInfoInstructor).with_attrs(
+                dict(email="test_email", **h_user._asdict())
+            )
+        ]
+
+    @pytest.mark.usefixtures("user_is_instructor")
+    def test_it_updates_existing_instructors(
+        self, application_instance, db_session, group_info_svc, pyramid_request
+    ):
+        for email in ("old_email", "test_email"):
+            pyramid_request.lti_user = pyramid_request.lti_user._replace(email=email)
+            group_info_svc.upsert_many(
+                [factories.Course(authority_provided_id=self.AUTHORITY)],
+                consumer_key=application_instance.consumer_key,
+                params={},
+            )
+
+        group_info = self.get_inserted_group_info(db_session)
+
+        assert group_info.instructors == [
+            Any.instance_of(GroupInfoInstructor).with_attrs({"email": "test_email"})
+        ]
+
+    def test_it_upserts_many_groups(
+        self, application_instance, db_session, group_info_svc, params
+    ):
+        course = factories.Course(authority_provided_id=self.AUTHORITY)
+        section = factories.Grouping(
+            authority_provided_id="SECTION_ID", type="canvas_section"
+        )
+
+        group_info_svc.upsert_many(
+            [course, section, course],
+            consumer_key=application_instance.consumer_key,
+            params=params,
+        )
+
+        group_infos = db_session.query(GroupInfo).filter(
+            GroupInfo.authority_provided_id.in_([self.AUTHORITY, "SECTION_ID"])
         )
-        assert group_info.instructors[0]["email"] == "test_email"
+        assert {
+            (group_info.authority_provided_id, group_info.type)
+            for group_info in group_infos
+        } == {(self.AUTHORITY, "course_group"), ("SECTION_ID", "section_group")}
+
+    @pytest.mark.usefixtures("user_is_instructor")
+    def test_upsert_many_query_budget(
+        self, application_instance, db_session, group_info_svc, params, query_budget
+    ):
+        groupings = factories.Course.create_batch(20)
+        db_session.flush()
+
+        # One statement for the GroupInfos and one for their instructors.
+        with query_budget(statements=2):
+            group_info_svc.upsert_many(
+                groupings, consumer_key=application_instance.consumer_key, params=params
+            )
 
     @pytest.mark.usefixtures("user_is_learner")
     def test_it_doesnt_record_learners_with_group_info(
         self, application_instance, db_session, group_info_svc
     ):
-        group_info_svc.upsert(
-            factories.Course(authority_provided_id=self.AUTHORITY),
+        group_info_svc.upsert_many(
+            [factories.Course(authority_provided_id=self.AUTHORITY)],
             consumer_key=application_instance.consumer_key,
             params={},
         )
 
         group_info = self.get_inserted_group_info(db_session)
 
-        assert group_info.instructors == []
+        assert not group_info.instructors
 
     def get_inserted_group_info(self, db_session):
         return (
@@ -1,9 +1,10 @@
 from unittest.mock import sentinel
 
 import pytest
+from h_matchers import Any
 from sqlalchemy.orm import make_transient
 
-from lms.models import Grouping
+from lms.models import CanvasGroup, CanvasSection, Grouping
 from lms.models._hashed_id import hashed_id
 from lms.services.grouping import GroupingService, factory
 from tests import factories
@@ -46,63 +47,168 @@ class TestGroupingService:
         assert db_grouping.lms_name == "new_name"
         assert db_grouping.extra == {"extra": "extra"}
 
-    def test_canvas_section_finds_course(self, svc, course_service, db_session):
-        course_service.get.return_value = factories.Course()
+    def test_upsert_many_inserts(self, svc, db_session, course):
+        groupings = svc.upsert_many(
+            CanvasSection,
+            course,
+            [
+                {
+                    "authority_provided_id": f"authority_provided_id_{i}",
+                    "lms_id": f"lms_id_{i}",
+                    "lms_name": f"lms_name_{i}",
+                    "extra": {},
+                }
+                for i in range(3)
+            ],
+        )
+
+        assert groupings == [
+            Any.instance_of(CanvasSection).with_attrs(
+                {
+                    "id": Any.int(),
+                    "authority_provided_id": f"authority_provided_id_{i}",
+                    "lms_id": f"lms_id_{i}",
+                    "lms_name": f"lms_name_{i}",
+                    "parent": course,
+                    "application_instance_id": course.application_instance_id,
+                }
+            )
+            for i in range(3)
+        ]
+        assert db_session.query(CanvasSection).count() == 3
+
+    def test_upsert_many_updates(self, svc, db_session, course):
+        existing = factories.Grouping(
+            application_instance=course.application_instance,
+            authority_provided_id="authority_provided_id",
+            lms_id="lms_id",
+            lms_name="old_name",
+        )
         db_session.flush()
 
-        grouping = svc.upsert_canvas_section(
+        groupings = svc.upsert_many(
+            CanvasGroup,
+            course,
+            [
+                {
+                    "authority_provided_id": "authority_provided_id",
+                    "lms_id": "lms_id",
+                    "lms_name": "new_name",
+                    "extra": {"group_set_id": 1},
+                },
+                # The same grouping twice is only upserted once.
+                {
+                    "authority_provided_id": "authority_provided_id",
+                    "lms_id": "lms_id",
+                    "lms_name": "new_name",
+                    "extra": {"group_set_id": 1},
+                },
+            ],
+        )
+
+        assert groupings == [existing, existing]
+        assert existing.lms_name == "new_name"
+        assert existing.extra == {"group_set_id": 1}
+
+    def test_upsert_many_with_no_groupings(self, svc, course):
+        assert svc.upsert_many(CanvasSection, course, []) == []
+
+    def test_upsert_canvas_sections(self, svc, course_service, course):
+        sections = svc.upsert_canvas_sections(
             self.TOOL_CONSUMER_INSTANCE_GUID,
             self.CONTEXT_ID,
-            "section_id",
-            "section_name",
+            [{"id": "section_id", "name": "section_name"}],
         )
 
         course_service.get.assert_called_once_with(
             hashed_id(self.TOOL_CONSUMER_INSTANCE_GUID, self.CONTEXT_ID),
         )
-        assert grouping.parent_id == course_service.get.return_value.id
-
-    def test_canvas_group_finds_course(self, svc, course_service, db_session):
-        course_service.get.return_value = factories.Course()
-        db_session.flush()
-
-        grouping = svc.upsert_canvas_group(
+        assert sections == [
+            Any.instance_of(CanvasSection).with_attrs(
+                {
+                    "authority_provided_id": hashed_id(
+                        self.TOOL_CONSUMER_INSTANCE_GUID, self.CONTEXT_ID, "section_id"
+                    ),
+                    "lms_id": "section_id",
+                    "lms_name": "section_name",
+                    "parent_id": course.id,
+                }
+            )
+        ]
+
+    def test_upsert_canvas_groups(self, svc, course_service, course):
+        groups = svc.upsert_canvas_groups(
             self.TOOL_CONSUMER_INSTANCE_GUID,
             self.CONTEXT_ID,
-            "group_id",
-            "group_name",
-            "group_set_id",
+            [{"id": "group_id", "name": "group_name", "group_category_id": 7}],
         )
 
         course_service.get.assert_called_once_with(
             hashed_id(self.TOOL_CONSUMER_INSTANCE_GUID, self.CONTEXT_ID),
         )
-        assert grouping.parent_id == course_service.get.return_value.id
-
-    def test_canvas_group_and_sections_dont_conflict(
-        self, svc, course_service, db_session
-    ):
-        course_service.get.return_value = factories.Course()
+        assert groups == [
+            Any.instance_of(CanvasGroup).with_attrs(
+                {
+                    "authority_provided_id": hashed_id(
+                        self.TOOL_CONSUMER_INSTANCE_GUID,
+                        self.CONTEXT_ID,
+                        "canvas_group",
+                        "group_id",
+                    ),
+                    "lms_id": "group_id",
+                    "lms_name": "group_name",
+                    "parent_id": course.id,
+                    "extra": {"group_set_id": 7},
+                }
+            )
+        ]
+
+    @pytest.mark.usefixtures("course")
+    def test_upsert_canvas_sections_query_budget(self, svc, db_session, query_budget):
         db_session.flush()
+        sections = [{"id": f"section_{i}", "name": f"Section {i}"} for i in range(20)]
+
+        with query_budget(statements=1):
+            svc.upsert_canvas_sections(
+                self.TOOL_CONSUMER_INSTANCE_GUID, self.CONTEXT_ID, sections
+            )
 
-        group = svc.upsert_canvas_group(
+    @pytest.mark.usefixtures("course")
+    def test_upsert_canvas_groups_query_budget(self, svc, db_session, query_budget):
+        db_session.flush()
+        groups = [
+            {"id": f"group_{i}", "name": f"Group {i}", "group_category_id": 7}
+            for i in range(20)
+        ]
+
+        with query_budget(statements=1):
+            svc.upsert_canvas_groups(
+                self.TOOL_CONSUMER_INSTANCE_GUID, self.CONTEXT_ID, groups
+            )
+
+    def test_canvas_group_and_sections_dont_conflict(self, svc, course):
+        groups = svc.upsert_canvas_groups(
             self.TOOL_CONSUMER_INSTANCE_GUID,
             self.CONTEXT_ID,
-            "same_id",
-            "group_name",
-            "group_set_id",
+            [{"id": "same_id", "name": "group_name", "group_category_id": 7}],
         )
-        section = svc.upsert_canvas_section(
+        sections = svc.upsert_canvas_sections(
             self.TOOL_CONSUMER_INSTANCE_GUID,
             self.CONTEXT_ID,
-            "same_id",
-            "section_name",
+            [{"id": "same_id", "name": "section_name"}],
         )
 
-        assert group.authority_provided_id != section.authority_provided_id
-        assert (
-            group.parent_id == section.parent_id == course_service.get.return_value.id
+        assert groups[0].authority_provided_id != sections[0].authority_provided_id
+        assert groups[0].parent_id == sections[0].parent_id == course.id
+
+    @pytest.fixture
+    def course(self, course_service, application_instance_service, db_session):
+        course = factories.Course(
+            application_instance=application_instance_service.get.return_value
         )
+        db_session.flush()
+        course_service.get.return_value = course
+        return course
 
     @pytest.fixture
     def svc(self, db_session, course_service, application_instance_service):
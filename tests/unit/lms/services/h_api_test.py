@@ -1,12 +1,14 @@
-from unittest.mock import call, patch, sentinel
+import threading
+from unittest.mock import call, create_autospec, patch, sentinel
 
 import pytest
-from h_api.bulk_api.model.command import ConfigCommand
+from h_api.bulk_api import BulkAPI, CommandBuilder
+from h_api.exceptions import UnpopulatedReferenceError
 from h_matchers import Any
 
 from lms.models import HUser
 from lms.services import HAPIError
-from lms.services.h_api import HAPI
+from lms.services.h_api import HAPI, BulkSyncCoalescer, includeme, sync_commands
 from lms.services.http import HTTPError
 
 pytestmark = pytest.mark.usefixtures("http_service")
@@ -17,38 +19,55 @@ class TestHAPI:
     # protected-access messages.
     # pylint: disable=protected-access
 
-    def test_bulk_action_process_commands_correctly(self, h_api, BulkAPI):
-        h_api.execute_bulk([sentinel.command_1, sentinel.command_2])
+    def test_execute_bulk_sends_the_commands_to_h(self, h_api, _api_request):
+        syncs = [(user("user"), [group("group")])]
 
-        BulkAPI.to_string.assert_called_once_with(
-            [
-                Any.object(ConfigCommand).with_attrs(
-                    {
-                        "body": Any.object.with_attrs(
-                            {
-                                "effective_user": "acct:lms@TEST_AUTHORITY",
-                                "total_instructions": 3,
-                            }
-                        )
-                    }
-                ),
-                sentinel.command_1,
-                sentinel.command_2,
-            ]
-        )
-
-    def test_bulk_action_calls_h_correctly(self, h_api, BulkAPI, _api_request):
-        h_api.execute_bulk([sentinel.command])
+        h_api.execute_bulk(iter(sync_commands(syncs)))
 
         _api_request.assert_called_once_with(
             "POST",
             path="bulk",
-            body=BulkAPI.to_string.return_value,
+            body=BulkAPI.to_string(
+                [
+                    CommandBuilder.configure(
+                        effective_user="acct:lms@TEST_AUTHORITY", total_instructions=4
+                    ),
+                    *sync_commands(syncs),
+                ]
+            ),
             headers=Any.mapping.containing(
                 {"Content-Type": "application/vnd.hypothesis.v1+x-ndjson"}
             ),
         )
 
+    def test_execute_bulk_checks_the_sequence_of_commands(self, h_api, _api_request):
+        # A membership of a user and group that haven't been upserted.
+        commands = [CommandBuilder.group_membership.create("user_0", "group_0")]
+
+        with pytest.raises(UnpopulatedReferenceError):
+            h_api.execute_bulk(commands)
+
+        _api_request.assert_not_called()
+
+    def test_sync(self, h_api, coalescer):
+        h_api.sync(sentinel.user, sentinel.groups)
+
+        coalescer.sync.assert_called_once_with(
+            sentinel.user, sentinel.groups, Any.function()
+        )
+
+    def test_sync_executes_the_coalesced_syncs(self, h_api, coalescer):
+        h_api.sync(sentinel.user, sentinel.groups)
+        execute = coalescer.sync.call_args[0][2]
+
+        with patch.object(h_api, "execute_bulk", autospec=True):
+            execute([(user("user"), [])])
+
+            _, kwargs = h_api.execute_bulk.call_args
+        assert [command.raw for command in kwargs["commands"]] == [
+            CommandBuilder.user.upsert(user("user"), "user_0").raw
+        ]
+
     def test_get_user_works(self, h_api, _api_request):
         _api_request.return_value.json.return_value = {
             "display_name": sentinel.display_name
@@ -103,15 +122,195 @@ class TestHAPI:
         with pytest.raises(OSError):
             h_api._api_request(sentinel.method, "dummy-path")
 
-    @pytest.fixture
-    def BulkAPI(self, patch):
-        return patch("lms.services.h_api.BulkAPI")
-
     @pytest.fixture
     def h_api(self, pyramid_request):
         return HAPI(sentinel.context, pyramid_request)
 
+    @pytest.fixture(autouse=True)
+    def coalescer(self, pyramid_request):
+        coalescer = create_autospec(BulkSyncCoalescer, instance=True, spec_set=True)
+        pyramid_request.registry["h_api.coalescer"] = coalescer
+        return coalescer
+
     @pytest.fixture
     def _api_request(self, h_api):
         with patch.object(h_api, "_api_request", autospec=True):
             yield h_api._api_request
+
+
+class TestSyncCommands:
+    def test_it(self):
+        commands = sync_commands(
+            [
+                (user("user_1"), [group("group_1"), group("group_2")]),
+                (user("user_2"), [group("group_1")]),
+            ]
+        )
+
+        assert [command.raw for command in commands] == [
+            CommandBuilder.user.upsert(user("user_1"), "user_0").raw,
+            CommandBuilder.user.upsert(user("user_2"), "user_1").raw,
+            CommandBuilder.group.upsert(group("group_1"), "group_0").raw,
+            CommandBuilder.group.upsert(group("group_2"), "group_1").raw,
+            CommandBuilder.group_membership.create("user_0", "group_0").raw,
+            CommandBuilder.group_membership.create("user_0", "group_1").raw,
+            CommandBuilder.group_membership.create("user_1", "group_0").raw,
+        ]
+
+    def test_it_upserts_users_and_groups_once_with_their_latest_attributes(self):
+        old = (user("user", "Old Name"), [group("group", "Old Name")])
+        new = (user("user", "New Name"), [group("group", "New Name")])
+
+        commands = sync_commands([old, new, old[:1] + ([],)])
+
+        assert [command.raw for command in commands] == [
+            CommandBuilder.user.upsert(user("user", "Old Name"), "user_0").raw,
+            CommandBuilder.group.upsert(group("group", "New Name"), "group_0").raw,
+            CommandBuilder.group_membership.create("user_0", "group_0").raw,
+        ]
+
+    def test_it_doesnt_change_the_attributes(self):
+        syncs = [(user("user"), [group("group")])]
+
+        sync_commands(syncs)
+
+        assert syncs == [(user("user"), [group("group")])]
+
+
+class TestBulkSyncCoalescer:
+    def test_it_sends_syncs_straight_away_without_a_window(self, execute):
+        coalescer = BulkSyncCoalescer(window=0)
+
+        coalescer.sync(sentinel.user, sentinel.groups, execute)
+
+        execute.assert_called_once_with([(sentinel.user, sentinel.groups)])
+
+    def test_it_sends_a_lone_sync_once_the_window_has_passed(self, execute):
+        coalescer = BulkSyncCoalescer(window=0.01)
+
+        coalescer.sync(sentinel.user, sentinel.groups, execute)
+
+        execute.assert_called_once_with([(sentinel.user, sentinel.groups)])
+
+    def test_it_sends_concurrent_syncs_together(self, execute):
+        errors = run_concurrently(BulkSyncCoalescer(window=10, max_syncs=3), execute)
+
+        assert errors == [None, None, None]
+        execute.assert_called_once_with(Any.list.containing(SYNCS).only())
+
+    def test_later_syncs_start_a_new_batch(self, execute):
+        coalescer = BulkSyncCoalescer(window=10, max_syncs=3)
+        run_concurrently(coalescer, execute)
+
+        run_concurrently(coalescer, execute)
+
+        assert execute.call_count == 2
+
+    def test_it_sends_the_syncs_one_by_one_if_the_batch_fails(self, execute):
+        def execute_side_effect(syncs):
+            if len(syncs) > 1 or syncs[0][0] == "user_1":
+                raise HAPIError("Bad user")
+
+        execute.side_effect = execute_side_effect
+
+        errors = run_concurrently(BulkSyncCoalescer(window=10, max_syncs=3), execute)
+
+        assert execute.call_count == 4
+        assert errors == [None, Any.instance_of(HAPIError), None]
+
+    def test_it_raises_if_a_lone_sync_fails(self, execute):
+        execute.side_effect = HAPIError("Bad user")
+        coalescer = BulkSyncCoalescer(window=0.01)
+
+        with pytest.raises(HAPIError):
+            coalescer.sync(sentinel.user, sentinel.groups, execute)
+
+        execute.assert_called_once()
+
+    def test_it_passes_unexpected_errors_to_every_caller(self, execute):
+        execute.side_effect = OSError
+
+        errors = run_concurrently(BulkSyncCoalescer(window=10, max_syncs=3), execute)
+
+        assert errors == [Any.instance_of(OSError)] * 3
+
+    def test_it_keeps_errors_from_before_an_unexpected_error(self, execute):
+        execute.side_effect = [HAPIError("Batch"), HAPIError("Bad user"), OSError]
+
+        errors = run_concurrently(BulkSyncCoalescer(window=10, max_syncs=3), execute)
+
+        assert errors == [
+            Any.instance_of(HAPIError),
+            Any.instance_of(OSError),
+            Any.instance_of(OSError),
+        ]
+
+    @pytest.mark.parametrize(
+        "settings,window",
+        [
+            ({}, 0),
+            ({"h_bulk_coalesce_window": ""}, 0),
+            ({"h_bulk_coalesce_window": "0.05"}, 0.05),
+        ],
+    )
+    def test_from_settings(self, settings, window):
+        assert BulkSyncCoalescer.from_settings(settings).window == window
+
+    @pytest.fixture
+    def execute(self):
+        return create_autospec(lambda syncs: None)  # pragma: nocover
+
+
+class TestIncludeMe:
+    def test_it(self, pyramid_config):
+        includeme(pyramid_config)
+
+        assert isinstance(pyramid_config.registry["h_api.coalescer"], BulkSyncCoalescer)
+
+
+SYNCS = [("user_0", ["group"]), ("user_1", ["group"]), ("user_2", ["group"])]
+
+
+def run_concurrently(coalescer, execute):
+    """
+    Call `coalescer.sync()` with each of SYNCS, concurrently.
+
+    The first sync is made first (so it leads the batch) and the others join
+    it while it waits. Returns the exception each call raised (or None).
+    """
+    errors = [None] * len(SYNCS)
+
+    def sync(i):
+        try:
+            coalescer.sync(*SYNCS[i], execute)
+        except Exception as err:  # pylint:disable=broad-except
+            errors[i] = err
+
+    threads = [threading.Thread(target=sync, args=(i,)) for i in range(len(SYNCS))]
+    threads[0].start()
+    # pylint:disable=protected-access
+    while coalescer._batch is None:
+        pass
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return errors
+
+
+def user(username, display_name="Display Name"):
+    return {
+        "authority": "lms.hypothes.is",
+        "username": username,
+        "display_name": display_name,
+        "identities": [{"provider": "provider", "provider_unique_id": username}],
+    }
+
+
+def group(authority_provided_id, name="Group Name"):
+    return {
+        "authority": "lms.hypothes.is",
+        "name": name,
+        "authority_provided_id": authority_provided_id,
+    }
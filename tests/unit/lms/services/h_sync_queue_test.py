@@ -0,0 +1,207 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+import sqlalchemy as sa
+from h_api.bulk_api import CommandBuilder
+
+from lms.models import HSyncedMembership, HSyncJob
+from lms.services import HAPIError
+from lms.services.h_sync_queue import HSyncQueue, factory
+
+
+class TestHSyncQueue:
+    def test_can_defer(self, queue, db_session):
+        HSyncedMembership.record(db_session, "user", ["group"])
+
+        assert queue.can_defer("user", ["group"])
+        assert not queue.can_defer("user", ["group", "other_group"])
+
+    def test_synced(self, queue):
+        queue.synced("user", ["group"])
+
+        assert queue.can_defer("user", ["group"])
+
+    def test_enqueue(self, queue, db_session):
+        queue.enqueue(user("user"), [group("group")])
+
+        job = db_session.query(HSyncJob).one()
+        assert job.user == user("user")
+        assert job.groups == [group("group")]
+
+    def test_stats(self, queue, db_session):
+        assert queue.stats() == (0, 0)
+
+        queue.enqueue(user("user"), [])
+        queue.enqueue(user("user"), [])
+        db_session.flush()
+        # The jobs were created in this transaction, when now() started.
+        assert queue.stats() == (2, 0)
+
+    def test_process_sends_the_jobs_to_h_in_one_call(
+        self, queue, db_session, h_api, newrelic
+    ):
+        queue.enqueue(user("user_1"), [group("group_1"), group("group_2")])
+        queue.enqueue(user("user_2"), [group("group_1")])
+        db_session.flush()
+
+        assert queue.process() == 2
+
+        assert sent_commands(h_api) == [
+            CommandBuilder.user.upsert(user("user_1"), "user_0").raw,
+            CommandBuilder.user.upsert(user("user_2"), "user_1").raw,
+            CommandBuilder.group.upsert(group("group_1"), "group_0").raw,
+            CommandBuilder.group.upsert(group("group_2"), "group_1").raw,
+            CommandBuilder.group_membership.create("user_0", "group_0").raw,
+            CommandBuilder.group_membership.create("user_0", "group_1").raw,
+            CommandBuilder.group_membership.create("user_1", "group_0").raw,
+        ]
+        db_session.flush()
+        assert not db_session.query(HSyncJob).count()
+        newrelic.agent.record_custom_metric.assert_has_calls(
+            [
+                mock.call("Custom/HSyncQueue/Latency", 0),
+                mock.call("Custom/HSyncQueue/Latency", 0),
+                mock.call("Custom/HSyncQueue/Sent", 2),
+            ]
+        )
+
+    def test_process_sends_the_latest_attributes_once(self, queue, db_session, h_api):
+        queue.enqueue(user("user", "Old Name"), [group("group", "Old Name")])
+        queue.enqueue(user("user", "New Name"), [group("group", "New Name")])
+        db_session.flush()
+
+        queue.process()
+
+        assert sent_commands(h_api) == [
+            CommandBuilder.user.upsert(user("user", "New Name"), "user_0").raw,
+            CommandBuilder.group.upsert(group("group", "New Name"), "group_0").raw,
+            CommandBuilder.group_membership.create("user_0", "group_0").raw,
+        ]
+
+    def test_process_claims_jobs_with_skip_locked(
+        self, queue, db_session, query_budget
+    ):
+        queue.enqueue(user("user"), [])
+        db_session.flush()
+
+        with query_budget(statements=10) as stats:
+            queue.process()
+
+        assert any("FOR UPDATE SKIP LOCKED" in statement for statement in stats.shapes)
+
+    def test_process_only_claims_jobs_that_are_due(self, queue, db_session, h_api):
+        queue.enqueue(user("user"), [])
+        db_session.flush()
+        db_session.query(HSyncJob).update(
+            {"run_after": sa.func.localtimestamp() + timedelta(seconds=1)}
+        )
+
+        assert not queue.process()
+        h_api.execute_bulk.assert_not_called()
+
+    def test_process_claims_up_to_limit_jobs(self, queue, db_session):
+        for _ in range(3):
+            queue.enqueue(user("user"), [])
+        db_session.flush()
+
+        assert queue.process(limit=2) == 2
+        db_session.flush()
+        assert db_session.query(HSyncJob).count() == 1
+
+    def test_process_retries_failed_jobs_later(
+        self, queue, db_session, h_api, newrelic, caplog
+    ):
+        queue.enqueue(user("user"), [])
+        db_session.flush()
+        h_api.execute_bulk.side_effect = HAPIError("h is down")
+
+        assert queue.process() == 1
+        db_session.flush()
+
+        job = db_session.query(HSyncJob).one()
+        assert job.attempts == 1
+        assert job.last_error == "h is down"
+        assert job.run_after == job.created + timedelta(seconds=HSyncQueue.BACKOFF)
+        assert caplog.messages == [f"h sync job {job.id} failed (attempt 1)"]
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/HSyncQueue/Failed", 1
+        )
+        assert not queue.process()
+
+    @pytest.mark.parametrize(
+        "attempts,backoff",
+        [(1, HSyncQueue.BACKOFF * 2), (20, HSyncQueue.MAX_BACKOFF)],
+    )
+    def test_process_backs_off_exponentially(
+        self, queue, db_session, h_api, attempts, backoff
+    ):
+        db_session.add(HSyncJob(user=user("user"), groups=[], attempts=attempts))
+        db_session.flush()
+        h_api.execute_bulk.side_effect = HAPIError("h is down")
+
+        queue.process()
+        db_session.flush()
+
+        job = db_session.query(HSyncJob).one()
+        assert job.run_after == job.created + timedelta(seconds=backoff)
+
+    def test_process_sends_the_jobs_one_by_one_if_the_batch_fails(
+        self, queue, db_session, h_api
+    ):
+        queue.enqueue(user("good_user"), [])
+        queue.enqueue(user("bad_user"), [])
+        db_session.flush()
+
+        def execute_bulk(commands):
+            if len(commands) > 1 or "bad_user" in str(commands[0].raw):
+                raise HAPIError("Bad user")
+
+        h_api.execute_bulk.side_effect = execute_bulk
+
+        assert queue.process() == 2
+        db_session.flush()
+
+        assert h_api.execute_bulk.call_count == 3
+        job = db_session.query(HSyncJob).one()
+        assert job.user["username"] == "bad_user"
+        assert job.attempts == 1
+
+    @pytest.fixture
+    def queue(self, db_session, h_api):
+        return HSyncQueue(db_session, h_api)
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("lms.services.h_sync_queue.newrelic")
+
+
+class TestFactory:
+    def test_it(self, pyramid_request, h_api):
+        queue = factory(mock.sentinel.context, pyramid_request)
+
+        # pylint:disable=protected-access
+        assert queue._db == pyramid_request.db
+        assert queue._h_api == h_api
+
+
+def sent_commands(h_api):
+    _, kwargs = h_api.execute_bulk.call_args
+    return [command.raw for command in kwargs["commands"]]
+
+
+def user(username, display_name="Display Name"):
+    return {
+        "authority": "lms.hypothes.is",
+        "username": username,
+        "display_name": display_name,
+        "identities": [{"provider": "provider", "provider_unique_id": username}],
+    }
+
+
+def group(authority_provided_id, name="Group Name"):
+    return {
+        "authority": "lms.hypothes.is",
+        "name": name,
+        "authority_provided_id": authority_provided_id,
+    }
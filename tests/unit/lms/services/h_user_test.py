@@ -0,0 +1,92 @@
+from datetime import datetime
+from unittest.mock import sentinel
+
+import pytest
+
+from lms.models import HUser
+from lms.services import HAPIError
+from lms.services.cache import TTLCache
+from lms.services.h_user import HUserService, factory, includeme
+from tests import factories
+
+
+class TestHUserService:
+    def test_get_user_returns_cached_users(self, svc, cache, h_api, query_budget):
+        cache.set("username", "Cached Name")
+
+        with query_budget(statements=0):
+            user = svc.get_user("username")
+
+        assert user == HUser(username="username", display_name="Cached Name")
+        h_api.get_user.assert_not_called()
+
+    def test_get_user_returns_users_from_grading_infos(
+        self, svc, cache, h_api, db_session, query_budget
+    ):
+        factories.GradingInfo(
+            h_username="username",
+            h_display_name="Old Name",
+            updated=datetime(2021, 1, 1),
+        )
+        factories.GradingInfo(
+            h_username="username",
+            h_display_name="Local Name",
+            updated=datetime(2021, 2, 1),
+        )
+        db_session.flush()
+
+        with query_budget(statements=1):
+            user = svc.get_user("username")
+
+        assert user == HUser(username="username", display_name="Local Name")
+        assert cache.get("username") == "Local Name"
+        h_api.get_user.assert_not_called()
+
+    def test_get_user_falls_back_on_h(self, svc, cache, h_api):
+        user = svc.get_user("username")
+
+        h_api.get_user.assert_called_once_with("username")
+        assert user == h_api.get_user.return_value
+        assert cache.get("username") == user.display_name
+
+    def test_get_user_raises_if_h_fails(self, svc, h_api):
+        h_api.get_user.side_effect = HAPIError
+
+        with pytest.raises(HAPIError):
+            svc.get_user("username")
+
+    def test_remember(self, svc, h_api):
+        svc.remember(HUser(username="username", display_name="Launch Name"))
+
+        assert svc.get_user("username") == HUser("username", "Launch Name")
+        h_api.get_user.assert_not_called()
+
+    @pytest.fixture
+    def cache(self):
+        return TTLCache(60)
+
+    @pytest.fixture
+    def svc(self, db_session, h_api, cache):
+        return HUserService(db_session, h_api, cache)
+
+
+class TestFactory:
+    def test_it(self, pyramid_request, h_api):
+        pyramid_request.registry["h_user.cache"] = sentinel.cache
+
+        svc = factory(sentinel.context, pyramid_request)
+
+        # pylint:disable=protected-access
+        assert svc._db == pyramid_request.db
+        assert svc._h_api == h_api
+        assert svc._cache == sentinel.cache
+
+
+class TestIncludeMe:
+    def test_it(self, pyramid_config):
+        includeme(pyramid_config)
+
+        cache = pyramid_config.registry["h_user.cache"]
+        assert isinstance(cache, TTLCache)
+        assert cache.ttl == HUserService.DEFAULT_TTL
+        assert cache.maxsize == HUserService.MAXSIZE
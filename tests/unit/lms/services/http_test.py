@@ -6,7 +6,125 @@ import requests
 from h_matchers import Any
 
 from lms.services.exceptions import HTTPError
-from lms.services.http import HTTPService, factory
+from lms.services.http import HTTPService, HTTPTransport, factory
+
+
+class TestHTTPTransport:
+    def test_request(self, transport, url):
+        response = transport.request("GET", url)
+
+        assert response.text == "test_response"
+        assert httpretty.last_request() == Any.object.with_attrs(
+            {"url": url, "method": "GET"}
+        )
+
+    def test_send(self, transport, url):
+        response = transport.send(requests.Request("GET", url).prepare())
+
+        assert response.text == "test_response"
+
+    def test_it_reuses_sessions_for_the_same_host(self, transport):
+        assert transport.session("https://example.com/foo") == transport.session(
+            "https://example.com/bar"
+        )
+
+    def test_it_uses_different_sessions_for_different_hosts(self, transport):
+        assert transport.session("https://example.com/") != transport.session(
+            "https://other.example.com/"
+        )
+
+    def test_it_replaces_sessions_older_than_max_age(self, transport, time):
+        session = transport.session("https://example.com/")
+        session.close = Mock()
+
+        time.monotonic.return_value = 1000
+        new_session = transport.session("https://example.com/")
+
+        assert new_session != session
+        session.close.assert_called_once_with()
+
+    def test_it_doesnt_replace_sessions_if_theres_no_max_age(self, time):
+        transport = HTTPTransport(max_age=None)
+        session = transport.session("https://example.com/")
+
+        time.monotonic.return_value = 1000
+
+        assert transport.session("https://example.com/") == session
+
+    @pytest.mark.parametrize("pool_block", [True, False])
+    def test_it_configures_the_connection_pool(self, pool_block):
+        transport = HTTPTransport(pool_maxsize=42, pool_block=pool_block)
+
+        adapter = transport.session("https://example.com/").get_adapter(
+            "https://example.com/"
+        )
+        # pylint:disable=protected-access
+        assert adapter._pool_maxsize == 42
+        assert adapter._pool_block == pool_block
+
+    def test_it_doesnt_store_cookies(self, transport, url):
+        httpretty.register_uri(
+            "GET", url, body="", adding_headers={"Set-Cookie": "foo=bar"}
+        )
+
+        transport.request("GET", url)
+
+        assert not transport.session(url).cookies
+
+    def test_it_can_disable_keep_alive(self, url):
+        HTTPTransport(keep_alive=False).request("GET", url)
+
+        assert httpretty.last_request().headers["Connection"] == "close"
+
+    def test_close(self, transport):
+        session = transport.session("https://example.com/")
+        session.close = Mock()
+
+        transport.close()
+
+        session.close.assert_called_once_with()
+        assert transport.session("https://example.com/") != session
+
+    def test_from_settings_defaults(self):
+        transport = HTTPTransport.from_settings({})
+
+        # pylint:disable=protected-access
+        assert transport._pool_maxsize == 10
+        assert not transport._pool_block
+        assert transport._keep_alive
+        assert transport._max_age == 300
+
+    def test_from_settings(self):
+        transport = HTTPTransport.from_settings(
+            {
+                "http_pool_maxsize": "20",
+                "http_pool_block": "true",
+                "http_keep_alive": "false",
+                "http_connection_max_age": "0",
+            }
+        )
+
+        # pylint:disable=protected-access
+        assert transport._pool_maxsize == 20
+        assert transport._pool_block
+        assert not transport._keep_alive
+        assert transport._max_age is None
+
+    @pytest.fixture
+    def url(self):
+        url = "https://example.com/example"
+        httpretty.register_uri("GET", url, body="test_response")
+        return url
+
+    @pytest.fixture
+    def time(self, patch):
+        time = patch("lms.services.http.time")
+        time.monotonic.return_value = 0
+        return time
+
+    @pytest.fixture
+    def transport(self):
+        return HTTPTransport()
 
 
 class TestHTTPService:
@@ -130,5 +248,14 @@ class TestHTTPService:
 
 
 class TestFactory:
-    def test_it(self, pyramid_request):
-        assert isinstance(factory(sentinel.context, pyramid_request), HTTPService)
+    def test_it(self, pyramid_request, HTTPService):
+        pyramid_request.registry["http.transport"] = sentinel.transport
+
+        svc = factory(sentinel.context, pyramid_request)
+
+        HTTPService.assert_called_once_with(sentinel.transport)
+        assert svc == HTTPService.return_value
+
+    @pytest.fixture
+    def HTTPService(self, patch):
+        return patch("lms.services.http.HTTPService")
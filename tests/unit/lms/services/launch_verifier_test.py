@@ -10,16 +10,17 @@ from oauthlib.oauth1 import SignatureOnlyEndpoint
 
 from lms.models import ApplicationInstance
 from lms.services import ConsumerKeyError, LTIOAuthError
+from lms.services.application_instance import ApplicationInstanceCache
 from lms.services.launch_verifier import LaunchVerifier
 
 ONE_HOUR_AGO = str(int(time.time() - 60 * 60))
 
 
 class TestVerifyLaunchRequest:
-    def test_it(self, verify, pyramid_request, ApplicationInstance):
+    def test_it(self, verify, pyramid_request, application_instance_cache):
         verify()
 
-        ApplicationInstance.get_by_consumer_key.assert_called_once_with(
+        application_instance_cache.get.assert_called_once_with(
             pyramid_request.db, "TEST_OAUTH_CONSUMER_KEY"
         )
 
@@ -36,9 +37,9 @@ class TestVerifyLaunchRequest:
             verify()
 
     def test_it_raises_if_the_consumer_key_is_not_in_the_db(
-        self, verify, ApplicationInstance
+        self, verify, application_instance_cache
     ):
-        ApplicationInstance.get_by_consumer_key.return_value = None
+        application_instance_cache.get.return_value = None
 
         with pytest.raises(ConsumerKeyError):
             verify()
@@ -99,7 +100,7 @@ class TestVerifyLaunchRequest:
         verify()
 
     @pytest.fixture
-    def form_values(self, ApplicationInstance):
+    def form_values(self, application_instance_cache):
         form_values = OrderedDict(
             {
                 "oauth_nonce": "11860869681061452641619619597",
@@ -110,9 +111,7 @@ class TestVerifyLaunchRequest:
             }
         )
 
-        shared_secret = (
-            ApplicationInstance.get_by_consumer_key.return_value.shared_secret
-        )
+        shared_secret = application_instance_cache.get.return_value.shared_secret
 
         def sign(form_values):
             client = oauthlib.oauth1.Client(
@@ -145,16 +144,15 @@ class TestVerifyLaunchRequest:
 
         return verify
 
-    @pytest.fixture(autouse=True)
-    def ApplicationInstance(self, patch):
-        models = patch("lms.services.launch_verifier.models")
-        models.ApplicationInstance.get_by_consumer_key.return_value = create_autospec(
+    @pytest.fixture
+    def application_instance_cache(self, application_instance_cache):
+        application_instance_cache.get.return_value = create_autospec(
             ApplicationInstance,
             instance=True,
             spec_set=True,
             shared_secret="TEST_SECRET",
         )
-        return models.ApplicationInstance
+        return application_instance_cache
 
 
 class TestVerifyLaunchRequestMocked:
@@ -200,6 +198,15 @@ class TestVerifyLaunchRequestMocked:
         return LaunchVerifier(sentinel.context, pyramid_request)
 
 
+@pytest.fixture(autouse=True)
+def application_instance_cache(pyramid_request):
+    application_instance_cache = create_autospec(
+        ApplicationInstanceCache, instance=True, spec_set=True
+    )
+    pyramid_request.registry["application_instance.cache"] = application_instance_cache
+    return application_instance_cache
+
+
 @pytest.fixture
 def pyramid_request(pyramid_request):
     pyramid_request.method = "POST"
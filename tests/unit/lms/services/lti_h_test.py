@@ -1,98 +1,304 @@
-from unittest.mock import create_autospec, sentinel
+from unittest import mock
 
 import pytest
-from h_api.bulk_api import CommandBuilder
 from pyramid.httpexceptions import HTTPInternalServerError
 
-from lms.models import Grouping
 from lms.services import ConsumerKeyError, HAPIError
-from lms.services.lti_h import LTIHService
+from lms.services.lti_h import HSyncFingerprints, LTIHService, includeme
 from tests import factories
 
 pytestmark = pytest.mark.usefixtures(
-    "application_instance_service", "h_api", "group_info_service"
+    "application_instance_service",
+    "h_api",
+    "group_info_service",
+    "h_sync_queue",
+    "h_user_service",
 )
 
 
 class TestSync:
     def test_sync_does_nothing_if_provisioning_is_disabled(
-        self, application_instance_service, lti_h_svc, h_api, grouping
+        self,
+        params,
+        application_instance_service,
+        lti_h_svc,
+        h_api,
+        h_user_service,
+        grouping,
     ):
         application_instance_service.get.return_value.provisioning = False
 
-        lti_h_svc.sync([grouping], sentinel.params)
+        lti_h_svc.sync([grouping], params)
 
-        h_api.execute_bulk.assert_not_called()
+        h_api.sync.assert_not_called()
+        h_user_service.remember.assert_not_called()
+
+    def test_sync_remembers_the_users_display_name(
+        self, params, lti_h_svc, h_user_service, h_user, grouping
+    ):
+        lti_h_svc.sync([grouping], params)
+
+        h_user_service.remember.assert_called_once_with(h_user)
 
     def test_sync_catches_HAPIErrors(
-        self, h_api, lti_h_svc, grouping, group_info_service
+        self, params, h_api, lti_h_svc, grouping, group_info_service
     ):
-        h_api.execute_bulk.side_effect = HAPIError
+        h_api.sync.side_effect = HAPIError
 
         with pytest.raises(HTTPInternalServerError):
-            lti_h_svc.sync([grouping], sentinel.params)
+            lti_h_svc.sync([grouping], params)
 
         group_info_service.assert_not_called()
 
-    def test_sync_calls_bulk_action_correctly(self, h_api, h_user, lti_h_svc):
+    def test_sync_syncs_the_user_and_groups_to_h(
+        self, params, h_api, h_user, lti_h_svc
+    ):
         groups = factories.Grouping.create_batch(2)
 
-        lti_h_svc.sync(groups, sentinel.params)
-
-        _, kwargs = h_api.execute_bulk.call_args
-
-        assert "commands" in kwargs
+        lti_h_svc.sync(groups, params)
 
         # pylint: disable=protected-access
-        assert [command.raw for command in kwargs["commands"]] == [
-            CommandBuilder.user.upsert(
-                {
-                    "authority": lti_h_svc._authority,
-                    "username": h_user.username,
-                    "display_name": h_user.display_name,
-                    "identities": [
-                        {
-                            "provider": h_user.provider,
-                            "provider_unique_id": h_user.provider_unique_id,
-                        }
-                    ],
-                },
-                "user_0",
-            ).raw
-        ] + [
-            CommandBuilder.group.upsert(
+        h_api.sync.assert_called_once_with(
+            {
+                "authority": lti_h_svc._authority,
+                "username": h_user.username,
+                "display_name": h_user.display_name,
+                "identities": [
+                    {
+                        "provider": h_user.provider,
+                        "provider_unique_id": h_user.provider_unique_id,
+                    }
+                ],
+            },
+            [
                 {
                     "authority": lti_h_svc._authority,
                     "name": group.name,
                     "authority_provided_id": group.authority_provided_id,
-                },
-                f"group_{i}",
-            ).raw
-            for i, group in enumerate(groups)
-        ] + [
-            CommandBuilder.group_membership.create("user_0", "group_0").raw,
-            CommandBuilder.group_membership.create("user_0", "group_1").raw,
-        ]
+                }
+                for group in groups
+            ],
+        )
 
     def test_sync_raises_if_theres_no_ApplicationInstance(
-        self, application_instance_service, grouping, lti_h_svc
+        self, params, application_instance_service, grouping, lti_h_svc
     ):
         application_instance_service.get.side_effect = ConsumerKeyError
 
         with pytest.raises(ConsumerKeyError):
-            lti_h_svc.sync([grouping], sentinel.params)
+            lti_h_svc.sync([grouping], params)
+
+
+@pytest.mark.usefixtures("user_is_learner")
+class TestSyncFingerprints:
+    def test_it_skips_syncing_the_same_data_again(
+        self, h_api, group_info_service, lti_h_svc, grouping, params, newrelic, tm
+    ):
+        lti_h_svc.sync([grouping], params)
+        tm.commit()
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/HSync/Synced", 1
+        )
+        h_api.reset_mock()
+        group_info_service.reset_mock()
+
+        lti_h_svc.sync([grouping], dict(params, oauth_nonce="another_nonce"))
+
+        h_api.sync.assert_not_called()
+        group_info_service.upsert_many.assert_not_called()
+        newrelic.agent.record_custom_metric.assert_called_with(
+            "Custom/HSync/Skipped", 1
+        )
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda request, grouping, params: setattr(
+                request,
+                "lti_user",
+                request.lti_user._replace(display_name="New Name"),
+            ),
+            lambda request, grouping, params: setattr(grouping, "lms_name", "New Name"),
+            lambda request, grouping, params: params.update(context_title="New Title"),
+            lambda request, grouping, params: setattr(
+                request, "lti_user", request.lti_user._replace(roles="Instructor")
+            ),
+        ],
+    )
+    def test_it_syncs_changed_data(
+        self, h_api, lti_h_svc, grouping, params, pyramid_request, change, tm
+    ):
+        lti_h_svc.sync([grouping], params)
+        tm.commit()
+
+        change(pyramid_request, grouping, params)
+        LTIHService(None, pyramid_request).sync([grouping], params)
+
+        assert h_api.sync.call_count == 2
+
+    def test_it_syncs_other_groups(self, h_api, lti_h_svc, grouping, params, tm):
+        lti_h_svc.sync([grouping], params)
+        tm.commit()
+
+        lti_h_svc.sync([grouping, factories.Course()], params)
+
+        assert h_api.sync.call_count == 2
+
+    def test_it_syncs_again_once_the_fingerprint_has_expired(
+        self, h_api, lti_h_svc, grouping, params, pyramid_request, tm
+    ):
+        pyramid_request.registry["lti_h.fingerprints"] = HSyncFingerprints(ttl=0)
+        lti_h_svc = LTIHService(None, pyramid_request)
+
+        lti_h_svc.sync([grouping], params)
+        tm.commit()
+        lti_h_svc.sync([grouping], params)
+
+        assert h_api.sync.call_count == 2
+
+    def test_it_doesnt_record_syncs_until_the_transaction_commits(
+        self, h_api, lti_h_svc, grouping, params
+    ):
+        lti_h_svc.sync([grouping], params)
+        lti_h_svc.sync([grouping], params)
+
+        assert h_api.sync.call_count == 2
+
+    def test_it_doesnt_record_syncs_if_the_transaction_is_rolled_back(
+        self, h_api, lti_h_svc, grouping, params, tm
+    ):
+        lti_h_svc.sync([grouping], params)
+        tm.abort()
+        tm.begin()
+        lti_h_svc.sync([grouping], params)
+
+        assert h_api.sync.call_count == 2
+
+    def test_it_doesnt_record_syncs_if_the_commit_fails(
+        self, h_api, lti_h_svc, grouping, params, tm
+    ):
+        lti_h_svc.sync([grouping], params)
+        # A data manager (like the DB session's) that fails to commit.
+        tm.get().join(
+            mock.Mock(**{"sortKey.return_value": "", "commit.side_effect": ValueError})
+        )
+        with pytest.raises(ValueError):
+            tm.commit()
+        tm.begin()
+        lti_h_svc.sync([grouping], params)
+
+        assert h_api.sync.call_count == 2
+
+    def test_it_doesnt_record_failed_syncs(self, h_api, lti_h_svc, grouping, params):
+        h_api.sync.side_effect = HAPIError
+
+        for _ in range(2):
+            with pytest.raises(HTTPInternalServerError):
+                lti_h_svc.sync([grouping], params)
+
+        assert h_api.sync.call_count == 2
+
+
+@pytest.mark.usefixtures("deferred")
+class TestDeferredSync:
+    def test_it_queues_the_sync_if_the_user_is_already_in_the_groups(
+        self, h_api, h_sync_queue, lti_h_svc, grouping, params, h_user, newrelic
+    ):
+        h_sync_queue.can_defer.return_value = True
+
+        lti_h_svc.sync([grouping], params)
+
+        h_sync_queue.can_defer.assert_called_once_with(
+            h_user.username, [grouping.authority_provided_id]
+        )
+        h_api.sync.assert_not_called()
+        h_sync_queue.enqueue.assert_called_once_with(
+            {
+                "authority": "TEST_AUTHORITY",
+                "username": h_user.username,
+                "display_name": h_user.display_name,
+                "identities": [
+                    {
+                        "provider": h_user.provider,
+                        "provider_unique_id": h_user.provider_unique_id,
+                    }
+                ],
+            },
+            [
+                {
+                    "authority": "TEST_AUTHORITY",
+                    "name": grouping.name,
+                    "authority_provided_id": grouping.authority_provided_id,
+                }
+            ],
+        )
+        newrelic.agent.record_custom_metric.assert_any_call("Custom/HSync/Deferred", 1)
+
+    def test_it_syncs_immediately_if_the_user_isnt_in_the_groups(
+        self, h_api, h_sync_queue, lti_h_svc, grouping, params, h_user
+    ):
+        h_sync_queue.can_defer.return_value = False
+
+        lti_h_svc.sync([grouping], params)
+
+        h_api.sync.assert_called_once()
+        h_sync_queue.enqueue.assert_not_called()
+        h_sync_queue.synced.assert_called_once_with(
+            h_user.username, [grouping.authority_provided_id]
+        )
+
+    def test_it_doesnt_record_failed_syncs(
+        self, h_api, h_sync_queue, lti_h_svc, grouping, params
+    ):
+        h_sync_queue.can_defer.return_value = False
+        h_api.sync.side_effect = HAPIError
+
+        with pytest.raises(HTTPInternalServerError):
+            lti_h_svc.sync([grouping], params)
+
+        h_sync_queue.synced.assert_not_called()
+
+    @pytest.fixture
+    def deferred(self, pyramid_request):
+        pyramid_request.registry.settings["h_sync_deferred"] = True
+
+
+class TestHSyncFingerprints:
+    @pytest.mark.parametrize(
+        "settings,ttl",
+        [({}, HSyncFingerprints.DEFAULT_TTL), ({"h_sync_fingerprint_ttl": "30"}, 30)],
+    )
+    def test_from_settings(self, settings, ttl):
+        fingerprints = HSyncFingerprints.from_settings(settings)
+
+        # pylint:disable=protected-access
+        assert fingerprints._cache.ttl == ttl
+
+    def test_fingerprint_doesnt_depend_on_key_order(self):
+        assert HSyncFingerprints.fingerprint(
+            {"a": 1, "b": 2}
+        ) == HSyncFingerprints.fingerprint({"b": 2, "a": 1})
+
+
+class TestIncludeMe:
+    def test_it(self, pyramid_config):
+        includeme(pyramid_config)
+
+        assert isinstance(
+            pyramid_config.registry["lti_h.fingerprints"], HSyncFingerprints
+        )
 
 
 class TestGroupInfoUpdating:
     def test_sync_upserts_the_GroupInfo_into_the_db(
-        self, group_info_service, lti_h_svc, pyramid_request, grouping
+        self, params, group_info_service, lti_h_svc, pyramid_request, grouping
     ):
-        lti_h_svc.sync([grouping], sentinel.params)
+        lti_h_svc.sync([grouping], params)
 
-        group_info_service.upsert.assert_called_once_with(
-            h_group=grouping,
+        group_info_service.upsert_many.assert_called_once_with(
+            h_groups=[grouping],
             consumer_key=pyramid_request.lti_user.oauth_consumer_key,
-            params=sentinel.params,
+            params=params,
         )
 
     @pytest.fixture
@@ -100,6 +306,30 @@ class TestGroupInfoUpdating:
         return pyramid_request
 
 
+@pytest.fixture(autouse=True)
+def fingerprints(pyramid_request):
+    fingerprints = pyramid_request.registry["lti_h.fingerprints"] = HSyncFingerprints()
+    return fingerprints
+
+
+@pytest.fixture(autouse=True)
+def tm(pyramid_request):
+    # Each test runs in a transaction, like a request does under pyramid_tm.
+    pyramid_request.tm.begin()
+    yield pyramid_request.tm
+    pyramid_request.tm.abort()
+
+
+@pytest.fixture(autouse=True)
+def newrelic(patch):
+    return patch("lms.services.lti_h.newrelic")
+
+
+@pytest.fixture
+def params():
+    return {"context_title": "Course Title", "oauth_nonce": "nonce"}
+
+
 @pytest.fixture
 def lti_h_svc(pyramid_request):
     return LTIHService(None, pyramid_request)
@@ -112,4 +342,4 @@ def h_user(pyramid_request):
 
 @pytest.fixture
 def grouping():
-    return create_autospec(Grouping, instance=True, spec_set=True)
+    return factories.Course()
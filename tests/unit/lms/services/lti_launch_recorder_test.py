@@ -0,0 +1,253 @@
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from h_matchers import Any
+from pyramid.events import NewRequest
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from lms.models import LtiLaunches, LtiLaunchRollup
+from lms.services.lti_launch_recorder import LTILaunchRecorder, includeme
+
+
+class TestLTILaunchRecorder:
+    def test_it_records_launches_in_watched_sessions(self, recorder, db, db_session):
+        recorder.watch(db)
+
+        LtiLaunches.add(db, "context_id", "consumer_key")
+        db.commit()
+        recorder.flush()
+
+        assert db_session.query(LtiLaunches).all() == [
+            Any.instance_of(LtiLaunches).with_attrs(
+                {
+                    "context_id": "context_id",
+                    "lti_key": "consumer_key",
+                    "created": Any.instance_of(datetime),
+                }
+            )
+        ]
+
+    def test_it_counts_the_launches(self, recorder, db, db_session):
+        recorder.record(db, "context_id", "consumer_key")
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+
+        recorder.flush()
+
+        assert db_session.query(LtiLaunchRollup).one().launches == 2
+
+    def test_it_doesnt_buffer_launches_until_the_session_commits(
+        self, recorder, db, engine
+    ):
+        recorder.record(db, "context_id", "consumer_key")
+
+        recorder.flush()
+
+        engine.begin.assert_not_called()
+
+    def test_it_doesnt_record_launches_that_are_rolled_back(self, recorder, db, engine):
+        db.begin()
+        recorder.record(db, "context_id", "consumer_key")
+        db.rollback()
+        db.commit()
+
+        recorder.flush()
+
+        engine.begin.assert_not_called()
+
+    def test_it_only_buffers_each_launch_once(self, recorder, db, db_session):
+        recorder.record(db, "context_id", "consumer_key")
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+        db.commit()
+
+        recorder.flush()
+
+        assert db_session.query(LtiLaunches).count() == 2
+
+    def test_it_flushes_when_the_buffer_is_full(self, recorder, db, db_session):
+        for _ in range(3):
+            recorder.record(db, "context_id", "consumer_key")
+            db.commit()
+
+        assert db_session.query(LtiLaunches).count() == 3
+
+    def test_it_flushes_when_the_oldest_launch_is_too_old(
+        self, recorder, db, db_session, timer
+    ):
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+        assert not db_session.query(LtiLaunches).count()
+
+        timer.return_value = 60
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+
+        assert db_session.query(LtiLaunches).count() == 2
+
+    def test_it_starts_a_timer_to_flush_old_launches(self, recorder, db, Timer):
+        for _ in range(2):
+            recorder.record(db, "context_id", "consumer_key")
+            db.commit()
+
+        Timer.assert_called_once_with(10, recorder.flush)
+        assert Timer.return_value.daemon
+        Timer.return_value.start.assert_called_once_with()
+
+    def test_flushing_cancels_the_timer(self, recorder, db, Timer):
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+
+        recorder.flush()
+
+        Timer.return_value.cancel.assert_called_once_with()
+
+    def test_it_restarts_the_timer_if_writing_the_launches_fails(
+        self, recorder, db, engine, Timer
+    ):
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+        engine.begin.side_effect = OperationalError("statement", {}, "orig")
+
+        recorder.flush()
+
+        assert Timer.call_count == 2
+        assert Timer.return_value.start.call_count == 2
+
+    def test_it_keeps_launches_buffered_while_writing_failed(
+        self, recorder, db, db_session, engine, Timer
+    ):
+        recorder.record(db, "first", "consumer_key")
+        db.commit()
+
+        def begin():
+            recorder.extend(
+                [
+                    {
+                        "created": datetime.utcnow(),
+                        "context_id": "second",
+                        "lti_key": "consumer_key",
+                    }
+                ]
+            )
+            raise OperationalError("statement", {}, "orig")
+
+        engine.begin.side_effect = begin
+        recorder.flush()
+        engine.begin.side_effect = None
+        recorder.flush()
+
+        assert Timer.call_count == 2
+        assert [
+            launch.context_id
+            for launch in db_session.query(LtiLaunches).order_by(LtiLaunches.id)
+        ] == ["first", "second"]
+
+    def test_it_records_metrics(self, recorder, db, newrelic, timer):
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+        timer.side_effect = [1, 3]
+
+        recorder.flush()
+
+        newrelic.agent.record_custom_metric.assert_has_calls(
+            [
+                mock.call("Custom/LtiLaunches/Flushed", 1),
+                mock.call("Custom/LtiLaunches/FlushTime", 2),
+            ]
+        )
+
+    def test_it_keeps_the_launches_if_writing_them_fails(
+        self, recorder, db, db_session, engine, newrelic, caplog
+    ):
+        recorder.record(db, "context_id", "consumer_key")
+        db.commit()
+        engine.begin.side_effect = OperationalError("statement", {}, "orig")
+
+        recorder.flush()
+
+        assert caplog.messages == ["Writing 1 LTI launches failed"]
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/LtiLaunches/FlushFailed", 1
+        )
+        engine.begin.side_effect = None
+        recorder.flush()
+        assert db_session.query(LtiLaunches).count() == 1
+
+    def test_it_drops_the_oldest_launches_when_the_buffer_overflows(
+        self, engine, db, db_session, newrelic, caplog
+    ):
+        recorder = LTILaunchRecorder(engine, max_size=100, max_buffer=2)
+
+        for context_id in ["first", "second", "third"]:
+            recorder.record(db, context_id, "consumer_key")
+            db.commit()
+        recorder.flush()
+
+        assert caplog.messages == ["Dropped 1 buffered LTI launches"]
+        newrelic.agent.record_custom_metric.assert_any_call(
+            "Custom/LtiLaunches/Dropped", 1
+        )
+        assert sorted(
+            launch.context_id for launch in db_session.query(LtiLaunches)
+        ) == ["second", "third"]
+
+    def test_flush_does_nothing_if_there_are_no_launches(self, recorder, engine):
+        recorder.flush()
+
+        engine.begin.assert_not_called()
+
+    @pytest.fixture
+    def timer(self):
+        return mock.Mock(return_value=0)
+
+    @pytest.fixture
+    def engine(self, db_session):
+        engine = mock.create_autospec(Engine, instance=True, spec_set=True)
+        engine.begin.return_value.__enter__.return_value = db_session.connection()
+        return engine
+
+    @pytest.fixture
+    def recorder(self, engine, timer):
+        return LTILaunchRecorder(engine, max_size=3, max_age=10, timer=timer)
+
+    @pytest.fixture
+    def db(self):
+        """Return a session for recording launches in."""
+        return Session()
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("lms.services.lti_launch_recorder.newrelic")
+
+    @pytest.fixture(autouse=True)
+    def Timer(self, patch):
+        return patch("lms.services.lti_launch_recorder.Timer")
+
+
+class TestIncludeMe:
+    def test_it(self, pyramid_config, atexit):
+        includeme(pyramid_config)
+
+        recorder = pyramid_config.registry["lti_launches.recorder"]
+        assert isinstance(recorder, LTILaunchRecorder)
+        atexit.register.assert_called_once_with(recorder.flush)
+
+    def test_it_watches_the_db_session_of_each_request(
+        self, pyramid_config, pyramid_request
+    ):
+        includeme(pyramid_config)
+
+        pyramid_config.registry.notify(NewRequest(pyramid_request))
+
+        assert (
+            pyramid_request.db.info["lti_launches.recorder"]
+            == pyramid_config.registry["lti_launches.recorder"]
+        )
+
+    @pytest.fixture(autouse=True)
+    def atexit(self, patch):
+        return patch("lms.services.lti_launch_recorder.atexit")
@@ -6,7 +6,7 @@ import xmltodict
 from h_matchers import Any
 
 from lms.services.exceptions import HTTPError, LTIOutcomesAPIError
-from lms.services.lti_outcomes import LTIOutcomesClient
+from lms.services.lti_outcomes import LMSConcurrencyLimits, LTIOutcomesClient
 from tests import factories
 
 pytestmark = pytest.mark.usefixtures("oauth1_service", "http_service")
@@ -53,6 +53,51 @@ class TestLTIOutcomesClient:
 
         assert score is None
 
+    def test_read_results(self, svc, http_service, oauth1_service, limits):
+        def post(data, **_kwargs):
+            sourced_id = xmltodict.parse(data)["imsx_POXEnvelopeRequest"][
+                "imsx_POXBody"
+            ]["readResultRequest"]["resultRecord"]["sourcedGUID"]["sourcedId"]
+            if sourced_id == "failing_id":
+                raise HTTPError()
+            return factories.requests.Response(
+                raw=self.make_response(
+                    score=len(sourced_id) / 10,
+                    include_score=True,
+                    include_status=True,
+                    status_code="success",
+                    include_description=False,
+                ),
+                content_type="application/xml",
+            )
+
+        http_service.post.side_effect = post
+
+        results = svc.read_results(["id_1", "failing_id", "id_22", "id_1"])
+
+        assert results == {
+            "id_1": 0.4,
+            "failing_id": Any.instance_of(LTIOutcomesAPIError),
+            "id_22": 0.5,
+        }
+        # The requests are all signed with the same client.
+        oauth1_service.get_client.assert_called_once_with()
+        assert http_service.post.call_count == 3
+        # Each request takes one of the LMS's slots.
+        assert limits.slot.call_count == 3
+        limits.slot.assert_called_with(self.SERVICE_URL)
+
+    def test_read_results_with_no_ids(self, svc, http_service):
+        assert svc.read_results([]) == {}
+
+        http_service.post.assert_not_called()
+
+    def test_read_results_raises_unexpected_errors(self, svc, http_service):
+        http_service.post.side_effect = OSError()
+
+        with pytest.raises(OSError):
+            svc.read_results([self.GRADING_ID])
+
     @pytest.mark.usefixtures("response")
     def test_record_result_sends_sourcedid(self, svc, http_service):
         svc.record_result(self.GRADING_ID)
@@ -274,6 +319,31 @@ class TestLTIOutcomesClient:
 
         return pyramid_request
 
+    @pytest.fixture(autouse=True)
+    def limits(self, pyramid_request):
+        limits = Mock(wraps=LMSConcurrencyLimits(2))
+        pyramid_request.registry["lti_outcomes.limits"] = limits
+        return limits
+
     @pytest.fixture
     def svc(self, pyramid_request):
         return LTIOutcomesClient({}, pyramid_request)
+
+
+class TestLMSConcurrencyLimits:
+    def test_slot_is_shared_by_urls_on_the_same_host(self):
+        limits = LMSConcurrencyLimits(2)
+
+        assert limits.slot("https://lms.example.com/a") is limits.slot(
+            "https://lms.example.com/b"
+        )
+        assert limits.slot("https://lms.example.com/a") is not limits.slot(
+            "https://other.example.com/a"
+        )
+
+    def test_slot_limits_the_concurrent_requests(self):
+        slot = LMSConcurrencyLimits(2).slot("https://lms.example.com")
+
+        assert slot.acquire(blocking=False)
+        assert slot.acquire(blocking=False)
+        assert not slot.acquire(blocking=False)
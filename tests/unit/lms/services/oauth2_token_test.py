@@ -1,11 +1,13 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
+import sqlalchemy as sa
 from h_matchers import Any
 from pytest import param
 
-from lms.models import OAuth2Token
+from lms.db import SESSION
+from lms.models import ApplicationInstance, OAuth2Token
 from lms.services import OAuth2TokenError
 from lms.services.oauth2_token import OAuth2TokenService, oauth2_token_service_factory
 from tests import factories
@@ -31,11 +33,29 @@ class TestOAuth2TokenService:
             }
         )
 
+    def test_save_adds_a_new_token(self, db_session, application_instance):
+        svc = OAuth2TokenService(
+            db_session, application_instance.consumer_key, "new_user_id"
+        )
+
+        svc.save(
+            access_token="access_token", refresh_token="refresh_token", expires_in=1234
+        )
+
+        assert db_session.query(OAuth2Token).filter_by(user_id="new_user_id").one()
+
     def test_get_returns_token_when_present(self, svc, oauth_token):
         result = svc.get()
 
         assert result == oauth_token
 
+    def test_get_only_queries_once(self, svc, oauth_token, db_session, query_budget):
+        db_session.flush()
+        svc.get()
+
+        with query_budget(statements=0):
+            assert svc.get() == oauth_token
+
     @pytest.mark.parametrize("wrong_param", ("consumer_key", "user_id"))
     def test_get_raises_OAuth2TokenError_with_no_token(
         self, db_session, wrong_param, application_instance, lti_user
@@ -52,6 +72,141 @@ class TestOAuth2TokenService:
         with pytest.raises(OAuth2TokenError):
             store.get()
 
+    @pytest.mark.parametrize(
+        "received_at,expires_in,refresh_token,should_refresh",
+        (
+            # Expires in 10 minutes.
+            (datetime.utcnow(), 600, "refresh_token", False),
+            # Expires in 4 minutes.
+            (datetime.utcnow() - timedelta(minutes=6), 600, "refresh_token", True),
+            # Has already expired.
+            (datetime.utcnow() - timedelta(hours=1), 600, "refresh_token", True),
+            # We don't know when it expires.
+            (datetime.utcnow() - timedelta(hours=1), None, "refresh_token", False),
+            # We can't refresh it.
+            (datetime.utcnow() - timedelta(hours=1), 600, None, False),
+        ),
+    )
+    def test_get_fresh(
+        self,
+        svc,
+        oauth_token,
+        refresh,
+        received_at,
+        expires_in,
+        refresh_token,
+        should_refresh,
+    ):
+        oauth_token.received_at = received_at
+        oauth_token.expires_in = expires_in
+        oauth_token.refresh_token = refresh_token
+
+        result = svc.get_fresh(refresh)
+
+        assert result == oauth_token
+        if should_refresh:
+            refresh.assert_called_once_with(refresh_token)
+        else:
+            refresh.assert_not_called()
+
+    def test_refresh(self, svc, oauth_token, refresh, newrelic, db_session):
+        db_session.flush()
+
+        access_token = svc.refresh(refresh, oauth_token.access_token)
+
+        refresh.assert_called_once_with(oauth_token.refresh_token)
+        assert access_token == refresh.return_value
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/OAuth2Token/Refresh", 1
+        )
+
+    def test_refresh_reuses_a_token_that_another_request_refreshed(
+        self, svc, oauth_token, refresh, newrelic, db_session
+    ):
+        db_session.flush()
+
+        access_token = svc.refresh(refresh, "stale_access_token")
+
+        refresh.assert_not_called()
+        assert access_token == oauth_token.access_token
+        newrelic.agent.record_custom_metric.assert_called_once_with(
+            "Custom/OAuth2Token/RefreshReused", 1
+        )
+
+    def test_refresh_raises_if_theres_no_token(self, request_db, refresh):
+        svc = OAuth2TokenService(request_db, "consumer_key", "user_id")
+
+        with pytest.raises(OAuth2TokenError):
+            svc.refresh(refresh, "stale_access_token")
+
+        refresh.assert_not_called()
+
+    def test_refresh_commits_the_new_token_without_the_request(
+        self, db_engine, request_db, committed_token
+    ):
+        svc = OAuth2TokenService(
+            request_db, committed_token.consumer_key, committed_token.user_id
+        )
+
+        def refresh(_refresh_token):
+            svc.save("new_access_token", "new_refresh_token", 3600)
+            return "new_access_token"
+
+        access_token = svc.refresh(refresh, svc.get().access_token)
+
+        # The request's transaction is still open but other requests can
+        # see the new token, and aren't kept waiting for the lock.
+        assert access_token == svc.get().access_token == "new_access_token"
+        with db_engine.connect() as connection:
+            assert (
+                connection.execute(
+                    sa.select(OAuth2Token.access_token).where(
+                        OAuth2Token.id == committed_token.id
+                    )
+                ).scalar()
+                == "new_access_token"
+            )
+            assert not connection.execute(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory'"
+            ).scalar()
+
+    @pytest.fixture
+    def request_db(self, db_engine):
+        """Return a DB session that isn't in the tests' rolled back transaction."""
+        request_db = SESSION(bind=db_engine)
+        yield request_db
+        request_db.close()
+
+    @pytest.fixture
+    def committed_token(self, db_engine):
+        """Return an OAuth2Token that's committed to the DB (unlike the others)."""
+        db = SESSION(bind=db_engine, expire_on_commit=False)
+        oauth2_token = factories.OAuth2Token.build(
+            application_instance=factories.ApplicationInstance.build()
+        )
+        db.add(oauth2_token)
+        db.commit()
+        db.expunge_all()
+
+        yield oauth2_token
+
+        db.execute(sa.delete(OAuth2Token).where(OAuth2Token.id == oauth2_token.id))
+        db.execute(
+            sa.delete(ApplicationInstance).where(
+                ApplicationInstance.consumer_key == oauth2_token.consumer_key
+            )
+        )
+        db.commit()
+        db.close()
+
+    @pytest.fixture
+    def refresh(self):
+        return mock.create_autospec(lambda refresh_token: None)
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("lms.services.oauth2_token.newrelic")
+
     @pytest.fixture(
         params=(param(True, id="token in db"), param(False, id="token not in db"))
     )
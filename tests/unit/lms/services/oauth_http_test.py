@@ -1,6 +1,7 @@
 from unittest.mock import sentinel
 
 import pytest
+from h_matchers import Any
 
 from lms.services.exceptions import HTTPError, OAuth2TokenError
 from lms.services.oauth_http import OAuthHTTPService, factory
@@ -142,6 +143,38 @@ class TestOAuthHTTPService:
             validated_data["expires_in"],
         )
 
+    def test_refresh_access_token_only_refreshes_once_at_a_time(
+        self, svc, oauth2_token_service, http_service
+    ):
+        oauth2_token_service.refresh.side_effect = None
+
+        access_token = svc.refresh_access_token(
+            sentinel.token_url, sentinel.redirect_uri, sentinel.auth
+        )
+
+        oauth2_token_service.refresh.assert_called_once_with(
+            Any.function(), oauth2_token_service.get.return_value.access_token
+        )
+        assert access_token == oauth2_token_service.refresh.return_value
+        http_service.post.assert_not_called()
+
+    def test_refresh_access_token_if_expiring(
+        self, svc, oauth2_token_service, http_service
+    ):
+        oauth2_token_service.get_fresh.side_effect = lambda refresh: refresh(
+            sentinel.refresh_token
+        )
+
+        svc.refresh_access_token_if_expiring(
+            sentinel.token_url, sentinel.redirect_uri, sentinel.auth
+        )
+
+        http_service.post.assert_called_once_with(
+            sentinel.token_url,
+            data=Any.dict.containing({"refresh_token": sentinel.refresh_token}),
+            auth=sentinel.auth,
+        )
+
     def test_refresh_access_token_if_theres_no_refresh_token_or_expires_in(
         self, svc, oauth_token_response_schema, oauth2_token_service
     ):
@@ -1,9 +1,15 @@
+import logging
 from unittest import mock
 
 import pytest
 from pyramid.tweens import EXCVIEW
 
-from lms.tweens import includeme, rollback_db_session_tween_factory
+from lms.db import QueryStats
+from lms.tweens import (
+    includeme,
+    query_stats_tween_factory,
+    rollback_db_session_tween_factory,
+)
 
 
 class TestDBRollbackSessionOnExceptionTween:
@@ -36,12 +42,92 @@ class TestDBRollbackSessionOnExceptionTween:
         return pyramid_request
 
 
+class TestQueryStatsTween:
+    def test_it_logs_the_query_stats(self, tween, pyramid_request, stats, caplog):
+        caplog.set_level(logging.DEBUG)
+
+        response = tween(pyramid_request)
+
+        assert response == pyramid_request.response
+        assert caplog.messages == [f"GET /path: {stats}"]
+
+    def test_it_warns_about_repeated_statements(
+        self, tween, pyramid_request, stats, caplog
+    ):
+        for _ in range(5):
+            stats.add("SELECT 1", 0)
+
+        tween(pyramid_request)
+
+        assert caplog.messages == [
+            "GET /path executed the same statement 5 times: SELECT 1"
+        ]
+
+    def test_it_logs_the_query_stats_if_the_handler_raises(
+        self, handler, tween, pyramid_request, caplog
+    ):
+        caplog.set_level(logging.DEBUG)
+        handler.side_effect = IOError
+
+        with pytest.raises(IOError):
+            tween(pyramid_request)
+
+        assert len(caplog.messages) == 1
+
+    def test_it_doesnt_add_a_header_outside_dev(self, tween, pyramid_request):
+        response = tween(pyramid_request)
+
+        assert "X-DB-Query-Stats" not in response.headers
+
+    def test_it_adds_a_header_in_dev(self, handler, pyramid_request, stats):
+        pyramid_request.registry.settings["dev"] = True
+        tween = query_stats_tween_factory(handler, pyramid_request.registry)
+
+        response = tween(pyramid_request)
+
+        assert response.headers["X-DB-Query-Stats"] == str(stats)
+
+    @pytest.fixture
+    def stats(self):
+        return QueryStats()
+
+    @pytest.fixture(autouse=True)
+    def collect_query_stats(self, patch, stats):
+        collect_query_stats = patch("lms.tweens.collect_query_stats")
+        collect_query_stats.return_value.__enter__.return_value = stats
+        return collect_query_stats
+
+    @pytest.fixture
+    def handler(self, pyramid_request):
+        return mock.create_autospec(
+            lambda request: None,  # pragma: nocover
+            return_value=pyramid_request.response,
+        )
+
+    @pytest.fixture
+    def tween(self, handler, pyramid_request):
+        return query_stats_tween_factory(handler, pyramid_request.registry)
+
+    @pytest.fixture
+    def pyramid_request(self, pyramid_request):
+        pyramid_request.path = "/path"
+        return pyramid_request
+
+
 class TestIncludeMe:
-    def test_it_adds_rollback_db_session_tween(self, config):
+    def test_it_adds_the_tweens(self, config):
         includeme(config)
 
-        config.add_tween.assert_called_with(
-            "lms.tweens.rollback_db_session_tween_factory", under=EXCVIEW
+        config.add_tween.assert_has_calls(
+            [
+                mock.call(
+                    "lms.tweens.rollback_db_session_tween_factory", under=EXCVIEW
+                ),
+                mock.call(
+                    "lms.tweens.query_stats_tween_factory",
+                    over="pyramid_tm.tm_tween_factory",
+                ),
+            ]
         )
 
     @pytest.fixture
@@ -5,6 +5,7 @@ import pytest
 from lms.validation import ValidationError
 from lms.validation._api import (
     APIReadResultSchema,
+    APIReadResultsSchema,
     APIRecordResultSchema,
     APIRecordSpeedgraderSchema,
 )
@@ -104,6 +105,49 @@ class TestAPIReadResultSchema:
         }
 
 
+class TestAPIReadResultsSchema:
+    def test_it_parses_request(self, json_request, all_fields):
+        request = json_request(all_fields)
+
+        parsed_params = APIReadResultsSchema(request).parse()
+
+        assert parsed_params == all_fields
+
+    @pytest.mark.parametrize(
+        "field", ["lis_outcome_service_url", "lis_result_sourcedids"]
+    )
+    def test_it_raises_if_required_fields_missing(
+        self, json_request, all_fields, field
+    ):
+        request = json_request(all_fields, exclude=[field])
+
+        schema = APIReadResultsSchema(request)
+
+        with pytest.raises(ValidationError):
+            schema.parse()
+
+    @pytest.mark.parametrize("bad_sourcedids", [[], ["id"] * 51, "id", [1], [None]])
+    def test_it_raises_if_sourcedids_invalid(
+        self, json_request, all_fields, bad_sourcedids
+    ):
+        request = json_request(dict(all_fields, lis_result_sourcedids=bad_sourcedids))
+
+        schema = APIReadResultsSchema(request)
+
+        with pytest.raises(ValidationError):
+            schema.parse()
+
+    @pytest.fixture
+    def all_fields(self):
+        return {
+            "lis_outcome_service_url": "https://hypothesis.shinylms.com/outcomes",
+            "lis_result_sourcedids": [
+                "modelstudent-assignment1",
+                "otherstudent-assignment1",
+            ],
+        }
+
+
 class TestAPIRecordResultSchema:
     def test_it_parses_request(self, json_request, all_fields):
         request = json_request(all_fields)
@@ -1,11 +1,14 @@
 import json
+from unittest.mock import Mock
 
+import marshmallow
 import pytest
 from marshmallow import fields
 from pyramid.httpexceptions import HTTPUnsupportedMediaType
 from pyramid.testing import DummyRequest
 
-from lms.validation._base import JSONPyramidRequestSchema
+from lms.validation import ValidationError, _base
+from lms.validation._base import JSONPyramidRequestSchema, RequestsResponseSchema
 
 
 class TestJSONPyramidRequestSchema:
@@ -30,3 +33,60 @@ class TestJSONPyramidRequestSchema:
 
         with pytest.raises(HTTPUnsupportedMediaType):
             self.ExampleSchema(request).parse()
+
+
+class TestRequestsResponseSchema:
+    class ExampleSchema(RequestsResponseSchema):
+        key = fields.Str(required=True)
+
+    class UncompilableSchema(RequestsResponseSchema):
+        key = fields.Float(required=True)
+
+    @pytest.mark.parametrize(
+        "schema_class,json_data",
+        ((ExampleSchema, {"key": "value"}), (UncompilableSchema, {"key": 1.5})),
+    )
+    def test_it_parses_the_response(self, schema_class, json_data, compile_schema):
+        result = schema_class(self.response(json_data)).parse()
+
+        compile_schema.assert_called_once_with(
+            schema_class, ignore_hooks=("_pre_load",)
+        )
+        assert result == json_data
+
+    @pytest.mark.parametrize("json_data", ({}, {"key": 1}))
+    def test_it_raises_marshmallows_errors_for_invalid_responses(self, json_data):
+        with pytest.raises(ValidationError) as exc_info:
+            self.ExampleSchema(self.response(json_data)).parse()
+
+        with pytest.raises(marshmallow.ValidationError) as marshmallow_exc_info:
+            self.ExampleSchema(self.response(json_data)).load(self.response(json_data))
+
+        assert exc_info.value.messages == marshmallow_exc_info.value.messages
+
+    def test_it_raises_if_the_response_isnt_json(self):
+        response = Mock(spec_set=["json"])
+        response.json.side_effect = ValueError()
+
+        with pytest.raises(ValidationError) as exc_info:
+            self.ExampleSchema(response).parse()
+
+        assert exc_info.value.messages == {
+            "_schema": ["response doesn't have a valid JSON body"]
+        }
+
+    def test_it_uses_marshmallow_if_load_is_given_arguments(self, compile_schema):
+        self.ExampleSchema(self.response([{"key": "value"}])).parse(many=True)
+
+        compile_schema.assert_not_called()
+
+    def response(self, json_data):
+        response = Mock(spec_set=["json"])
+        response.json.return_value = json_data
+        return response
+
+    @pytest.fixture
+    def compile_schema(self, patch):
+        return patch(
+            "lms.validation._base.compile_schema", side_effect=_base.compile_schema
+        )
@@ -0,0 +1,188 @@
+import marshmallow
+import pytest
+from marshmallow import (
+    EXCLUDE,
+    Schema,
+    fields,
+    post_load,
+    pre_load,
+    validate,
+    validates,
+    validates_schema,
+)
+
+from lms.validation._compiled import CompiledSchema, Fallback, compile_schema
+
+
+class _ChildSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    id = fields.Integer(required=True)
+
+
+class ExampleSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    string = fields.Str(required=True)
+    integer = fields.Integer()
+    boolean = fields.Boolean()
+    raw = fields.Raw()
+    renamed = fields.Str(data_key="dataKey", attribute="attribute")
+    default = fields.Str(load_default="default")
+    callable_default = fields.List(fields.Str(), load_default=list)
+    nullable = fields.Str(allow_none=True)
+    length = fields.Str(validate=validate.Length(max=3))
+    predicate = fields.Integer(validate=lambda value: value > 0)
+    child = fields.Nested(_ChildSchema)
+    children = fields.Nested(_ChildSchema, many=True)
+    child_list = fields.List(fields.Nested(_ChildSchema))
+    dump_only = fields.Str(dump_only=True)
+
+
+class ManySchema(ExampleSchema):
+    @validates_schema(pass_many=True)
+    def _validate_length(self, data, **_kwargs):
+        if not data:
+            raise marshmallow.ValidationError("Shorter than minimum length 1.")
+
+    @post_load(pass_many=True)
+    def _post_load_many(self, data, **_kwargs):
+        return data + [{"string": "added"}]
+
+    @post_load
+    def _post_load(self, data, **_kwargs):
+        return {**data, "post_loaded": True}
+
+
+VALID_ITEMS = [
+    {"string": "foo"},
+    {
+        "string": "foo",
+        "integer": 1,
+        "boolean": False,
+        "raw": {"any": ["thing"]},
+        "dataKey": "renamed",
+        "default": "not default",
+        "callable_default": ["a"],
+        "nullable": None,
+        "length": "abc",
+        "predicate": 1,
+        "child": {"id": 1, "unknown": "excluded"},
+        "children": [{"id": 1}, {"id": 2}],
+        "child_list": [{"id": 3}],
+        "dump_only": "excluded",
+        "unknown": "excluded",
+    },
+]
+
+
+INVALID_ITEMS = [
+    [],
+    {},
+    {"string": None},
+    {"string": 1},
+    {"string": "foo", "integer": True},
+    {"string": "foo", "length": "abcd"},
+    {"string": "foo", "predicate": 0},
+    {"string": "foo", "child": []},
+    {"string": "foo", "child": {}},
+    {"string": "foo", "children": {"id": 1}},
+    {"string": "foo", "child_list": [{"id": None}]},
+]
+
+
+class TestCompiledSchema:
+    @pytest.mark.parametrize("item", VALID_ITEMS)
+    def test_it_loads_objects_like_marshmallow(self, item):
+        schema = ExampleSchema()
+
+        assert compile_schema(ExampleSchema).load(schema, item) == schema.load(item)
+
+    def test_it_loads_lists_and_runs_hooks_like_marshmallow(self):
+        schema = ManySchema(many=True)
+
+        assert compile_schema(ManySchema).load(schema, VALID_ITEMS) == schema.load(
+            VALID_ITEMS
+        )
+
+    @pytest.mark.parametrize("item", INVALID_ITEMS)
+    def test_it_falls_back_for_invalid_objects(self, item):
+        schema = ExampleSchema()
+
+        with pytest.raises(Fallback):
+            compile_schema(ExampleSchema).load(schema, item)
+
+        # These all really are invalid.
+        with pytest.raises(marshmallow.ValidationError):
+            schema.load(item)
+
+    @pytest.mark.parametrize(
+        "item",
+        [{"string": "foo", "integer": "1"}, {"string": "foo", "boolean": "true"}],
+    )
+    def test_it_falls_back_for_values_that_marshmallow_converts(self, item):
+        with pytest.raises(Fallback):
+            compile_schema(ExampleSchema).load(ExampleSchema(), item)
+
+    @pytest.mark.parametrize("data", [{"string": "foo"}, []])
+    def test_it_falls_back_for_invalid_lists(self, data):
+        with pytest.raises(Fallback):
+            compile_schema(ManySchema).load(ManySchema(many=True), data)
+
+    def test_compile_schema_caches_the_compiled_schema(self):
+        assert compile_schema(ExampleSchema) is compile_schema(ExampleSchema)
+
+    def test_compile_schema_can_ignore_hooks(self):
+        class PreLoadSchema(ExampleSchema):
+            @pre_load
+            def _pre_load(self, data, **_kwargs):
+                return data  # pragma: no cover
+
+        assert not compile_schema(PreLoadSchema)
+        assert isinstance(
+            compile_schema(PreLoadSchema, ignore_hooks=("_pre_load",)), CompiledSchema
+        )
+
+    @pytest.mark.parametrize(
+        "attrs",
+        [
+            {"Meta": type("Meta", (), {"unknown": marshmallow.RAISE})},
+            {"Meta": type("Meta", (), {"ordered": True})},
+            {"float": fields.Float()},
+            {"boolean": fields.Boolean(truthy={"yes"})},
+            {"dotted": fields.Str(attribute="dotted.attribute")},
+            # A schema that's resolved lazily, like a recursive one.
+            {
+                "recursive": fields.Nested(
+                    lambda: ExampleSchema()  # pylint:disable=unnecessary-lambda
+                )
+            },
+            {"only": fields.Nested(_ChildSchema, only=("id",))},
+            {
+                "nested_hook": fields.Nested(
+                    type(
+                        "NestedSchema",
+                        (_ChildSchema,),
+                        {"_post_load": post_load(lambda self, data, **_: data)},
+                    )
+                )
+            },
+            {"_post_load": post_load(pass_original=True)(lambda self, data, **_: data)},
+            {"_validates_schema": validates_schema(lambda self, data, **_: None)},
+            {"_validates": validates("string")(lambda self, value: None)},
+        ],
+    )
+    def test_schemas_it_cant_compile(self, attrs):
+        schema_class = type("UncompilableSchema", (ExampleSchema,), attrs)
+
+        assert compile_schema(schema_class) is None
+
+    def test_it_ignores_dump_hooks(self):
+        class DumpHookSchema(ExampleSchema):
+            @marshmallow.post_dump
+            def _post_dump(self, data, **_kwargs):
+                return data  # pragma: no cover
+
+        assert compile_schema(DumpHookSchema)
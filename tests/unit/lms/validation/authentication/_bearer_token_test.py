@@ -1,4 +1,5 @@
 import datetime
+import time
 
 import pytest
 from pyramid.testing import DummyRequest
@@ -29,7 +30,7 @@ class TestBearerTokenSchema:
         self, lti_user, schema, _jwt
     ):
         assert schema.lti_user(location="headers") == lti_user
-        _jwt.decode_jwt.assert_called_once_with(
+        _jwt.decode_jwt_with_expiry.assert_called_once_with(
             _jwt.encode_jwt.return_value, "test_secret"
         )
 
@@ -56,7 +57,7 @@ class TestBearerTokenSchema:
         }
 
     def test_it_raises_if_the_jwt_has_expired(self, schema, _jwt):
-        _jwt.decode_jwt.side_effect = ExpiredJWTError()
+        _jwt.decode_jwt_with_expiry.side_effect = ExpiredJWTError()
 
         with pytest.raises(ExpiredSessionTokenError) as exc_info:
             schema.lti_user("headers")
@@ -66,7 +67,7 @@ class TestBearerTokenSchema:
         }
 
     def test_it_raises_if_the_jwt_is_invalid(self, schema, _jwt):
-        _jwt.decode_jwt.side_effect = InvalidJWTError()
+        _jwt.decode_jwt_with_expiry.side_effect = InvalidJWTError()
 
         with pytest.raises(InvalidSessionTokenError) as exc_info:
             schema.lti_user("headers")
@@ -75,8 +76,8 @@ class TestBearerTokenSchema:
             "headers": {"authorization": ["Invalid session token"]}
         }
 
-    def test_it_raises_if_the_user_id_param_is_missing(self, schema, _jwt):
-        del _jwt.decode_jwt.return_value["user_id"]
+    def test_it_raises_if_the_user_id_param_is_missing(self, schema, jwt_payload):
+        del jwt_payload["user_id"]
 
         with pytest.raises(ValidationError) as exc_info:
             schema.lti_user("headers")
@@ -85,8 +86,10 @@ class TestBearerTokenSchema:
             "headers": {"user_id": ["Missing data for required field."]},
         }
 
-    def test_it_raises_if_the_oauth_consumer_key_param_is_missing(self, schema, _jwt):
-        del _jwt.decode_jwt.return_value["oauth_consumer_key"]
+    def test_it_raises_if_the_oauth_consumer_key_param_is_missing(
+        self, schema, jwt_payload
+    ):
+        del jwt_payload["oauth_consumer_key"]
 
         with pytest.raises(ValidationError) as exc_info:
             schema.lti_user("headers")
@@ -95,8 +98,8 @@ class TestBearerTokenSchema:
             "headers": {"oauth_consumer_key": ["Missing data for required field."]},
         }
 
-    def test_it_raises_if_the_roles_param_is_missing(self, schema, _jwt):
-        del _jwt.decode_jwt.return_value["roles"]
+    def test_it_raises_if_the_roles_param_is_missing(self, schema, jwt_payload):
+        del jwt_payload["roles"]
 
         with pytest.raises(ValidationError) as exc_info:
             schema.lti_user("headers")
@@ -116,6 +119,50 @@ class TestBearerTokenSchema:
 
         assert deserialized == lti_user
 
+    def test_cached_lti_user_returns_the_lti_user(
+        self, lti_user, pyramid_request, _jwt
+    ):
+        for _ in range(2):
+            assert (
+                BearerTokenSchema.cached_lti_user(
+                    pyramid_request, "headers", "Bearer ENCODED_JWT"
+                )
+                == lti_user
+            )
+
+        # The second time it came from the cache.
+        _jwt.decode_jwt_with_expiry.assert_called_once_with(
+            "ENCODED_JWT", "test_secret"
+        )
+
+    def test_cached_lti_user_caches_lti_users_until_the_jwt_expires(
+        self, lti_user, pyramid_request, _jwt, jwt_payload
+    ):
+        _jwt.decode_jwt_with_expiry.return_value = (jwt_payload, time.time())
+
+        for _ in range(2):
+            assert (
+                BearerTokenSchema.cached_lti_user(
+                    pyramid_request, "headers", "Bearer ENCODED_JWT"
+                )
+                == lti_user
+            )
+
+        assert _jwt.decode_jwt_with_expiry.call_count == 2
+
+    def test_cached_lti_user_raises_if_the_jwt_is_invalid(self, pyramid_request, _jwt):
+        _jwt.decode_jwt_with_expiry.side_effect = InvalidJWTError()
+
+        with pytest.raises(InvalidSessionTokenError):
+            BearerTokenSchema.cached_lti_user(
+                pyramid_request, "headers", "Bearer ENCODED_JWT"
+            )
+
+    @pytest.fixture(autouse=True)
+    def clear_verified_lti_users(self):
+        # pylint:disable=protected-access
+        BearerTokenSchema._verified_lti_users.clear()
+
     @pytest.fixture
     def schema(self, pyramid_request):
         """Return a BearerTokenSchema configured with the right secret."""
@@ -131,13 +178,18 @@ class TestBearerTokenSchema:
 
 
 @pytest.fixture(autouse=True)
-def _jwt(patch, lti_user):
+def _jwt(patch, jwt_payload):
     _jwt = patch("lms.validation.authentication._bearer_token._jwt")
     _jwt.encode_jwt.return_value = "ENCODED_JWT"
-    _jwt.decode_jwt.return_value = lti_user._asdict()
+    _jwt.decode_jwt_with_expiry.return_value = (jwt_payload, time.time() + 60)
     return _jwt
 
 
+@pytest.fixture
+def jwt_payload(lti_user):
+    return lti_user._asdict()
+
+
 @pytest.fixture
 def lti_user():
     """Return the original LTIUser that was encoded as a JWT in the request."""
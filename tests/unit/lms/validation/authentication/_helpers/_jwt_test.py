@@ -71,6 +71,19 @@ class TestDecodeJWT:
         return jwt_str
 
 
+class TestDecodeJWTWithExpiry:
+    def test_it_returns_the_decoded_payload_and_expiry_time(self):
+        exp = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+        jwt_str = jwt.encode(
+            {"TEST_KEY": "TEST_VALUE", "exp": exp}, "test_secret", algorithm="HS256"
+        )
+
+        assert _jwt.decode_jwt_with_expiry(jwt_str, "test_secret") == (
+            {"TEST_KEY": "TEST_VALUE"},
+            int(exp.timestamp()),
+        )
+
+
 class TestEncodeJWT:
     def test_it_returns_the_encoded_jwt(self):
         original_payload = {"TEST_KEY": "TEST_VALUE"}
@@ -71,8 +71,10 @@ class TestAdminViews:
 
         response = AdminViews(pyramid_request).update_instance()
 
-        application_instance_service.get.assert_called_once_with(sentinel.consumer_key)
-        application_instance = application_instance_service.get.return_value
+        application_instance_service.get_for_update.assert_called_once_with(
+            sentinel.consumer_key
+        )
+        application_instance = application_instance_service.get_for_update.return_value
 
         assert pyramid_request.session.peek_flash("messages")
         assert response == temporary_redirect_to(
@@ -105,13 +107,13 @@ class TestAdminViews:
 
         AdminViews(pyramid_request).update_instance()
 
-        application_instance = application_instance_service.get.return_value
+        application_instance = application_instance_service.get_for_update.return_value
         assert application_instance.settings.get(setting, sub_setting) == enabled
 
     def test_update_instance_not_found(
         self, pyramid_request, application_instance_service
     ):
-        application_instance_service.get.side_effect = ConsumerKeyError
+        application_instance_service.get_for_update.side_effect = ConsumerKeyError
         pyramid_request.matchdict["consumer_key"] = sentinel.consumer_key
 
         with pytest.raises(HTTPNotFound):
@@ -9,6 +9,7 @@ from lms.views import (
     CanvasStudentNotInGroup,
 )
 from lms.views.api.canvas.sync import Sync
+from tests import factories
 from tests.conftest import TEST_SETTINGS
 
 pytestmark = pytest.mark.usefixtures(
@@ -122,6 +123,8 @@ def test_get_canvas_groups_instructor_empty(pyramid_request, canvas_api_client):
     with pytest.raises(CanvasGroupSetEmpty):
         Sync(pyramid_request)._get_canvas_groups()
 
+    canvas_api_client.invalidate.assert_called_once_with("group_category_groups", 1)
+
 
 @pytest.mark.usefixtures("user_is_instructor", "is_group_launch")
 def test_get_canvas_groups_instructor_not_found_group_set(
@@ -204,24 +207,30 @@ def test_sections_sync_when_in_SpeedGrader(
     canvas_api_client.course_sections.assert_called_once_with(course_id)
     canvas_api_client.users_sections.assert_called_once_with(user_id, course_id)
 
-    assert_sync_and_return_sections(groupids, sections=sections.user)
+    # The course's sections (with their names) that the learner is a member of.
+    learner_sections = [
+        section
+        for section in sections.course
+        if section["id"] in [user_section["id"] for user_section in sections.user]
+    ]
+    assert_sync_and_return_sections(groupids, sections=learner_sections)
 
 
 @pytest.fixture
 def assert_sync_and_return_sections(lti_h_service, request_json, grouping_service):
     tool_guid = request_json["lms"]["tool_consumer_instance_guid"]
     context_id = request_json["course"]["context_id"]
+    grouping_service.upsert_canvas_sections.return_value = [
+        factories.Grouping.build() for _ in range(2)
+    ]
 
     def assert_return_values(groupids, sections):
-        expected_groups = [
-            grouping_service.upsert_canvas_section(
-                tool_consumer_instance_guid=tool_guid,
-                context_id=context_id,
-                section_id=section["id"],
-                section_name=section.get("name", f"Section {section['id']}"),
-            )
-            for section in sections
-        ]
+        grouping_service.upsert_canvas_sections.assert_called_once_with(
+            tool_consumer_instance_guid=tool_guid,
+            context_id=context_id,
+            sections=sections,
+        )
+        expected_groups = grouping_service.upsert_canvas_sections.return_value
 
         lti_h_service.sync.assert_called_once_with(
             expected_groups, request_json["group_info"]
@@ -238,18 +247,17 @@ def assert_sync_and_return_sections(lti_h_service, request_json, grouping_servic
 def assert_sync_and_return_groups(lti_h_service, request_json, grouping_service):
     tool_guid = request_json["lms"]["tool_consumer_instance_guid"]
     context_id = request_json["course"]["context_id"]
+    grouping_service.upsert_canvas_groups.return_value = [
+        factories.Grouping.build() for _ in range(2)
+    ]
 
     def assert_return_values(groupids, groups):
-        expected_groups = [
-            grouping_service.upsert_canvas_group(
-                tool_consumer_instance_guid=tool_guid,
-                context_id=context_id,
-                group_id=group["id"],
-                group_name=group.get("name", f"Group {group['id']}"),
-                group_set_id=group["group_category_id"],
-            )
-            for group in groups
-        ]
+        grouping_service.upsert_canvas_groups.assert_called_once_with(
+            tool_consumer_instance_guid=tool_guid,
+            context_id=context_id,
+            groups=groups,
+        )
+        expected_groups = grouping_service.upsert_canvas_groups.return_value
 
         lti_h_service.sync.assert_called_once_with(
             expected_groups, request_json["group_info"]
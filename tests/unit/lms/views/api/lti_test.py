@@ -5,6 +5,7 @@ from urllib.parse import parse_qs, urlparse
 import pytest
 from h_matchers import Any
 
+from lms.services import LTIOutcomesAPIError
 from lms.views.api.lti import CanvasPreRecordHook, LTIOutcomesViews
 
 pytestmark = pytest.mark.usefixtures("lti_outcomes_client")
@@ -125,6 +126,40 @@ class TestReadResult:
         return pyramid_request
 
 
+class TestReadResults:
+    def test_it_returns_the_results(self, pyramid_request, lti_outcomes_client):
+        lti_outcomes_client.read_results.return_value = {
+            "student_1-assignment1": 0.5,
+            "student_2-assignment1": None,
+            "student_3-assignment1": LTIOutcomesAPIError("Error calling LTI API"),
+        }
+
+        results = LTIOutcomesViews(pyramid_request).read_results()
+
+        lti_outcomes_client.read_results.assert_called_once_with(
+            pyramid_request.parsed_params["lis_result_sourcedids"]
+        )
+        assert results == {
+            "results": {
+                "student_1-assignment1": {"currentScore": 0.5},
+                "student_2-assignment1": {"currentScore": None},
+                "student_3-assignment1": {"error": "Error calling LTI API"},
+            }
+        }
+
+    @pytest.fixture
+    def pyramid_request(self, pyramid_request):
+        pyramid_request.parsed_params = {
+            "lis_outcome_service_url": "https://hypothesis.shinylms.com/outcomes",
+            "lis_result_sourcedids": [
+                "student_1-assignment1",
+                "student_2-assignment1",
+                "student_3-assignment1",
+            ],
+        }
+        return pyramid_request
+
+
 class TestRecordResult:
     def test_it_records_result(self, pyramid_request, lti_outcomes_client):
         LTIOutcomesViews(pyramid_request).record_result()
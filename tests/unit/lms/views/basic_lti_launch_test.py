@@ -162,6 +162,15 @@ class TestBasicLTILaunchViewsInit:
 
         context.js_config.maybe_set_focused_user.assert_called_once_with()
 
+    def test_it_updates_the_lms_data(
+        self, context, pyramid_request, application_instance_service
+    ):
+        BasicLTILaunchViews(context, pyramid_request)
+
+        application_instance_service.update_lms_data.assert_called_once_with(
+            pyramid_request.params
+        )
+
 
 class TestCommon:
     """
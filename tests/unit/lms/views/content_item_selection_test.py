@@ -28,6 +28,15 @@ class TestContentItemSelection:
 
         context.get_or_create_course.assert_called_once_with()
 
+    def test_it_updates_the_lms_data(
+        self, context, pyramid_request, application_instance_service
+    ):
+        content_item_selection(context, pyramid_request)
+
+        application_instance_service.update_lms_data.assert_called_once_with(
+            pyramid_request.params
+        )
+
     @pytest.fixture
     def pyramid_request(self, pyramid_request):
         pyramid_request.params = {
@@ -1,43 +1,24 @@
+import pytest
+
 from lms.models import ApplicationInstance, LtiLaunches
 from lms.views.reports import list_application_instances
 
 
 def setup_launches(pyramid_request, app_instances):
-    launch1 = LtiLaunches(context_id="asdf", lti_key=app_instances[0].consumer_key)
-    launch2 = LtiLaunches(context_id="asdf", lti_key=app_instances[0].consumer_key)
-    launch3 = LtiLaunches(context_id="asdf", lti_key=app_instances[0].consumer_key)
-    launch4 = LtiLaunches(context_id="fdsa", lti_key=app_instances[1].consumer_key)
-    launch5 = LtiLaunches(context_id="another", lti_key=app_instances[2].consumer_key)
-    launch6 = LtiLaunches(context_id="another", lti_key=app_instances[2].consumer_key)
-
-    for launch in [launch1, launch2, launch3, launch4, launch5, launch6]:
-        pyramid_request.db.add(launch)
+    for app_instance, context_id, launches in [
+        (app_instances[0], "asdf", 3),
+        (app_instances[1], "fdsa", 1),
+        (app_instances[2], "another", 2),
+    ]:
+        for _ in range(launches):
+            LtiLaunches.add(pyramid_request.db, context_id, app_instance.consumer_key)
     pyramid_request.db.flush()
 
 
 class TestReports:
-    def test_build_launches_rows(self, pyramid_request):
-        test_urls = [
-            "https://example.com",
-            "https://sub.example.com",
-            "https://another.example.com",
-        ]
-        test_emails = ["a@example.com", "b@sub.example.com", "c@another.example.com"]
-
-        def build_ai_from_pair(pair):
-            return ApplicationInstance.build_from_lms_url(
-                pair[0], pair[1], None, None, None, None
-            )
-
-        app_instances = [
-            build_ai_from_pair(pair) for pair in zip(test_urls, test_emails)
-        ]
-        for app in app_instances:
-            pyramid_request.db.add(app)
-
-        setup_launches(pyramid_request, app_instances)
-
+    def test_build_launches_rows(self, pyramid_request, app_instances):
         result = list_application_instances(pyramid_request)
+
         assert result["num_launches"] == 6
         assert result["launches"] == [
             (
@@ -62,3 +43,102 @@ class TestReports:
                 app_instances[1].consumer_key,
             ),
         ]
+        assert result["sort"] == "launches"
+
+    def test_it_doesnt_list_launches_without_a_context_id(
+        self, pyramid_request, app_instances
+    ):
+        LtiLaunches.add(pyramid_request.db, None, app_instances[0].consumer_key)
+        pyramid_request.db.flush()
+
+        result = list_application_instances(pyramid_request)
+
+        assert result["num_launches"] == 7
+        assert [row[0] for row in result["launches"]] == ["asdf", "another", "fdsa"]
+
+    def test_it_returns_the_application_instances(self, pyramid_request, app_instances):
+        result = list_application_instances(pyramid_request)
+
+        assert result["apps"] == sorted(app_instances, key=lambda app: app.id)
+        assert result["num_apps"] == 3
+
+    @pytest.mark.parametrize(
+        "sort,context_ids",
+        [
+            ("context_id", ["another", "asdf", "fdsa"]),
+            ("launches", ["asdf", "another", "fdsa"]),
+            ("unknown", ["asdf", "another", "fdsa"]),
+        ],
+    )
+    @pytest.mark.usefixtures("app_instances")
+    def test_it_sorts_the_launches(self, pyramid_request, sort, context_ids):
+        pyramid_request.params["sort"] = sort
+
+        result = list_application_instances(pyramid_request)
+
+        assert [row[0] for row in result["launches"]] == context_ids
+
+    @pytest.mark.usefixtures("app_instances")
+    def test_it_links_to_the_other_sorts(self, pyramid_request):
+        pyramid_request.params["page"] = "2"
+
+        result = list_application_instances(pyramid_request)
+
+        assert (
+            result["sort_urls"]["consumer_key"]
+            == "http://example.com/reports?sort=consumer_key"
+        )
+
+    @pytest.mark.parametrize(
+        "page,context_ids,prev_url,next_url",
+        [
+            (None, ["asdf"], None, "http://example.com/reports?page=2"),
+            (
+                "2",
+                ["another"],
+                "http://example.com/reports?page=1",
+                "http://example.com/reports?page=3",
+            ),
+            ("3", ["fdsa"], "http://example.com/reports?page=2", None),
+            ("invalid", ["asdf"], None, "http://example.com/reports?page=2"),
+            ("-1", ["asdf"], None, "http://example.com/reports?page=2"),
+        ],
+    )
+    @pytest.mark.usefixtures("app_instances")
+    def test_it_paginates_the_launches(
+        self, pyramid_request, page, context_ids, prev_url, next_url, monkeypatch
+    ):
+        monkeypatch.setattr("lms.views.reports.PAGE_SIZE", 1)
+        if page:
+            pyramid_request.params["page"] = page
+
+        result = list_application_instances(pyramid_request)
+
+        assert [row[0] for row in result["launches"]] == context_ids
+        assert result["launches_pages"] == {"prev": prev_url, "next": next_url}
+
+    @pytest.fixture(autouse=True)
+    def pyramid_request(self, pyramid_request):
+        # The report's own params only.
+        pyramid_request.params = {}
+        return pyramid_request
+
+    @pytest.fixture
+    def app_instances(self, pyramid_request):
+        test_urls = [
+            "https://example.com",
+            "https://sub.example.com",
+            "https://another.example.com",
+        ]
+        test_emails = ["a@example.com", "b@sub.example.com", "c@another.example.com"]
+
+        app_instances = [
+            ApplicationInstance.build_from_lms_url(url, email, None, None, None, None)
+            for url, email in zip(test_urls, test_emails)
+        ]
+        for app in app_instances:
+            pyramid_request.db.add(app)
+
+        setup_launches(pyramid_request, app_instances)
+
+        return app_instances
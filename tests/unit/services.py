@@ -15,6 +15,8 @@ from lms.services.grant_token import GrantTokenService
 from lms.services.group_info import GroupInfoService
 from lms.services.grouping import GroupingService
 from lms.services.h_api import HAPI
+from lms.services.h_sync_queue import HSyncQueue
+from lms.services.h_user import HUserService
 from lms.services.http import HTTPService
 from lms.services.launch_verifier import LaunchVerifier
 from lms.services.lti_h import LTIHService
@@ -47,6 +49,8 @@ __all__ = (
     "oauth1_service",
     "oauth2_token_service",
     "h_api",
+    "h_sync_queue",
+    "h_user_service",
     "vitalsource_service",
     "file_service",
 )
@@ -88,6 +92,10 @@ def application_instance_service(mock_service):
         "canvas", "groups_enabled", False
     )
 
+    application_instance_service.get_for_update.return_value = (
+        application_instance_service.get.return_value
+    )
+
     return application_instance_service
 
 
@@ -154,6 +162,19 @@ def h_api(mock_service):
     return h_api
 
 
+@pytest.fixture
+def h_sync_queue(mock_service):
+    return mock_service(HSyncQueue, service_name="h_sync_queue")
+
+
+@pytest.fixture
+def h_user_service(mock_service):
+    h_user_service = mock_service(HUserService, service_name="h_user")
+    h_user_service.get_user.return_value = factories.HUser()
+
+    return h_user_service
+
+
 @pytest.fixture
 def http_service(mock_service):
     http_service = mock_service(HTTPService, service_name="http")
@@ -193,6 +214,16 @@ def oauth1_service(mock_service):
 def oauth2_token_service(mock_service, oauth_token):
     oauth2_token_service = mock_service(OAuth2TokenService, service_name="oauth2_token")
     oauth2_token_service.get.return_value = oauth_token
+    # By default tokens don't need refreshing ahead of time, and nothing
+    # else has refreshed them when they do need refreshing.
+    oauth2_token_service.get_fresh.side_effect = (
+        lambda _refresh: oauth2_token_service.get()
+    )
+    oauth2_token_service.refresh.side_effect = (
+        lambda refresh, _stale_access_token: refresh(
+            oauth2_token_service.get().refresh_token
+        )
+    )
 
     return oauth2_token_service
 